@@ -1,8 +1,13 @@
+import random
+
 import cocotb
-from cocotb.triggers import Event, Timer
+from cocotb.triggers import Timer
 from cocotb_coverage.crv import Randomized
 from cocotb.queue import Queue
 
+from tb_utils.batch_rand import BatchRandomizer
+from tb_utils.flow import CreditWindow, flow_window
+
 
 class Transaction(Randomized):
     def __init__(self):
@@ -22,26 +27,24 @@ class Transaction(Randomized):
 
 
 class Generator:
-    def __init__(self, queue, event, count):
+    def __init__(self, queue, credits, count):
         self.queue = queue
         self.count = count
-        self.event = event
-        self.event.clear()
+        self.credits = credits
 
     async def gen_data(self):
-        for _ in range(self.count):
-            t = Transaction()
-            t.randomize()
+        for t in BatchRandomizer(Transaction, seed=random.getrandbits(32)).generate(self.count):
             t.print_in(tag="[GEN]")
+            await self.credits.acquire()
             await self.queue.put(t)
-            await self.event.wait()
-            self.event.clear()
 
 
 class Driver:
     def __init__(self, dut, queue):
         self.dut = dut
         self.queue = queue
+        # One entry per transaction applied to the DUT, consumed by the monitor
+        self.driven = Queue()
 
     async def drive_data(self, delay: int = 10):
         while True:
@@ -50,18 +53,22 @@ class Driver:
 
             self.dut.a.value = temp.a
             self.dut.b.value = temp.b
+            self.driven.put_nowait(temp)
 
             temp.print_in(tag="[DRV]")
             await Timer(delay, unit="ns")
 
 
 class Monitor:
-    def __init__(self, dut, queue):
+    def __init__(self, dut, queue, driven):
         self.dut = dut
         self.queue = queue
+        self.driven = driven
 
     async def sample_data(self, delay: int = 10):
         while True:
+            # Sample once per driven transaction, never on idle periods
+            await self.driven.get()
             await Timer(delay // 2, unit="ns")
             temp = Transaction()
 
@@ -76,9 +83,9 @@ class Monitor:
 
 
 class Scoreboard:
-    def __init__(self, queue, event):
+    def __init__(self, queue, credits):
         self.queue = queue
-        self.event = event
+        self.credits = credits
 
     async def compare_data(self):
         while True:
@@ -95,7 +102,7 @@ class Scoreboard:
 
             cocotb.log.info("==" * 40)
 
-            self.event.set()
+            self.credits.release()
 
 
 @cocotb.test()
@@ -108,22 +115,23 @@ async def mult_test(dut, num_tests, delay):
     # Instantiate the classes
     queue_drv = Queue()
     queue_mon = Queue()
-    event = Event()
+    credits = CreditWindow(flow_window())
 
     # Parameter: number of tests
     NUM_TESTS = num_tests
 
     # Create objects
-    gen = Generator(queue_drv, event, NUM_TESTS)
+    gen = Generator(queue_drv, credits, NUM_TESTS)
     drv = Driver(dut, queue_drv)
-    mon = Monitor(dut, queue_mon)
-    scb = Scoreboard(queue_mon, event)
+    mon = Monitor(dut, queue_mon, drv.driven)
+    scb = Scoreboard(queue_mon, credits)
 
     cocotb.start_soon(drv.drive_data(delay=delay))
     cocotb.start_soon(mon.sample_data(delay=delay))
     cocotb.start_soon(scb.compare_data())
 
     await gen.gen_data()
+    await credits.drain()
     while True:
         if queue_drv.empty() and queue_mon.empty():
             cocotb.log.info("All transactions processed")
@@ -1,10 +1,26 @@
+import os
 import cocotb
 from cocotb.clock import Clock
-from cocotb.triggers import Event, ClockCycles, ReadOnly
+from cocotb.triggers import ClockCycles, ReadOnly
+from cocotb.utils import get_sim_time
 from cocotb_coverage.crv import Randomized
 from cocotb.queue import Queue
 import random
 
+from tb_utils.dispatch import CycleDispatcher, WakeupCounter
+from tb_utils.flow import CreditWindow, flow_window
+from tb_utils.perf import Throughput, bench_requested
+from tb_utils.tb_log import HIGH, LOW, MEDIUM, TbLogger
+
+CLK_PERIOD_NS = 10
+# Transactions per configuration in test_dispatch_wakeups
+BENCH_EVENTS = 1000
+
+
+def dispatch_enabled():
+    """Per-cycle components on one CycleDispatcher (DISPATCH=0: one coroutine each)."""
+    return os.getenv("DISPATCH", "1") != "0"
+
 
 class Transaction(Randomized):
     
@@ -18,12 +34,12 @@ class Transaction(Randomized):
 
 class Generator():
 
-    def __init__(self, queue, event, count):
+    def __init__(self, queue, credits, count):
         
         self.queue = queue
-        self.event = event
+        self.credits = credits
         self.count = count
-        self.event.clear()
+        self.log = TbLogger("GEN")
 
     async def gen_data(self, seq_random=True):
 
@@ -35,101 +51,135 @@ class Generator():
             else:
                 t.randomize()
 
-            cocotb.log.info(f"[GEN]: din: {t.din:02d}")
+            self.log.info(HIGH, "[GEN]: din: %02d", t.din)
+            await self.credits.acquire()
             await self.queue.put(t)
-            await self.event.wait()
-            self.event.clear()
 
 class Driver():
 
     def __init__(self, queue, dut):
         self.queue = queue
         self.dut = dut
+        self.driven = 0  # transactions applied to the DUT so far
+        self.log = TbLogger("DRV")
         
     async def reset_dut(self):
         await self.dut.clk.falling_edge
         self.dut.rst.value = 1
         self.dut.din.value = 0
-        self.dut._log.info("---------------- Reset Applied  ----------------")
+        self.log.info(LOW, "---------------- Reset Applied  ----------------")
         await ClockCycles(self.dut.clk,5)
-        self.dut._log.info("---------------- Reset Removed  ----------------")
-        self.dut._log.info("------------------------------------------------")
+        self.log.info(LOW, "---------------- Reset Removed  ----------------")
+        self.log.info(LOW, "------------------------------------------------")
         self.dut.rst.value = 0
 
     async def recv_data(self):
         while True:
             temp = Transaction()
             temp = await self.queue.get()
-            self.dut._log.info(f"[DRV]: din: {temp.din:02d}")
+            self.log.info(HIGH, "[DRV]: din: %02d", temp.din)
               
             await self.dut.clk.falling_edge
             self.dut.din.value = temp.din
+            self.driven += 1
             await self.dut.clk.rising_edge
 
+    def drive(self):
+        """Dispatcher drive phase: apply the next queued transaction, if any."""
+        if self.queue.empty():
+            return
+        temp = self.queue.get_nowait()
+        self.log.info(HIGH, "[DRV]: din: %02d", temp.din)
+        self.dut.din.value = temp.din
+        self.driven += 1
+
 class Monitor():
-    def __init__(self, dut,queue):
+    def __init__(self, dut, queue, driver):
         self.dut   = dut
         self.queue = queue
+        self.driver = driver
+        self.sampled = 0
+        self.log = TbLogger("MON", txn_fields=["din", "dout"])
 
     async def sample_data(self):
         while True:
-            temp = Transaction()
             await self.dut.clk.rising_edge
             await ReadOnly()
-            temp.din = int(self.dut.din.value)
-            temp.dout = int(self.dut.dout.value)
-            await self.queue.put(temp)
-            self.dut._log.info(f"[MON]: din: {temp.din:02d} dout: {temp.dout:02d}")
+            self.sample()
+
+    def sample(self):
+        """Capture din/dout (in ReadOnly, after the rising edge).
+
+        Cycles where the driver applied nothing new are skipped, so every
+        sample (and every credit release) matches one driven transaction.
+        """
+        if self.driver.driven == self.sampled:
+            return
+        self.sampled = self.driver.driven
+        temp = Transaction()
+        temp.din = int(self.dut.din.value)
+        temp.dout = int(self.dut.dout.value)
+        self.queue.put_nowait(temp)
+        self.log.info(HIGH, "[MON]: din: %02d dout: %02d", temp.din, temp.dout)
+        self.log.txn(temp.din, temp.dout)
 
 class Scoreboard():
 
-    def __init__(self,queue,event):
+    def __init__(self,queue,credits):
 
         self.queue = queue
-        self.event = event
+        self.credits = credits
+        self.log = TbLogger("SCO")
 
     async def compare_data(self):
         while True:
-            temp = await self.queue.get()           
-            cocotb.log.info(f"[SCO]: din: {temp.din:02d} dout: {temp.dout:02d}")
-            if(temp.dout == temp.din):
-                cocotb.log.info("[SCO]: Test Passed")
-            else:
-                cocotb.log.error("[SCO]: Test Failed")
-            print('-------------------------')
-                
-            self.event.set()
+            temp = await self.queue.get()
+            self.compare(temp)
 
-@cocotb.test()
-@cocotb.parametrize(
-    ("seq_random", [True, False]),
-    )
-async def test(dut, seq_random):
+    def check(self):
+        """Dispatcher check phase: compare everything sampled this cycle."""
+        while not self.queue.empty():
+            self.compare(self.queue.get_nowait())
 
-    random.seed(42)
+    def compare(self, temp):
+        self.log.info(MEDIUM, "[SCO]: din: %02d dout: %02d", temp.din, temp.dout)
+        if(temp.dout == temp.din):
+            self.log.info(MEDIUM, "[SCO]: Test Passed")
+        else:
+            self.log.error("[SCO]: Test Failed")
+        self.log.info(MEDIUM, '-------------------------')
+
+        self.credits.release()
+
+async def run_env(dut, n_events, seq_random, dispatch):
+    """Reset the DUT, run ``n_events`` transactions and wait until all are checked."""
     # Instantiate the classes
     queue_drv = Queue()
     queue_mon = Queue()
-    event = Event()
-    
-    # Number of transactions to be generated
-    n_events = 10
-    
+    credits = CreditWindow(flow_window())
+
     # Create objects
-    gen = Generator(queue_drv, event, n_events)
+    gen = Generator(queue_drv, credits, n_events)
     drv = Driver(queue_drv, dut)
-    mon = Monitor(dut,queue_mon)
-    sco = Scoreboard(queue_mon,event)
-    
+    mon = Monitor(dut, queue_mon, drv)
+    sco = Scoreboard(queue_mon,credits)
 
-    cocotb.start_soon(Clock(dut.clk, 10, 'ns').start())
     await drv.reset_dut()
-    
-    driver_process = cocotb.start_soon(drv.recv_data())
-    monitor_process = cocotb.start_soon(mon.sample_data())
-    cocotb.start_soon(sco.compare_data())
+
+    if dispatch:
+        # One wakeup per clock phase for driver, monitor and scoreboard
+        cycles = CycleDispatcher(dut.clk)
+        cycles.on_drive(drv.drive)
+        cycles.on_sample(mon.sample)
+        cycles.on_check(sco.check)
+        cycles.start()
+    else:
+        driver_process = cocotb.start_soon(drv.recv_data())
+        monitor_process = cocotb.start_soon(mon.sample_data())
+        scoreboard_process = cocotb.start_soon(sco.compare_data())
 
     await gen.gen_data(seq_random)  # Wait for the generator to finish generating transactions
+    await credits.drain()
     while True:
         if queue_mon.empty() and queue_drv.empty():
             dut._log.info("All transactions processed.")
@@ -137,10 +187,57 @@ async def test(dut, seq_random):
         await ClockCycles(dut.clk, 1)
     
     dut._log.info("Stopping driver and monitor processes.")
-    driver_process.cancel()
-    monitor_process.cancel()
+    if dispatch:
+        cycles.stop()
+    else:
+        driver_process.cancel()
+        monitor_process.cancel()
+        scoreboard_process.cancel()
+    mon.log.close()
+
+
+@cocotb.test()
+@cocotb.parametrize(
+    ("seq_random", [True, False]),
+    )
+async def test(dut, seq_random):
+
+    random.seed(42)
+
+    # Number of transactions to be generated
+    n_events = 10
+
+    cocotb.start_soon(Clock(dut.clk, CLK_PERIOD_NS, 'ns').start())
+    await run_env(dut, n_events, seq_random, dispatch_enabled())
 
     dut._log.info("Test completed.")
-            
 
-    
\ No newline at end of file
+
+@cocotb.test(skip=not bench_requested("test_dispatch_wakeups"))
+async def test_dispatch_wakeups(dut):
+    """Scheduler wakeups and wall time per simulated cycle, one coroutine per
+    component vs one CycleDispatcher, for the same random transactions."""
+    cocotb.start_soon(Clock(dut.clk, CLK_PERIOD_NS, 'ns').start())
+
+    results = {}
+    for dispatch in (False, True):
+        random.seed(42)
+        label = "dispatcher" if dispatch else "coroutines"
+        start = get_sim_time("ns")
+        with WakeupCounter() as wakeups, Throughput(label, unit="cycles") as tp:
+            await run_env(dut, BENCH_EVENTS, True, dispatch)
+            tp.count = int((get_sim_time("ns") - start) // CLK_PERIOD_NS)
+        per_cycle = wakeups.count / tp.count if wakeups.available else None
+        results[label] = (per_cycle, 1e6 * tp.wall / tp.count)
+        dut._log.info(tp.summary())
+
+    for label, (per_cycle, us) in results.items():
+        wk = f"{per_cycle:5.2f}" if per_cycle is not None else "  n/a"
+        dut._log.info(f"[PERF] {label:<11} {wk} wakeups/cycle  {us:7.1f} us/cycle")
+    (old_wk, old_us), (new_wk, new_us) = results["coroutines"], results["dispatcher"]
+    dut._log.info(f"[PERF] dispatcher: {1 - new_us / old_us:.0%} less wall time per cycle")
+    if not WakeupCounter.available:
+        dut._log.warning("This cocotb version has no Task._resume/_advance; wakeups not counted")
+        return
+    dut._log.info(f"[PERF] dispatcher: {1 - new_wk / old_wk:.0%} fewer wakeups per cycle")
+    assert new_wk < old_wk, "CycleDispatcher should resume fewer coroutines per cycle"
@@ -1,10 +1,20 @@
+import random
+
 import cocotb
-from cocotb.triggers import ClockCycles, Event, ReadOnly
+from cocotb.triggers import ClockCycles, ReadOnly
 from cocotb.clock import Clock
 from cocotb_coverage.crv import Randomized
 from cocotb.queue import Queue
 from cocotb.utils import get_sim_time
 
+from tb_utils.batch_rand import BatchRandomizer
+from tb_utils.coverage_db import CoverageDB, coverage_path
+from tb_utils.fifo_model import FifoModel
+from tb_utils.flow import CreditWindow, flow_window
+from tb_utils.perf import Throughput, bench_requested
+from tb_utils.sampler import Record, SampleBuffer, Sampler
+from tb_utils.tb_log import HIGH, LOW, MEDIUM, TbLogger
+
 
 class Transaction(Randomized):
     def __init__(self, wr=1, rd=0, din=0, dout=0, empty=0, full=0):
@@ -21,28 +31,35 @@ class Transaction(Randomized):
         # Can't read and write at the same time
         self.add_constraint(lambda rd, wr: rd != wr)
 
-    def print_in(self, tag=""):
-        cocotb.log.info(
-            f"{tag} wr: {self.wr:02d} rd: {self.rd:02d} din: {int(self.din):02d}"
-        )
+    def print_in(self, log, tag="", verbosity=HIGH):
+        if log.enabled(verbosity):
+            log.info(
+                verbosity, "%s wr: %02d rd: %02d din: %02d",
+                tag, int(self.wr), int(self.rd), int(self.din),
+            )
 
-    def print_out(self, tag=""):
-        cocotb.log.info(
-            f"{tag} wr: {int(self.wr):02d} rd: {int(self.rd):02d} din: {int(self.din):02d} dout: "
-            f"{int(self.dout):02d} e: {int(self.empty):02d} f: {int(self.full):02d}"
-        )
+    def print_out(self, log, tag="", verbosity=HIGH):
+        if log.enabled(verbosity):
+            log.info(
+                verbosity, "%s wr: %02d rd: %02d din: %02d dout: %02d e: %02d f: %02d",
+                tag, int(self.wr), int(self.rd), int(self.din),
+                int(self.dout), int(self.empty), int(self.full),
+            )
 
 
 class Generator:
-    def __init__(self, queue, event, count):
+    def __init__(self, queue, credits, count):
         self.queue = queue
-        self.event = event
+        self.credits = credits
         self.count = count
-        self.event.clear()
+        self.log = TbLogger("GEN")
 
     async def gen_data(self, test_type: str = "random"):
+        batch = None
+        if test_type not in ("full", "empty", "fill_and_empty"):
+            batch = BatchRandomizer(Transaction, seed=random.getrandbits(32)).generate(self.count)
         for count_i in range(self.count):
-            t = Transaction()
+            t = Transaction() if batch is None else batch[count_i]
             match test_type:
                 case "full":
                     t.wr = 1
@@ -52,24 +69,24 @@ class Generator:
                     t.wr = 0
                     t.rd = 1
                 case "random":
-                    t.randomize()
+                    pass  # pre-randomized in batch
                 case "fill_and_empty":
                     is_write = count_i < self.count // 2
                     t.wr = 1 if is_write else 0
                     t.rd = 0 if is_write else 1
                     t.din = count_i % 16 if is_write else t.din
                 case _:
-                    t.randomize()
-            t.print_in("[GEN]")
+                    pass
+            t.print_in(self.log, "[GEN]")
+            await self.credits.acquire()
             await self.queue.put(t)
-            await self.event.wait()
-            self.event.clear()
 
 
 class Driver:
     def __init__(self, queue, dut):
         self.queue = queue
         self.dut = dut
+        self.log = TbLogger("DRV")
 
     async def reset_dut(self):
         await self.dut.clk.rising_edge
@@ -77,30 +94,62 @@ class Driver:
         self.dut.wr.value = 0
         self.dut.rd.value = 0
         self.dut.din.value = 0
-        cocotb.log.info("---------------- Reset Applied ----------------")
+        self.log.info(LOW, "---------------- Reset Applied ----------------")
         await ClockCycles(self.dut.clk, 2)
-        cocotb.log.info("---------------- Reset Removed ----------------")
-        cocotb.log.info(
-            "-------------------------------------------------------------------------------"
+        self.log.info(LOW, "---------------- Reset Removed ----------------")
+        self.log.info(
+            LOW, "-------------------------------------------------------------------------------"
         )
         self.dut.rst.value = 0
 
     async def send_data(self):
         while True:
-            temp = Transaction()
-            temp = await self.queue.get()
-            temp.print_in("[DRV]")
             await self.dut.clk.falling_edge
+            if self.queue.empty():
+                # Idle cycle: no operation, so no sample is checked for it
+                self.dut.wr.value = 0
+                self.dut.rd.value = 0
+                continue
+            temp = self.queue.get_nowait()
+            temp.print_in(self.log, "[DRV]")
             self.dut.din.value = temp.din
             self.dut.wr.value = temp.wr
             self.dut.rd.value = temp.rd
-            await self.dut.clk.rising_edge
+
+
+class FifoSample(Record):
+    """What the monitor sees on one clock edge; values convert to int on first use."""
+
+    __slots__ = ()
+    fields = ("wr", "rd", "din", "dout", "empty", "full")
+
+    print_out = Transaction.print_out
 
 
 class Monitor:
     def __init__(self, dut, queue):
         self.dut = dut
         self.queue = queue
+        self.sampler = Sampler(dut, FifoSample, clock=dut.clk)
+        self.log = TbLogger(
+            "MON",
+            txn_fields=list(FifoSample.fields),
+            clock=lambda: get_sim_time("step"),
+        )
+
+    async def sample_data(self):
+        sampler, queue, log = self.sampler, self.queue, self.log
+        while True:
+            temp = await sampler.next()
+            await queue.put(temp)
+            temp.print_out(log, "[MON]")
+            if log.txn_enabled:
+                log.txn(*temp.ints())
+
+
+class LegacyMonitor(Monitor):
+    """Previous monitor (handle lookup and a Transaction per sample), kept for
+    the sampling benchmark."""
 
     async def sample_data(self):
         while True:
@@ -115,44 +164,66 @@ class Monitor:
             temp.empty = self.dut.empty.value
 
             await self.queue.put(temp)
-            temp.print_out("[MON]")
+            temp.print_out(self.log, "[MON]")
+            self.log.txn(temp.wr, temp.rd, temp.din, temp.dout, temp.empty, temp.full)
+
+
+class FifoCoverage:
+    """Operation x FIFO state (writes when full, reads when empty...) and occupancy."""
+
+    STATES = ("empty", "partial", "full")
+
+    def __init__(self, depth=16):
+        self.depth = depth
+        self.db = CoverageDB("fifo")
+        cg = self.db.covergroup("fifo")
+        self.op_state = cg.coverpoint(
+            "op_state", (2, 3), labels=[f"{op}_{st}" for op in ("wr", "rd") for st in self.STATES]
+        )
+        self.occupancy = cg.coverpoint("occupancy", depth + 1)
+
+    def sample(self, wr, level):
+        """``level`` is the number of entries before the operation."""
+        level = min(level, self.depth)
+        state = 0 if level == 0 else 2 if level == self.depth else 1
+        self.op_state.sample(0 if wr else 1, state)
+        self.occupancy.sample(level)
 
 
 class Scoreboard:
-    def __init__(self, queue, event):
+    def __init__(self, queue, credits, depth=16):
         self.queue = queue
-        self.event = event
-        self.arr = list()
+        self.credits = credits
+        self.model = FifoModel()
+        self.coverage = FifoCoverage(depth)
+        self.log = TbLogger("SCO")
 
     def print_list(self):
-        data_str = "Current FIFO Data : "
-        for i in self.arr:
-            data_str += f"{i.to_unsigned()} "
-
-        cocotb.log.info(data_str)
+        self.log.info(HIGH, "Current FIFO Data : %s", self.model.dump())
 
     async def compare_data(self):
         while True:
             temp = await self.queue.get()
-            temp.print_out("[SCO]")
+            if temp.wr != 1 and temp.rd != 1:
+                continue  # idle cycle, nothing was driven
+            temp.print_out(self.log, "[SCO]", MEDIUM)
+            self.coverage.sample(temp.wr == 1, len(self.model))
             if temp.wr == 1:
-                cocotb.log.info("Data Stored in FIFO")
-                self.arr.append(temp.din)
+                self.log.info(HIGH, "Data Stored in FIFO")
+                self.model.push(temp.din)
                 self.print_list()
             elif temp.rd == 1:
-                if len(self.arr) == 0:
-                    cocotb.log.info("FIFO is empty")
-                elif temp.dout == self.arr.pop(0):
-                    cocotb.log.info("Test Passed")
+                if self.model.empty:
+                    self.log.info(MEDIUM, "FIFO is empty")
+                elif temp.dout == self.model.pop():
+                    self.log.info(MEDIUM, "Test Passed")
                     self.print_list()
                 else:
-                    cocotb.log.error("Test Failed : Read Data Mismatch")
-            else:
-                cocotb.log.error("Test Failed : Unexpected input stimulus")
+                    self.log.error("Test Failed : Read Data Mismatch")
 
-            cocotb.log.info("-------------------------------------------")
+            self.log.info(MEDIUM, "-------------------------------------------")
 
-            self.event.set()
+            self.credits.release()
 
 
 @cocotb.test()
@@ -170,10 +241,10 @@ class Scoreboard:
 async def test(dut, id, test_type):
 
     dut._log.info(f"Length of memory: {len(dut.mem)}")
-    # Instantiate queues and event
+    # Instantiate queues and flow control
     queue_drv = Queue()
     queue_mon = Queue()
-    event = Event()
+    credits = CreditWindow(flow_window())
 
     # Number of transactions to be generated
     match test_type:
@@ -188,10 +259,10 @@ async def test(dut, id, test_type):
         case _:
             number_of_transactions = 10
     # Create objects
-    gen = Generator(queue_drv, event, number_of_transactions)
+    gen = Generator(queue_drv, credits, number_of_transactions)
     drv = Driver(queue_drv, dut)
     mon = Monitor(dut, queue_mon)
-    sco = Scoreboard(queue_mon, event)
+    sco = Scoreboard(queue_mon, credits, len(dut.mem))
 
     # Start clock
     cocotb.start_soon(Clock(dut.clk, 10, "ns").start())
@@ -204,6 +275,7 @@ async def test(dut, id, test_type):
     cocotb.start_soon(sco.compare_data())
 
     await gen.gen_data(test_type)
+    await credits.drain()
     while True:
         if queue_drv.empty() and queue_mon.empty():
             dut._log.info("All transactions processed.")
@@ -213,5 +285,105 @@ async def test(dut, id, test_type):
     dut._log.info("Cancelling driver and monitor processes.")
     driver_process.cancel()
     monitor_process.cancel()
+    mon.log.close()
+    sco.log.info(LOW, "%s", sco.coverage.db.report())
+    sco.coverage.db.save(coverage_path(f"fifo_{id}", cocotb.RANDOM_SEED))
 
     dut._log.info("===== Test completed successfull ====")
+
+
+@cocotb.test(skip=not bench_requested("test_flow_throughput"))
+@cocotb.parametrize(("window", [1, 4, 16]))
+async def test_flow_throughput(dut, window):
+    """Random traffic with a given credit window; window=1 is the old lockstep."""
+    queue_drv = Queue()
+    queue_mon = Queue()
+    credits = CreditWindow(window)
+
+    gen = Generator(queue_drv, credits, 200)
+    drv = Driver(queue_drv, dut)
+    mon = Monitor(dut, queue_mon)
+    sco = Scoreboard(queue_mon, credits)
+
+    cocotb.start_soon(Clock(dut.clk, 10, "ns").start())
+    await drv.reset_dut()
+
+    driver_process = cocotb.start_soon(drv.send_data())
+    monitor_process = cocotb.start_soon(mon.sample_data())
+    cocotb.start_soon(sco.compare_data())
+
+    with Throughput(
+        f"window={window}", unit="transactions", sim_time=lambda: get_sim_time("ns")
+    ) as tp:
+        await gen.gen_data("random")
+        await credits.drain()
+        tp.count = credits.retired
+
+    dut._log.info(tp.summary())
+    driver_process.cancel()
+    monitor_process.cancel()
+    mon.log.close()
+
+
+@cocotb.test(skip=not bench_requested("test_monitor_sampling"))
+async def test_monitor_sampling(dut):
+    """Samples/s of the legacy monitor, the Sampler monitor and a bulk capture.
+
+    Random traffic is driven on every cycle; each monitor is the only
+    consumer of its queue and the scoreboard-side conversion of every field
+    is included, so the comparison covers the whole sample-to-check path.
+    """
+    cycles = 2000
+    cocotb.start_soon(Clock(dut.clk, 10, "ns").start())
+    drv = Driver(Queue(), dut)
+    await drv.reset_dut()
+
+    async def traffic():
+        rng = random.Random(cocotb.RANDOM_SEED)
+        while True:
+            await dut.clk.falling_edge
+            wr = rng.getrandbits(1)
+            dut.wr.value = wr
+            dut.rd.value = 1 - wr
+            dut.din.value = rng.getrandbits(8)
+
+    async def consume(queue, n, convert):
+        for _ in range(n):
+            convert(await queue.get())
+
+    traffic_process = cocotb.start_soon(traffic())
+    rates = {}
+    for label, monitor_cls, convert in (
+        ("legacy Transaction", LegacyMonitor,
+         lambda t: (int(t.wr), int(t.rd), int(t.din), int(t.dout), int(t.empty), int(t.full))),
+        ("Sampler record", Monitor, FifoSample.ints),
+    ):
+        queue = Queue()
+        mon = monitor_cls(dut, queue)
+        with Throughput(label, unit="samples", sim_time=lambda: get_sim_time("ns")) as tp:
+            monitor_process = cocotb.start_soon(mon.sample_data())
+            await consume(queue, cycles, convert)
+            monitor_process.cancel()
+            tp.count = cycles
+        mon.log.close()
+        rates[label] = tp.rate
+        dut._log.info(tp.summary())
+
+    # Bulk capture: raw values only, one conversion to a NumPy array at the end
+    sampler = Sampler(dut, FifoSample, clock=dut.clk)
+    buffer = SampleBuffer(FifoSample)
+    with Throughput("SampleBuffer capture", unit="samples", sim_time=lambda: get_sim_time("ns")) as tp:
+        for _ in range(cycles):
+            buffer.append(await sampler.next())
+        capture = buffer.to_array()
+        tp.count = len(capture)
+    rates["SampleBuffer capture"] = tp.rate
+    dut._log.info(tp.summary())
+    traffic_process.cancel()
+
+    base = rates["legacy Transaction"]
+    dut._log.info(
+        "Speedup vs legacy monitor: "
+        + ", ".join(f"{k} {v / base:.1f}x" for k, v in rates.items() if k != "legacy Transaction")
+    )
+    assert capture["wr"].sum() + capture["rd"].sum() == cycles
@@ -1,9 +1,11 @@
 import cocotb
 from cocotb.clock import Clock
-from cocotb.triggers import ClockCycles, ReadOnly, Event
+from cocotb.triggers import ClockCycles, ReadOnly
 from cocotb.queue import Queue
 from cocotb_coverage.crv import Randomized
 
+from tb_utils.flow import CreditWindow, flow_window
+
 
 class Transaction(Randomized):
     def __init__(self):
@@ -19,20 +21,18 @@ class Transaction(Randomized):
 
 
 class Generator:
-    def __init__(self, queue, event, count):
+    def __init__(self, queue, credits, count):
         self.queue = queue
-        self.event = event
+        self.credits = credits
         self.count = count
-        self.event.clear()
 
     async def gen_data(self):
         for i in range(self.count):
             t = Transaction()
             t.randomize()
             t.print_in("[GEN]")
+            await self.credits.acquire()
             await self.queue.put(t)
-            await self.event.wait()
-            self.event.clear()
 
 
 class Driver:
@@ -92,9 +92,9 @@ class Monitor:
 
 
 class Scoreboard:
-    def __init__(self, queue, event):
+    def __init__(self, queue, credits):
         self.queue = queue
-        self.event = event
+        self.credits = credits
 
     async def compare_data(self):
         while True:
@@ -110,7 +110,7 @@ class Scoreboard:
                 )
 
             cocotb.log.info("--------------------------------")
-            self.event.set()
+            self.credits.release()
 
 
 @cocotb.test()
@@ -119,17 +119,17 @@ async def spi_master_slave_test(dut):
     Testbench for SPI Master-Slave communication.
     """
 
-    # Queues and Events
+    # Queues and flow control
     drv_queue = Queue()
     mon_queue = Queue()
-    gen_event = Event()
+    credits = CreditWindow(flow_window())
 
     n_data = 5
     # Instantiate components
-    gen = Generator(drv_queue, gen_event, count=n_data)
+    gen = Generator(drv_queue, credits, count=n_data)
     drv = Driver(dut, drv_queue)
     mon = Monitor(dut, mon_queue)
-    score = Scoreboard(mon_queue, gen_event)
+    score = Scoreboard(mon_queue, credits)
 
     # Create clock
     cocotb.start_soon(Clock(dut.clk, 10, unit="ns").start())
@@ -143,6 +143,7 @@ async def spi_master_slave_test(dut):
     cocotb.start_soon(score.compare_data())
 
     await gen.gen_data()  # Wait for generator to finish generating data
+    await credits.drain()
     cocotb.log.info("============= Generator finished generating data =============")
     while True:
         if drv_queue.empty() and mon_queue.empty():
@@ -1,10 +1,19 @@
 import os
 import shutil
 import subprocess
+import sys
 from pathlib import Path
 
 from cocotb_tools.runner import get_runner
 
+# Make the shared tb_utils package importable from the testbenches
+# (cocotb forwards this process' sys.path as the simulator's PYTHONPATH).
+REPO_ROOT = Path(__file__).resolve().parents[2]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from tb_utils.build_cache import cached_build  # noqa: E402
+
 
 def _try_run(cmd):
     try:
@@ -75,19 +84,20 @@ def test_spi_unified():
     build_args = ["--trace", "--trace-fst", "--trace-structs"] if sim_map[sim] == "verilator" else []
 
     for module_name, config in config_items:
-        runner.build(
+        build = cached_build(
+            runner,
             sources=config["sources"],
             hdl_toplevel=config["hdl_toplevel"],
             timescale=["1ns", "1ns"],
             build_args=build_args,
             waves=True,
-            always=True,
         )
 
         runner.test(
             hdl_toplevel=config["hdl_toplevel"],
             test_module=module_name,
             waves=True,
+            **build.test_kwargs(),
         )
 
     if sim_map[sim] == "questa":
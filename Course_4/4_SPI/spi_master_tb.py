@@ -1,9 +1,11 @@
 import cocotb
-from cocotb.triggers import ReadOnly, ClockCycles, Event
+from cocotb.triggers import ReadOnly, ClockCycles
 from cocotb.clock import Clock
 from cocotb_coverage.crv import Randomized
 from cocotb.queue import Queue
 
+from tb_utils.flow import CreditWindow, flow_window
+
 
 class Transaction(Randomized):
     def __init__(self):
@@ -22,20 +24,18 @@ class Transaction(Randomized):
 
 
 class Generator:
-    def __init__(self, queue, event, count):
+    def __init__(self, queue, credits, count):
         self.queue = queue
-        self.event = event
+        self.credits = credits
         self.count = count
-        self.event.clear()
 
     async def gen_data(self):
         for i in range(self.count):
             t = Transaction()
             t.randomize()
             t.print_in("[GEN]")
+            await self.credits.acquire()
             await self.queue.put(t)
-            await self.event.wait()
-            self.event.clear()
 
 
 class Driver:
@@ -93,9 +93,9 @@ class Monitor:
 
 
 class Scoreboard:
-    def __init__(self, queue, event):
+    def __init__(self, queue, credits):
         self.queue = queue
-        self.event = event
+        self.credits = credits
         self.arr = list()
 
     async def compare_data(self):
@@ -115,7 +115,7 @@ class Scoreboard:
                 )
 
             cocotb.log.info("--------------------------------------------------")
-            self.event.set()
+            self.credits.release()
 
 
 @cocotb.test()
@@ -124,17 +124,17 @@ async def spi_master(dut):
     SPI UVM-like Testbench in Cocotb
     """
 
-    # Queues and Events
+    # Queues and flow control
     drv_queue = Queue()
     mon_queue = Queue()
-    gen_event = Event()
+    credits = CreditWindow(flow_window())
 
     n_data = 5
     # Instantiate components
-    gen = Generator(drv_queue, gen_event, count=n_data)
+    gen = Generator(drv_queue, credits, count=n_data)
     drv = Driver(dut, drv_queue)
     mon = Monitor(dut, mon_queue)
-    sco = Scoreboard(mon_queue, gen_event)
+    sco = Scoreboard(mon_queue, credits)
 
     # Clock generation
     cocotb.start_soon(Clock(dut.clk, 10, unit="ns").start())  # 100 MHz clock
@@ -148,6 +148,7 @@ async def spi_master(dut):
     cocotb.start_soon(sco.compare_data())
 
     await gen.gen_data()  # Wait for generator to finish
+    await credits.drain()
     cocotb.log.info("============== Generator finished ==============")
     while True:
         if drv_queue.empty() and mon_queue.empty():
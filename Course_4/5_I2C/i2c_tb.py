@@ -1,9 +1,18 @@
+import random
+
 import cocotb
-from cocotb.triggers import ClockCycles, Event
+from cocotb.triggers import ClockCycles
 from cocotb.clock import Clock
 from cocotb_coverage.crv import Randomized
 from cocotb.queue import Queue
 
+from tb_utils.batch_rand import BatchRandomizer
+from tb_utils.flow import CreditWindow, flow_window
+from tb_utils.waits import wait_until
+
+# One transfer is ~20 SCL bits of sys_freq / i2c_freq = 400 clk cycles (i2c_m.sv)
+DONE_TIMEOUT = 4 * 20 * 400
+
 
 class Transaction(Randomized):
     def __init__(self):
@@ -31,16 +40,15 @@ class Transaction(Randomized):
 
 
 class Generator:
-    def __init__(self, queue, event, count):
+    def __init__(self, queue, credits, count):
         self.queue = queue
-        self.event = event
+        self.credits = credits
         self.count = count
 
     async def gen_data(self, dir_random=True):
         
-        for i in range(self.count):
-            tr = Transaction()
-            tr.randomize()
+        batch = BatchRandomizer(Transaction, seed=random.getrandbits(32)).generate(self.count)
+        for i, tr in enumerate(batch):
             if not dir_random:
                 dir_value = [123, 124, 125, 126, 127]
                 if i < 5:
@@ -50,9 +58,8 @@ class Generator:
                     tr.op = 1  # read operation
                     tr.addr = dir_value[i - 5]
             tr.print_in("[GEN]")
+            await self.credits.acquire()
             await self.queue.put(tr)
-            await self.event.wait()
-            self.event.clear()
 
 
 class driver:
@@ -80,7 +87,7 @@ class driver:
         tr.print_in("[DRV]")
         await ClockCycles(self.dut.clk, 5)
         self.dut.newd.value = 0
-        await self.dut.done.rising_edge
+        await wait_until(self.dut.done, 1, DONE_TIMEOUT, edge=True)
 
     async def rd_op(self, tr):
         self.dut.rst.value = 0
@@ -90,7 +97,7 @@ class driver:
         self.dut.op.value = 1
         await ClockCycles(self.dut.clk, 5)
         self.dut.newd.value = 0
-        await self.dut.done.rising_edge
+        await wait_until(self.dut.done, 1, DONE_TIMEOUT, edge=True)
         tr.dout = self.dut.dout.value
         tr.print_out("[DRV]")
 
@@ -122,9 +129,9 @@ class monitor:
 
 
 class scoreboard:
-    def __init__(self, queue, event):
+    def __init__(self, queue, credits):
         self.queue = queue
-        self.event = event
+        self.credits = credits
         self.mem = dict()
 
         # initialize all the elements to zero
@@ -151,7 +158,7 @@ class scoreboard:
 
             cocotb.log.info("-------------------------------------------")
 
-            self.event.set()
+            self.credits.release()
 
 
 @cocotb.test()
@@ -165,13 +172,13 @@ async def i2c_tb(dut, dir_random):
 
     gen_queue = Queue()
     mon_queue = Queue()
-    gen_event = Event()
+    credits = CreditWindow(flow_window())
 
     n_data = 10
-    gen = Generator(gen_queue, gen_event, count=n_data)
+    gen = Generator(gen_queue, credits, count=n_data)
     drv = driver(dut, gen_queue)
     mon = monitor(dut, mon_queue)
-    sco = scoreboard(mon_queue, gen_event)
+    sco = scoreboard(mon_queue, credits)
 
     clk = Clock(dut.clk, 10, unit="ns")
     cocotb.start_soon(clk.start())
@@ -184,6 +191,7 @@ async def i2c_tb(dut, dir_random):
     cocotb.start_soon(sco.compare_data())
 
     await generator_process
+    await credits.drain()
     cocotb.log.info("===== Generator process completed =====")
     while True:
         if gen_queue.empty() and mon_queue.empty():
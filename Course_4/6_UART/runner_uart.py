@@ -1,10 +1,26 @@
 import os
 import shutil
 import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
 from cocotb_tools.runner import get_runner
 
+# Make the shared tb_utils package importable from the testbenches
+# (cocotb forwards this process' sys.path as the simulator's PYTHONPATH).
+REPO_ROOT = Path(__file__).resolve().parents[2]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from tb_utils.build_cache import cached_build  # noqa: E402
+from tb_utils.regression import SuiteResult, merge_xunit  # noqa: E402
+
+# Simulators that apply Verilog parameters at elaboration time (test step),
+# so a single compiled image can serve the whole baud-rate matrix.
+RUNTIME_PARAMETER_SIMS = {"questa"}
+
 
 def _parse_baud_rates(raw_value):
     if not raw_value:
@@ -44,52 +60,113 @@ def _post_process_questa(sim_build_dir):
         _try_run(["vcd2fst", str(vcd), str(fst)])
 
 
-def test_uart():
-    sim = os.getenv("SIM", "icarus").lower()
-    sim_map = {
-        "verilator": "verilator",
-        "iverilog": "icarus",
-        "icarus": "icarus",
-        "questa": "questa",
-        "modelsim": "questa",
-    }
-    if sim not in sim_map:
-        raise ValueError(f"SIM not supported: {sim}")
+def _max_jobs(n_jobs):
+    raw = os.getenv("UART_JOBS")
+    jobs = int(raw) if raw else (os.cpu_count() or 1)
+    return max(1, min(jobs, n_jobs))
+
 
+def _run_baud_rate(sim, baud_rate):
+    """Build (or reuse) and simulate one baud rate in ``sim_build/baud_<rate>``."""
     proj_path = Path(__file__).resolve().parent
     sources = [
         proj_path / "uart.sv",
     ]
-    baud_rates = _parse_baud_rates(os.getenv("BAUD_RATES"))
+    test_dir = Path("sim_build") / f"baud_{baud_rate}"
+    test_dir.mkdir(parents=True, exist_ok=True)
 
-    runner = get_runner(sim_map[sim])
-    if sim_map[sim] == "verilator":
+    runner = get_runner(sim)
+    if sim == "verilator":
         build_args = ["--trace", "--trace-fst", "--trace-structs", "-I", str(proj_path)]
-    elif sim_map[sim] == "icarus":
+    elif sim == "icarus":
         build_args = ["-I", str(proj_path)]
     else:
         build_args = []
 
-    for baud_rate in baud_rates:
-        build_dir = proj_path / "sim_build" / f"baud_{baud_rate}"
-        runner.build(
-            sources=sources,
-            hdl_toplevel="uart",
-            timescale=["1ns", "1ps"],
-            build_args=build_args,
-            parameters={"baud_rate": baud_rate},
-            waves=True,
-            always=True,
-            build_dir=build_dir,
-        )
-
+    # With runtime parameter override every baud rate shares one image and
+    # the parameter is applied when the simulation is elaborated.
+    shared = sim in RUNTIME_PARAMETER_SIMS
+    params = {"baud_rate": baud_rate}
+
+    start = time.perf_counter()
+    build = cached_build(
+        runner,
+        sources=sources,
+        hdl_toplevel="uart",
+        timescale=["1ns", "1ps"],
+        build_args=build_args,
+        parameters={} if shared else params,
+        waves=True,
+        build_dir=test_dir,
+        log_file=test_dir / "build.log",
+    )
+
+    # Absolute path: under pytest (inherited by the pool workers) a relative
+    # or default name becomes <test_dir>/<pytest test>.result.xml instead.
+    results_xml = (Path(build.test_dir) / "results.xml").resolve()
+    error = None
+    try:
         runner.test(
             hdl_toplevel="uart",
             test_module="uart_tb",
             waves=True,
-            build_dir=build_dir,
+            parameters=params if shared else None,
             extra_env={"BAUD_RATE": str(baud_rate)},
+            log_file=test_dir / "sim.log",
+            results_xml=str(results_xml),
+            **build.test_kwargs(),
         )
+    except SystemExit as e:
+        error = f"simulator exited with code {e.code}, see {test_dir / 'sim.log'}"
+
+    if sim == "questa":
+        _post_process_questa(test_dir.resolve())
+
+    return SuiteResult(
+        f"uart[baud_rate={baud_rate}]",
+        [results_xml],
+        time.perf_counter() - start,
+        {"baud_rate": baud_rate, "build_cache": "hit" if build.hit else "miss",
+         "log": test_dir.resolve() / "sim.log"},
+        error,
+    )
+
+
+def test_uart():
+    sim = os.getenv("SIM", "icarus").lower()
+    sim_map = {
+        "verilator": "verilator",
+        "iverilog": "icarus",
+        "icarus": "icarus",
+        "questa": "questa",
+        "modelsim": "questa",
+    }
+    if sim not in sim_map:
+        raise ValueError(f"SIM not supported: {sim}")
+
+    baud_rates = _parse_baud_rates(os.getenv("BAUD_RATES"))
+    jobs = _max_jobs(len(baud_rates))
 
-        if sim_map[sim] == "questa":
-            _post_process_questa(build_dir)
+    start = time.perf_counter()
+    results = []
+    if sim_map[sim] in RUNTIME_PARAMETER_SIMS and jobs > 1:
+        # Compile the shared image once before the workers reuse it.
+        results.append(_run_baud_rate(sim_map[sim], baud_rates[0]))
+        baud_rates = baud_rates[1:]
+
+    if jobs == 1:
+        results += [_run_baud_rate(sim_map[sim], rate) for rate in baud_rates]
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            results += pool.map(_run_baud_rate, [sim_map[sim]] * len(baud_rates), baud_rates)
+    wall = time.perf_counter() - start
+
+    report = Path("sim_build").resolve() / "results.xml"
+    tests, failures = merge_xunit(results, report, name="uart")
+    serial = sum(r.wall for r in results)
+    print(
+        f"UART: {len(results)} baud rates on {jobs} workers, {tests} tests, {failures} failed. "
+        f"Wall {wall:.1f} s (sum of jobs {serial:.1f} s). Report: {report}"
+    )
+    if failures:
+        raise RuntimeError(f"{failures} UART test(s) failed, see {report}")
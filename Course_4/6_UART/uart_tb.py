@@ -1,11 +1,45 @@
 import os
 import cocotb
 import random
-from cocotb.triggers import ClockCycles, Event, ReadOnly
+from cocotb.triggers import ClockCycles, First, ReadOnly, Timer
 from cocotb.clock import Clock
+from cocotb.utils import get_sim_steps, get_sim_time
 from cocotb_coverage.crv import Randomized
 from cocotb.queue import Queue
 
+from tb_utils.dispatch import WakeupCounter
+from tb_utils.flow import CreditWindow, flow_window
+from tb_utils.perf import Throughput, bench_requested
+from tb_utils.sampler import Record, Sampler
+from tb_utils.waits import wait_until
+
+# clk_freq default of uart.sv (the runner only overrides baud_rate)
+CLK_FREQ = 1_000_000
+CLK_PERIOD_NS = 10
+BENCH_BYTES = 64
+
+# Bit-reversed value of every byte (the line is LSB first)
+REVERSE = bytes(int(f"{i:08b}"[::-1], 2) for i in range(256))
+# Line level of each bit period of a frame: start, data LSB first, stop
+FRAMES = tuple((0, *((byte >> i) & 1 for i in range(8)), 1) for byte in range(256))
+
+
+def frame_timeout(baud_rate, frames=4):
+    """clk cycles of ``frames`` UART frames (11 uclk periods of clk_freq / baud_rate)."""
+    return frames * 11 * (CLK_FREQ // baud_rate + 2)
+
+
+def bit_period_ns(baud_rate, clk_freq=CLK_FREQ, clk_period_ns=CLK_PERIOD_NS):
+    """uclk period of uart_tx/uart_rx: uclk toggles every clkcount / 2 + 1 clk cycles."""
+    return 2 * (clk_freq // baud_rate // 2 + 1) * clk_period_ns
+
+
+def reverse_bits(data):
+    """Bit-reversed byte (``int``) or bytes of a ``bytes``/``memoryview`` buffer."""
+    if isinstance(data, int):
+        return REVERSE[data & 0xFF]
+    return bytes(data).translate(REVERSE)
+
 
 class Transaction(Randomized):
     def __init__(self):
@@ -24,11 +58,10 @@ class Transaction(Randomized):
 
 
 class Generator:
-    def __init__(self, queue, event, count):
+    def __init__(self, queue, credits, count):
         self.queue = queue
-        self.event = event
+        self.credits = credits
         self.count = count
-        self.event.clear()
 
     async def gen_data(self):
         for _ in range(self.count):
@@ -37,9 +70,149 @@ class Generator:
             cocotb.log.info(
                 f"Generated transaction: oper={temp.oper:03d}, dintx={temp.dintx:03d}"
             )
+            await self.credits.acquire()
             await self.queue.put(temp)
-            await self.event.wait()
-            self.event.clear()
+
+
+class UartBFM:
+    """Byte-level access to the UART pins without a Python wakeup per bit period.
+
+    Bit times are computed from the uclk divider of the RTL
+    (:func:`bit_period_ns`) instead of awaiting every uclk edge:
+
+    - :meth:`send_rx` syncs once to a uclk edge and schedules one ``Timer``
+      per level change of ``rx`` (runs of equal bits cost nothing).
+    - :meth:`receive_tx` wakes only on ``tx`` changes and reads the bits at
+      the middle of each bit period from their timestamps.
+    - :meth:`send_tx` and :meth:`receive_rx` wake once per byte, on
+      ``donetx``/``donerx``.
+
+    All of them take or return whole bytes: an ``int``, ``bytes`` or a
+    ``memoryview``.
+    """
+
+    def __init__(self, dut, baud_rate):
+        self.dut = dut
+        self.rx = dut.rx
+        self.tx = dut.tx
+        self.newd = dut.newd
+        self.dintx = dut.dintx
+        self.doutrx = dut.doutrx
+        self.donetx = dut.donetx
+        self.donerx = dut.donerx
+        self.uclk_edge = dut.uart_rx_inst.uclk.rising_edge
+        self.clk_falling = dut.clk.falling_edge
+        self.period = get_sim_steps(bit_period_ns(baud_rate), "ns")
+        self.timeout = frame_timeout(baud_rate)
+
+    async def measure_period(self):
+        """uclk period in sim steps, measured between two rising edges."""
+        await self.uclk_edge
+        start = get_sim_time("step")
+        await self.uclk_edge
+        return get_sim_time("step") - start
+
+    def rx_changes(self, data):
+        """(offset, level) writes on ``rx`` for back-to-back frames of ``data``.
+
+        Offsets are sim steps from the uclk edge the frames start at; each
+        level is written in the middle of its uclk period, so uart_rx sees the
+        start bit on the next edge and data bit i on the (2 + i)-th. A frame
+        is 10 periods: its stop bit covers the edge that raises ``donerx``.
+        """
+        period = self.period
+        frame = 10 * period
+        changes = []
+        level = 1
+        for k, byte in enumerate(data):
+            origin = k * frame + period // 2
+            for j, bit in enumerate(FRAMES[byte]):
+                if bit != level:
+                    changes.append((origin + j * period, bit))
+                    level = bit
+        return changes
+
+    async def send_rx(self, data):
+        """Serialize ``data`` on ``rx``; return when uart_rx raised ``donerx`` for the last byte."""
+        if isinstance(data, int):
+            data = (data,)
+        changes = self.rx_changes(data)
+        rx = self.rx
+        await self.uclk_edge
+        origin = get_sim_time("step")
+        for offset, level in changes:
+            await Timer(origin + offset - get_sim_time("step"), "step")
+            rx.value = level
+        await wait_until(self.donerx, 1, self.timeout, edge=True)
+
+    async def receive_rx(self, n):
+        """``doutrx`` of the next ``n`` frames received by uart_rx."""
+        out = bytearray()
+        done = self.donerx.rising_edge
+        for _ in range(n):
+            await done
+            await ReadOnly()
+            out.append(int(self.doutrx.value))
+        return bytes(out)
+
+    async def send_tx(self, data):
+        """Send ``data`` through uart_tx back-to-back; return after the last ``donetx``.
+
+        ``newd`` stays high for the whole buffer: uart_tx only samples it in
+        idle, one uclk edge after ``donetx``, and ``dintx`` is updated on
+        ``donetx`` for the next frame.
+        """
+        if isinstance(data, int):
+            data = (data,)
+        await self.clk_falling
+        self.newd.value = 1
+        last = len(data) - 1
+        for i, byte in enumerate(data):
+            self.dintx.value = byte
+            await wait_until(self.donetx, 1, self.timeout, edge=True)
+            if i == last:
+                self.newd.value = 0
+
+    async def tx_frame(self):
+        """Byte of the frame whose start bit just fell on ``tx``.
+
+        Returns in the middle of the stop bit, before uart_tx can start the
+        next frame.
+        """
+        tx = self.tx
+        period = self.period
+        start = get_sim_time("step")
+        end = start + 9 * period + period // 2
+        changes = []
+        change = tx.value_change
+        while True:
+            remaining = end - get_sim_time("step")
+            if remaining <= 0:
+                break
+            fired = await First(change, Timer(remaining, "step"))
+            if fired is not change:
+                break
+            changes.append((get_sim_time("step") - start, int(tx.value)))
+
+        byte = 0
+        level = 0
+        k = 0
+        for i in range(8):
+            sample = (i + 1) * period + period // 2
+            while k < len(changes) and changes[k][0] <= sample:
+                level = changes[k][1]
+                k += 1
+            byte |= level << i
+        return byte
+
+    async def receive_tx(self, n):
+        """Bytes of the next ``n`` frames sent by uart_tx on ``tx``."""
+        out = bytearray()
+        start_bit = self.tx.falling_edge
+        for _ in range(n):
+            await start_bit
+            out.append(await self.tx_frame())
+        return bytes(out)
 
 
 class Driver:
@@ -51,15 +224,8 @@ class Driver:
         self.dout = 0
         self.rout = 0
         self.rx = 0
-
-    def reverse_Bits(self, n, nbits=8):
-
-        result = 0
-        for i in range(nbits):
-            result <<= 1
-            result |= n & 1
-            n >>= 1
-        return result
+        self.timeout = frame_timeout(_get_baud_rate())
+        self.bfm = UartBFM(dut, _get_baud_rate())
 
     async def reset_dut(self):
         self.dut.rst.value = 1
@@ -82,7 +248,43 @@ class Driver:
         self.dut.newd.value = 0
         await self.queueds.put(dintx)
         cocotb.log.info(f"[DRV]: Data Transmitted {int(dintx):03d}")
-        await self.dut.donetx.rising_edge
+        await wait_until(self.dut.donetx, 1, self.timeout, edge=True)
+
+    async def data_rx(self):
+        self.dut.newd.value = 0
+        # Same draws as the per-bit driver: wire order, first bit drawn in the MSB
+        self.dout = 0
+        for _ in range(8):
+            self.dout = (self.dout << 1) | random.randint(0, 1)
+
+        self.rout = reverse_bits(self.dout)
+        await self.queueds.put(self.rout)
+        cocotb.log.info(f"[DRV]: Data RCVD {int(self.rout):03d}")
+        await self.bfm.send_rx(self.rout)
+
+    async def send_data(self):
+        while True:
+            temp = Transaction()
+            temp = await self.queuegd.get()
+            dintx = temp.dintx
+            if temp.oper == 1:
+                await self.data_tx(dintx)
+            else:
+                await self.data_rx()
+
+
+class LegacyDriver(Driver):
+    """Previous per-bit driver (one uclk wakeup per bit), kept for the
+    throughput benchmark."""
+
+    def reverse_Bits(self, n, nbits=8):
+
+        result = 0
+        for i in range(nbits):
+            result <<= 1
+            result |= n & 1
+            n >>= 1
+        return result
 
     async def data_rx(self):
         await self.dut.uart_rx_inst.uclk.rising_edge
@@ -101,26 +303,60 @@ class Driver:
         self.rout = self.reverse_Bits(self.dout, 8)
         await self.queueds.put(self.rout)
         cocotb.log.info(f"[DRV]: Data RCVD {int(self.rout):03d}")
-        await self.dut.donerx.rising_edge
+        await wait_until(self.dut.donerx, 1, self.timeout, edge=True)
         self.dut.rx.value = 1
 
-    async def send_data(self):
+
+class UartLineSample(Record):
+    """Inputs that tell the monitor which operation starts on a uclk edge."""
+
+    __slots__ = ()
+    fields = ("newd", "rx")
+
+
+class Monitor:
+    """Wakes on the start bit of a ``tx`` frame or on ``donerx``, not on every uclk edge."""
+
+    def __init__(self, dut, queuems):
+        self.dut = dut
+        self.queuems = queuems
+        self.rout = 0
+        self.bfm = UartBFM(dut, _get_baud_rate())
+        self.doutrx = dut.doutrx
+        self.tx_start = dut.tx.falling_edge
+        self.donerx_edge = dut.donerx.rising_edge
+
+    async def sample_data(self):
+        tx_start = self.tx_start
+        donerx = self.donerx_edge
         while True:
-            temp = Transaction()
-            temp = await self.queuegd.get()
-            dintx = temp.dintx
-            if temp.oper == 1:
-                await self.data_tx(dintx)
+            fired = await First(tx_start, donerx)
+            if fired is donerx:
+                await ReadOnly()
+                self.rout = int(self.doutrx.value)
+                cocotb.log.info(f"[MON]: RX DATA: {int(self.rout):03d}")
             else:
-                await self.data_rx()
+                self.rout = await self.bfm.tx_frame()
+                cocotb.log.info(f"[MON]: TX DATA: {int(self.rout):03d}")
+            await self.queuems.put(self.rout)
 
 
-class Monitor:
+class LegacyMonitor:
+    """Previous monitor (every uclk edge, bit by bit on tx), kept for the
+    throughput benchmark."""
+
     def __init__(self, dut, queuems):
         self.dut = dut
         self.queuems = queuems
         self.dout = 0
         self.rout = 0
+        # Handles and edge triggers resolved once instead of on every edge
+        self.line = Sampler(dut, UartLineSample)
+        self.tx = dut.tx
+        self.doutrx = dut.doutrx
+        self.uclk_edge = dut.uart_tx_inst.uclk.rising_edge
+        self.donetx_edge = dut.donetx.rising_edge
+        self.donerx_edge = dut.donerx.rising_edge
 
     def reverse_Bits(self, n, no_of_bits):
         result = 0
@@ -131,34 +367,37 @@ class Monitor:
         return result
 
     async def sample_data(self):
+        uclk_edge = self.uclk_edge
+        tx = self.tx
         while True:
-            await self.dut.uart_tx_inst.uclk.rising_edge
-            if self.dut.newd.value == 1 and self.dut.rx.value == 1:
-                await self.dut.uart_tx_inst.uclk.rising_edge
+            await uclk_edge
+            line = self.line.sample()
+            if line.newd == 1 and line.rx == 1:
+                await uclk_edge
                 for i in range(8):
-                    await self.dut.uart_tx_inst.uclk.rising_edge
-                    self.dout = (self.dout << 1) | int(self.dut.tx.value)
+                    await uclk_edge
+                    self.dout = (self.dout << 1) | int(tx.value)
 
                 self.rout = self.reverse_Bits(self.dout, 8)
                 cocotb.log.info(f"[MON]: TX DATA: {int(self.rout):03d}")
-                await self.dut.donetx.rising_edge
-                await self.dut.uart_tx_inst.uclk.rising_edge
+                await self.donetx_edge
+                await uclk_edge
                 await self.queuems.put(self.rout)
 
-            elif self.dut.rx.value == 0 and self.dut.newd.value == 0:
-                await self.dut.donerx.rising_edge
+            elif line.rx == 0 and line.newd == 0:
+                await self.donerx_edge
                 await ReadOnly()
-                self.rout = int(self.dut.doutrx.value)
+                self.rout = int(self.doutrx.value)
                 cocotb.log.info(f"[MON]: RX DATA: {int(self.rout):03d}")
-                await self.dut.uart_tx_inst.uclk.rising_edge
+                await uclk_edge
                 await self.queuems.put(self.rout)
 
 
 class Scoreboard:
-    def __init__(self, queuems, queueds, event):
+    def __init__(self, queuems, queueds, credits):
         self.queuems = queuems
         self.queueds = queueds
-        self.event = event
+        self.credits = credits
 
     async def compare_data(self):
         while True:
@@ -173,7 +412,7 @@ class Scoreboard:
 
             cocotb.log.info("-------------------------------------------")
 
-            self.event.set()
+            self.credits.release()
 
 
 def _get_baud_rate():
@@ -187,14 +426,14 @@ async def uart_test_tb(dut):
     queuegd = Queue()
     queueds = Queue()
     queuems = Queue()
-    event = Event()
+    credits = CreditWindow(flow_window())
 
     n_data = 5
-    gen = Generator(queuegd, event, n_data)
+    gen = Generator(queuegd, credits, n_data)
     drv = Driver(queuegd, queueds, dut)
 
     mon = Monitor(dut, queuems)
-    sco = Scoreboard(queuems, queueds, event)
+    sco = Scoreboard(queuems, queueds, credits)
 
     cocotb.start_soon(Clock(dut.clk, 10, "ns").start())
 
@@ -207,6 +446,7 @@ async def uart_test_tb(dut):
 
     await generator_process
     cocotb.log.info("========== All Transactions Generated ==========")
+    await credits.drain()
     while True:
         if queueds.empty() and queuems.empty() and queuegd.empty():
             cocotb.log.info("========== All Transactions Processed ==========")
@@ -219,3 +459,77 @@ async def uart_test_tb(dut):
     monitor_process.cancel()
 
     cocotb.log.info("========== Test Completed ==========")
+
+
+@cocotb.test(
+    name=f"test_uart_throughput_{_get_baud_rate()}",
+    skip=not bench_requested("test_uart_throughput"),
+)
+async def uart_throughput(dut):
+    """Bytes per wall-second of the per-bit driver/monitor and of UartBFM.
+
+    Each direction is run with the legacy classes (one byte at a time, as in
+    uart_test_tb) and with UartBFM on a whole buffer, and both must deliver
+    the bytes unchanged. Skipped unless requested; run every rate with
+    ``BENCH=1 BAUD_RATES=9600,19200,57600,115200 pytest runner_uart.py``.
+    """
+    baud_rate = _get_baud_rate()
+    n = BENCH_BYTES
+    cocotb.start_soon(Clock(dut.clk, CLK_PERIOD_NS, "ns").start())
+    queueds = Queue()
+    queuems = Queue()
+    drv = LegacyDriver(Queue(), queueds, dut)
+    await drv.reset_dut()
+    bfm = drv.bfm
+    assert await bfm.measure_period() == bfm.period, "bit_period_ns does not match uclk"
+
+    rng = random.Random(cocotb.RANDOM_SEED)
+    payload = bytes(rng.getrandbits(8) for _ in range(n))
+
+    async def legacy(direction):
+        sent = bytearray()
+        got = bytearray()
+        monitor_process = cocotb.start_soon(LegacyMonitor(dut, queuems).sample_data())
+        for byte in payload:
+            if direction == "tx":
+                await drv.data_tx(byte)
+            else:
+                await drv.data_rx()
+            sent.append(await queueds.get())
+            got.append(await queuems.get())
+        monitor_process.cancel()
+        return bytes(sent), bytes(got)
+
+    async def tx_bfm():
+        receiver = cocotb.start_soon(bfm.receive_tx(n))
+        await bfm.send_tx(memoryview(payload))
+        return payload, await receiver
+
+    async def rx_bfm():
+        receiver = cocotb.start_soon(bfm.receive_rx(n))
+        await bfm.send_rx(memoryview(payload))
+        return payload, await receiver
+
+    rates = {}
+    for label, run in (
+        ("TX per-bit", lambda: legacy("tx")),
+        ("TX UartBFM", tx_bfm),
+        ("RX per-bit", lambda: legacy("rx")),
+        ("RX UartBFM", rx_bfm),
+    ):
+        with WakeupCounter() as wakeups, Throughput(
+            f"{label} {baud_rate} baud", unit="bytes", sim_time=lambda: get_sim_time("ns")
+        ) as tp:
+            sent, got = await run()
+            tp.count = len(got)
+        assert got == sent, f"{label}: sent {sent.hex()} received {got.hex()}"
+        rates[label] = tp.rate
+        per_byte = f"{wakeups.count / n:.1f} wakeups/byte" if wakeups.available else "wakeups n/a"
+        dut._log.info(f"{tp.summary()} | {per_byte}")
+        await Timer(2 * bit_period_ns(baud_rate), "ns")  # idle line between runs
+
+    for direction in ("TX", "RX"):
+        dut._log.info(
+            f"{direction} UartBFM speedup at {baud_rate} baud: "
+            f"{rates[f'{direction} UartBFM'] / rates[f'{direction} per-bit']:.1f}x"
+        )
@@ -43,8 +43,9 @@ class VerificationComparator:
         print(f"Módulo: {module_name}")
         print(f"{'='*70}\n")
         
-        # Ejecutar make con el módulo específico
-        cmd = f"make SIM=icarus TOPLEVEL=filter MODULE={module_name}"
+        # Ejecutar make con el módulo específico, con el mismo presupuesto de
+        # ciclos para todos (sin parada por cobertura) y sin modelos guardados
+        cmd = f"CLOSURE=0 MODEL_STORE=0 make SIM=icarus TOPLEVEL=filter MODULE={module_name}"
         
         start_time = time.time()
         
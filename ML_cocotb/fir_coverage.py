@@ -0,0 +1,39 @@
+# fir_coverage.py
+"""
+Cobertura funcional del filtro FIR (filter.v), común a los testbenches random
+y guiados por ML para que la comparación use los mismos bins.
+
+- data_in:   8 rangos de 32 valores de la entrada (-128..127).
+- magnitude: 8 rangos de 4096 de |data_out| (el último incluye 32768).
+- overflow:  salida overflow_detected en 0 y en 1.
+"""
+import cocotb
+
+from tb_utils.coverage_db import CoverageDB, coverage_path
+
+
+class FirCoverage:
+    def __init__(self):
+        self.db = CoverageDB("fir")
+        cg = self.db.covergroup("fir")
+        self.data_in = cg.coverpoint(
+            "data_in", [f"[{lo},{lo + 31}]" for lo in range(-128, 128, 32)])
+        self.magnitude = cg.coverpoint(
+            "magnitude", [f"[{lo},{lo + 4095}]" for lo in range(0, 32768, 4096)])
+        self.overflow = cg.coverpoint("overflow", ["0", "1"])
+
+    def sample(self, data_in, magnitude, overflow):
+        self.data_in.sample((data_in + 128) >> 5)
+        self.magnitude.sample(min(magnitude >> 12, 7))
+        self.overflow.sample(1 if overflow else 0)
+
+    @property
+    def coverage(self):
+        return self.db.coverage
+
+    def report(self):
+        return self.db.report()
+
+    def save(self, test_name):
+        """Escribe la base de cobertura (fusionable con python -m tb_utils.coverage_db)."""
+        return self.db.save(coverage_path(test_name, cocotb.RANDOM_SEED))
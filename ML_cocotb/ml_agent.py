@@ -2,13 +2,32 @@
 import numpy as np
 from sklearn.ensemble import RandomForestClassifier
 
+from training_policy import policy_from_env
+from training_service import ModelTrainer
+
 class MLGuider:
-    def __init__(self):
-        # Usamos Random Forest para manejar múltiples variables
-        self.model = RandomForestClassifier(n_estimators=10)
-        self.X = [] # [data_in, c0, c1, c2]
-        self.y = [] # ¿Hubo overflow?
-        self.trained = False
+    def __init__(self, policy=None, background=None, store=None):
+        # Usamos Random Forest para manejar múltiples variables.
+        # La política guarda el dataset: X = [data_in, c0, c1, c2], y = ¿Hubo overflow?
+        # Por defecto reentrena todo cada 10 muestras (ver training_policy.py);
+        # el entrenador puede ajustar en background y retomar el modelo de una
+        # simulación anterior desde `store` (ver training_service.py)
+        self.trainer = ModelTrainer(
+            RandomForestClassifier(n_estimators=10),
+            policy if policy is not None else policy_from_env(every=10),
+            background,
+            store,
+            schema={"features": ["data_in", "c0", "c1", "c2"], "target": "overflow_detected"},
+        )
+        self.n_candidates = 100 # Candidatos evaluados por estímulo
+
+    @property
+    def model(self):
+        return self.trainer.model
+
+    @property
+    def trained(self):
+        return self.trainer.trained
 
     # def get_stimulus(self):
     #     if not self.trained:
@@ -24,32 +43,41 @@ class MLGuider:
     #     return candidates[np.argmax(probs)]
     
     def get_stimulus(self):
+        return self.get_stimulus_batch(1)[0]
+
+    def get_stimulus_batch(self, k):
+        """
+        Propone K estímulos [data_in, c0, c1, c2] con una sola llamada a
+        predict_proba: los K*100 candidatos se evalúan juntos y se elige el
+        mejor de cada grupo de 100. Con K=1 equivale a la versión por ciclo.
+        """
         # Fase 1: Si no está entrenado, exploración pura
         if not self.trained:
-            return np.random.randint(-128, 127, size=4)
+            return np.random.randint(-128, 127, size=(k, 4))
         
-        # Generamos candidatos para que el modelo evalúe
-        candidates = np.random.randint(-128, 127, size=(100, 4))
+        # Generamos candidatos para que el modelo evalúe (100 por estímulo)
+        n = self.n_candidates
+        candidates = np.random.randint(-128, 127, size=(k, n, 4))
         
-        # Obtenemos probabilidades
-        probs_matrix = self.model.predict_proba(candidates)
+        # Obtenemos probabilidades de todos los candidatos a la vez
+        # (se usa el último modelo publicado por el entrenador)
+        probs_matrix = self.model.predict_proba(candidates.reshape(k * n, 4))
         
         # CORRECCIÓN TUYA APLICADA:
         # Verificamos si el modelo conoce la clase '1' (overflow)
         if probs_matrix.shape[1] < 2:
             # Si solo hay una columna, el modelo aún no sabe predecir fallos.
             # Seguimos explorando al azar dentro de los candidatos.
-            return candidates[np.random.randint(0, 100)]
+            return candidates[np.arange(k), np.random.randint(0, n, size=k)]
         
         # Fase 2: Explotación. Elegimos el candidato con mayor probabilidad de overflow (columna 1)
-        probs_overflow = probs_matrix[:, 1]
-        best_candidate_idx = np.argmax(probs_overflow)
+        probs_overflow = probs_matrix[:, 1].reshape(k, n)
+        best_candidate_idx = np.argmax(probs_overflow, axis=1)
         
-        return candidates[best_candidate_idx]
+        return candidates[np.arange(k), best_candidate_idx]
     
     def record_result(self, stimulus, hit):
-        self.X.append(stimulus)
-        self.y.append(hit)
-        if len(self.y) % 10 == 0: # Entrenar cada 10 muestras
-            self.model.fit(self.X, self.y)
-            self.trained = True
\ No newline at end of file
+        self.trainer.add(stimulus, hit)
+
+    def close(self):
+        self.trainer.close()
\ No newline at end of file
@@ -1,13 +1,30 @@
 import numpy as np
 from sklearn.ensemble import RandomForestRegressor 
 
+from training_policy import policy_from_env
+from training_service import ModelTrainer
+
 class MLGuider:
-    def __init__(self):
-        # Usamos Regressor para predecir la magnitud de la salida
-        self.model = RandomForestRegressor(n_estimators=10)
-        self.X = [] 
-        self.y = [] # Ahora 'y' será la magnitud absoluta de la salida (abs(data_out))
-        self.trained = False
+    def __init__(self, policy=None, background=None, store=None):
+        # Usamos Regressor para predecir la magnitud de la salida.
+        # 'y' será la magnitud absoluta de la salida (abs(data_out)); la política
+        # reentrena cada 10 muestras por defecto (ver training_policy.py) y
+        # `store` permite retomar el modelo anterior (ver training_service.py)
+        self.trainer = ModelTrainer(
+            RandomForestRegressor(n_estimators=10),
+            policy if policy is not None else policy_from_env(every=10),
+            background,
+            store,
+            schema={"features": ["data_in", "c0", "c1", "c2"], "target": "abs(data_out)"},
+        )
+
+    @property
+    def model(self):
+        return self.trainer.model
+
+    @property
+    def trained(self):
+        return self.trainer.trained
 
     def get_stimulus(self):
         # Fase 1: Exploración pura si no hay suficientes datos
@@ -30,9 +47,8 @@ class MLGuider:
         return candidates[best_candidate_idx]
 
     def record_result(self, stimulus, output_magnitude):
-        self.X.append(stimulus)
-        self.y.append(output_magnitude) # Guardamos qué tan grande fue la salida
-        
-        if len(self.y) >= 10 and len(self.y) % 10 == 0:
-            self.model.fit(self.X, self.y)
-            self.trained = True
\ No newline at end of file
+        # Guardamos qué tan grande fue la salida
+        self.trainer.add(stimulus, output_magnitude)
+
+    def close(self):
+        self.trainer.close()
\ No newline at end of file
@@ -2,61 +2,112 @@ import numpy as np
 from sklearn.ensemble import RandomForestRegressor
 from collections import deque
 
+from training_policy import policy_from_env
+from training_service import ModelTrainer
+
 class TemporalMLGuider:
-    def __init__(self, history_depth=3):
+    def __init__(self, history_depth=3, policy=None, background=None, store=None):
         """
         history_depth: Cuántos pasos hacia atrás recordar. 
         Para un filtro de 3 taps, necesitamos al menos los últimos 2 valores + el actual.
+        policy: Política de entrenamiento (training_policy.py). Por defecto
+        reentrena todo el historial cada 50 ciclos.
+        background: Entrenar en un hilo aparte (training_service.py).
+        store: ModelStore para retomar el modelo y el historial de una
+        simulación anterior (tb_utils/model_store.py).
         """
         self.history_depth = history_depth
         
         # Buffer para guardar las entradas anteriores (iniciamos con ceros)
         self.input_history = deque([0]*history_depth, maxlen=history_depth)
         
-        # Modelo de Regresión
-        self.model = RandomForestRegressor(n_estimators=20, random_state=42)
-        
-        # Dataset de entrenamiento
-        self.X_train = [] 
-        self.y_train = []
-        self.trained = False
+        # Modelo de Regresión; el dataset lo administra la política y el
+        # ajuste lo ejecuta el entrenador (en línea o en background)
+        features = ["x_t"] + [f"x_t-{d}" for d in range(1, history_depth)] + ["coeffs..."]
+        self.trainer = ModelTrainer(
+            RandomForestRegressor(n_estimators=20, random_state=42),
+            policy if policy is not None else policy_from_env(every=50),
+            background,
+            store,
+            schema={"features": features, "target": "abs(data_out)"},
+        )
         self.cycle_count = 0
 
+        # Candidatos evaluados por ciclo y matrices de trabajo preasignadas
+        self.n_candidates = 100
+        self._buffers = {}
+
     def get_stimulus(self, current_coeffs):
         """
         Propone el siguiente 'data_in' basado en la historia y los coeficientes actuales.
-        Retorna: (best_data_in, full_feature_vector)
+        Retorna: best_data_in
+        """
+        return self.get_stimulus_batch(current_coeffs, 1)[0]
+
+    def get_stimulus_batch(self, current_coeffs, k):
+        """
+        Propone los próximos K valores de 'data_in' con una sola llamada al modelo.
+
+        Se generan N secuencias candidatas de longitud K; para cada paso de cada
+        secuencia se arma el vector [x_t, x_t-1, x_t-2, Coeficientes] usando la
+        historia real seguida de los valores previos de la propia secuencia
+        (ventana deslizante), se predicen las N*K filas juntas y se elige la
+        secuencia con mayor magnitud total predicha. Con K=1 equivale al
+        comportamiento por ciclo.
+        Retorna: np.ndarray de K enteros
         """
         # Fase 1: Exploración (o si hay pocos datos)
-        if not self.trained or np.random.rand() < 0.15: # 15% exploración forzada
-            return np.random.randint(-128, 127)
+        if not self.trained:
+            return np.random.randint(-128, 127, size=k)
 
         # Fase 2: Explotación Inteligente
-        # Generamos 100 candidatos posibles para el "siguiente valor"
-        candidates = np.random.randint(-128, 127, size=100)
-        
-        # Construimos la matriz de características para los candidatos:
-        # Cada fila será: [Candidato, Historia_t-1, Historia_t-2, Coef0, Coef1, Coef2]
-        # Nota: La historia es FIJA para todos los candidatos en este ciclo.
-        history_features = list(self.input_history)[:-1] # Tomamos t-1 y t-2
-        
-        # Creamos una matriz donde repetimos la historia y coeficientes para cada candidato
-        base_features = history_features + list(current_coeffs)
-        candidate_matrix = []
-        
-        for cand in candidates:
-            # Feature Vector: [Candidato_Actual] + [Historia Pasada] + [Coeficientes]
-            row = [cand] + base_features
-            candidate_matrix.append(row)
-            
-        candidate_matrix = np.array(candidate_matrix)
-
-        # El modelo predice la magnitud de salida para cada candidato
-        predictions = self.model.predict(candidate_matrix)
-        
-        # Elegimos el candidato que promete la mayor salida
-        best_idx = np.argmax(predictions)
-        return candidates[best_idx]
+        n = self.n_candidates
+        depth = self.history_depth
+        candidates = np.random.randint(-128, 127, size=(n, k))
+
+        # Secuencia extendida por candidato, de la más antigua a la más nueva:
+        # [t-2, t-1, c_0, c_1, ..., c_k-1] (la historia es común a todos)
+        past = np.array(list(self.input_history)[:depth - 1][::-1])
+        extended = self._buffer("extended", (n, k + depth - 1))
+        extended[:, :depth - 1] = past
+        extended[:, depth - 1:] = candidates
+
+        # Ventanas [x_t, x_t-1, x_t-2] para cada (candidato, paso) + coeficientes
+        windows = np.lib.stride_tricks.sliding_window_view(extended, depth, axis=1)
+        n_coeffs = len(current_coeffs)
+        rows = self._buffer("rows", (n, k, depth + n_coeffs))
+        rows[:, :, :depth] = windows[:, :, ::-1]
+        rows[:, :, depth:] = current_coeffs
+
+        # El modelo predice la magnitud de salida de todas las filas a la vez
+        predictions = self.model.predict(rows.reshape(n * k, -1)).reshape(n, k)
+
+        # Elegimos la secuencia que promete la mayor salida acumulada
+        best = candidates[np.argmax(predictions.sum(axis=1))]
+
+        # 15% de exploración forzada por ciclo
+        explore = np.random.rand(k) < 0.15
+        best[explore] = np.random.randint(-128, 127, size=int(explore.sum()))
+        return best
+
+    @property
+    def model(self):
+        return self.trainer.model
+
+    @property
+    def trained(self):
+        return self.trainer.trained
+
+    def close(self):
+        self.trainer.close()
+
+    def _buffer(self, name, shape):
+        """Matriz de trabajo reutilizada entre llamadas mientras no cambie de forma."""
+        buf = self._buffers.get(name)
+        if buf is None or buf.shape != shape:
+            buf = np.empty(shape, dtype=np.int64)
+            self._buffers[name] = buf
+        return buf
 
     def record_result(self, data_in_used, coeffs_used, output_magnitude):
         """
@@ -70,15 +121,11 @@ class TemporalMLGuider:
         # [Entrada_Usada, t-1, t-2, Coeffs...]
         features = [data_in_used] + history_features + list(coeffs_used)
         
-        self.X_train.append(features)
-        self.y_train.append(output_magnitude)
+        # 3. La política guarda la muestra y decide si toca reentrenar
+        # (por defecto cada 50 ciclos para no hacerlo muy lento)
+        self.trainer.add(features, output_magnitude)
         
-        # 3. ACTUALIZAMOS LA MEMORIA con el dato nuevo
+        # 4. ACTUALIZAMOS LA MEMORIA con el dato nuevo
         self.input_history.appendleft(data_in_used)
         
-        self.cycle_count += 1
-
-        # Re-entrenamos cada 50 ciclos para no hacerlo muy lento
-        if self.cycle_count >= 50 and self.cycle_count % 50 == 0:
-            self.model.fit(self.X_train, self.y_train)
-            self.trained = True
\ No newline at end of file
+        self.cycle_count += 1
\ No newline at end of file
@@ -0,0 +1,188 @@
+# replay_wrapper.py
+"""
+Generador del wrapper HDL de reproducción de estímulos (filter_replay.v)
+
+En el testbench aleatorio cada ciclo cuesta varias idas y vueltas entre Python
+y el simulador (escribir data_in, esperar el flanco, leer data_out y
+overflow_detected), aunque el estímulo se puede calcular de antemano. El
+wrapper generado rodea al DUT con memorias de testbench:
+
+- <stim>_block: BLOCK estímulos empaquetados (el i-ésimo en los bits
+  [i*W +: W]), escritos por Python en una sola asignación.
+- <salida>_block: una memoria de captura por cada salida del DUT, con el valor
+  de la salida después del flanco que consumió el estímulo i.
+
+Protocolo: Python escribe el bloque, block_len (1..BLOCK, nunca 0) e invierte
+req; el wrapper corre block_len ciclos sin intervención de Python y, al
+capturar el último, copia req en ack. Python espera el cambio de ack y lee las capturas de
+una vez. Entre bloques el reloj del DUT queda detenido (clock gating, solo de
+testbench), así que la secuencia que ve el filtro es idéntica a la del modo
+ciclo a ciclo. Con replay_en = 0 el wrapper es transparente: los puertos del
+DUT pasan directo y el reloj no se detiene (reset y modo ciclo a ciclo).
+
+Los puertos se leen de la cabecera del módulo, así que el wrapper sigue al
+RTL si cambian los anchos:
+
+    python replay_wrapper.py --block 256 -o filter_replay.v
+"""
+
+import argparse
+import re
+from pathlib import Path
+
+PROJ_DIR = Path(__file__).resolve().parent
+FILTER_V = PROJ_DIR / "filter.v"
+
+_PORT = re.compile(
+    r"\b(input|output)\s+(?:wire\s+|reg\s+)?(signed\s+)?(?:\[\s*(\d+)\s*:\s*(\d+)\s*\]\s*)?(\w+)")
+
+
+def parse_ports(source):
+    """[(dirección, nombre, ancho, signed)] de la cabecera del primer módulo"""
+    text = re.sub(r"//[^\n]*|/\*.*?\*/", "", source, flags=re.S)
+    match = re.search(r"\bmodule\s+(\w+)\s*\((.*?)\)\s*;", text, flags=re.S)
+    if match is None:
+        raise ValueError("no se encontró la cabecera del módulo")
+    ports = []
+    for direction, signed, msb, lsb, name in _PORT.findall(match.group(2)):
+        width = abs(int(msb) - int(lsb)) + 1 if msb else 1
+        ports.append((direction, name, width, bool(signed)))
+    return match.group(1), ports
+
+
+def _range(width):
+    return f"[{width - 1}:0] " if width > 1 else ""
+
+
+def generate(source, block=256, stim="data_in", clock="clk", reset="rst"):
+    """Texto Verilog del wrapper <módulo>_replay para BLOCK ciclos por bloque"""
+    if block < 1:
+        raise ValueError("block debe ser >= 1")
+    module, ports = parse_ports(source)
+    names = [name for _, name, _, _ in ports]
+    for required in (stim, clock, reset):
+        if required not in names:
+            raise ValueError(f"{module} no tiene el puerto {required}")
+
+    stim_w, stim_signed = next((w, sg) for _, n, w, sg in ports if n == stim)
+    stim_sign = "signed " if stim_signed else ""
+    outputs = [(n, w) for d, n, w, _ in ports if d == "output"]
+    cnt_w = block.bit_length()
+
+    decl = []
+    for direction, name, width, signed in ports:
+        sign = "signed " if signed else ""
+        decl.append(f"    {direction:<6} wire {sign}{_range(width)}{name},")
+    decl += [
+        "",
+        "    // Reproducción de estímulos",
+        "    input  wire replay_en,",
+        f"    input  wire [{block * stim_w - 1}:0] {stim}_block,",
+        f"    input  wire [{cnt_w - 1}:0] block_len,",
+        "    input  wire req,",
+        "    output reg  ack = 1'b0,",
+    ]
+    for name, width in outputs:
+        decl.append(f"    output reg  [{block * width - 1}:0] {name}_block = 0,")
+    decl[-1] = decl[-1].rstrip(",")
+
+    conns = []
+    for _, name, _, _ in ports:
+        if name == clock:
+            conns.append(f"    .{name}(dut_clk)")
+        elif name == stim:
+            conns.append(f"    .{name}(replay_en ? stim_r : {name})")
+        else:
+            conns.append(f"    .{name}({name})")
+
+    captures = "\n".join(
+        f"      {name}_block[cap*{width} +: {width}] <= {name};"
+        for name, width in outputs)
+
+    return f"""\
+// {module}_replay.v
+// Generado por replay_wrapper.py a partir de {module} (BLOCK = {block}); no editar.
+/*
+    Wrapper de testbench: reproduce bloques de estímulos precalculados en
+    {stim} y captura las salidas de {module} ciclo a ciclo, sin Python en
+    medio. Con replay_en = 0 es transparente.
+*/
+
+module {module}_replay (
+{chr(10).join(decl)}
+  );
+  localparam BLOCK = {block};
+
+  reg busy = 1'b0;            // Bloque en curso
+  reg req_seen = 1'b0;        // Último req aceptado
+  reg capture = 1'b0;         // El flanco de subida anterior consumió un estímulo
+  reg [{cnt_w - 1}:0] len_r = 0;
+  reg [{cnt_w - 1}:0] idx = 0;
+  reg [{cnt_w - 1}:0] cap = 0;
+  reg {stim_sign}{_range(stim_w)}stim_r = 0;
+  // Estímulo del próximo flanco: idx dentro de un bloque, 0 al empezar otro
+  wire [{cnt_w - 1}:0] slot = busy ? idx : 0;
+
+  // Reloj del DUT habilitado solo en los ciclos de un bloque (o siempre con
+  // replay_en = 0). El enable cambia en el flanco de bajada: sin glitches.
+  reg clk_en = 1'b1;
+  wire dut_clk = {clock} & clk_en;
+
+  {module} dut (
+{("," + chr(10)).join(conns)}
+  );
+
+  // En cada flanco de bajada: capturar las salidas del flanco de subida
+  // anterior y preparar el estímulo del siguiente
+  always @(negedge {clock})
+  begin
+    if (capture)
+    begin
+{captures}
+      if (cap == len_r - 1)
+        ack <= req_seen;
+    end
+    capture <= 1'b0;
+    clk_en <= !replay_en;
+
+    if ({reset} || !replay_en)
+      busy <= 1'b0;
+    else if (busy || req != req_seen)
+    begin
+      if (!busy)
+      begin
+        req_seen <= req;
+        len_r <= block_len;
+      end
+      stim_r <= {stim}_block[slot*{stim_w} +: {stim_w}];
+      cap <= slot;
+      idx <= slot + 1;
+      busy <= slot + 1 < (busy ? len_r : block_len);
+      capture <= 1'b1;
+      clk_en <= 1'b1;
+    end
+  end
+endmodule
+"""
+
+
+def write_wrapper(path, block=256, source=FILTER_V):
+    """Escribe el wrapper solo si cambió (no fuerza recompilar el simulador)"""
+    path = Path(path)
+    text = generate(Path(source).read_text(), block)
+    if not path.exists() or path.read_text() != text:
+        path.write_text(text)
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--block", type=int, default=256, help="ciclos por bloque (capacidad de las memorias)")
+    parser.add_argument("--source", default=str(FILTER_V), help="RTL del DUT")
+    parser.add_argument("-o", "--output", default=str(PROJ_DIR / "filter_replay.v"))
+    args = parser.parse_args()
+    print(write_wrapper(args.output, args.block, args.source))
+
+
+if __name__ == "__main__":
+    main()
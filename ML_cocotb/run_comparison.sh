@@ -6,6 +6,11 @@ echo "  Ejecutando Comparación de Métodos de Verificación"
 echo "=========================================================================="
 echo ""
 
+# Presupuesto fijo de ciclos en todos los métodos (sin parada por cobertura)
+# y agentes ML que parten de cero (sin modelos guardados de corridas previas)
+export CLOSURE=0
+export MODEL_STORE=0
+
 # Crear directorio para resultados si no existe
 mkdir -p comparison_results
 
@@ -3,12 +3,19 @@ import cocotb
 from cocotb.clock import Clock
 from cocotb.triggers import RisingEdge, Timer
 from ml_agent import MLGuider as ml_guider_classifier
+from pathlib import Path
+
+from tb_utils.model_store import ModelStore
+
+# Modelo guardado entre simulaciones (se invalida si cambia filter.v)
+FILTER_V = Path(__file__).resolve().parent / "filter.v"
 
 @cocotb.test()
 async def fir_ml_test(dut):
     # Generar Reloj
     cocotb.start_soon(Clock(dut.clk, 10, unit="ns").start())
-    guider = ml_guider_classifier()
+    guider = ml_guider_classifier(store=ModelStore("fir_ml_classifier", [FILTER_V]))
+    dut._log.info(guider.trainer.store.summary())
 
     # Reset
     dut.rst.value = 1
@@ -35,4 +42,6 @@ async def fir_ml_test(dut):
         if i % 20 == 0:
             dut._log.info(f"Ciclo {i:03d} - Total Overflows: {hits:04d}")
 
-    dut._log.info(f"Test finalizado. Overflows totales encontrados: {hits}")
\ No newline at end of file
+    guider.close()
+    dut._log.info(f"Test finalizado. Overflows totales encontrados: {hits}")
+    dut._log.info(guider.trainer.summary())
\ No newline at end of file
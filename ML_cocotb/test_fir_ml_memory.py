@@ -1,13 +1,26 @@
 import cocotb
 from cocotb.clock import Clock
 from cocotb.triggers import RisingEdge, Timer
+from cocotb.utils import get_sim_time
 from ml_temporal_agent import TemporalMLGuider # Asegúrate de que el archivo se llame así
 import matplotlib.pyplot as plt
 import numpy as np
+import os
+from pathlib import Path
+
+from fir_coverage import FirCoverage
+from tb_utils.closure import closure_from_env
+from tb_utils.model_store import ModelStore
+from tb_utils.perf import Throughput, bench_requested
 
 # Configuración de la prueba
 ITERATIONS = 600           # Cantidad total de ciclos a simular
 HISTORY_DEPTH = 3          # Profundidad de memoria (debe coincidir con la lógica del filtro)
+CLOSURE_PLATEAU = 200      # Ciclos sin mejora de cobertura para terminar antes
+# Ciclos propuestos por cada llamada al modelo (1 = un predict por ciclo)
+BATCH_CYCLES = int(os.getenv("ML_BATCH_CYCLES", "1"))
+# Modelo guardado entre simulaciones (se invalida si cambia filter.v)
+FILTER_V = Path(__file__).resolve().parent / "filter.v"
 
 @cocotb.test()
 async def fir_ml_test(dut):
@@ -24,8 +37,12 @@ async def fir_ml_test(dut):
     # Iniciar Reloj (10ns periodo = 100MHz)
     cocotb.start_soon(Clock(dut.clk, 10, unit="ns").start())
     
-    # Instanciar el Agente de ML
-    guider = TemporalMLGuider(history_depth=HISTORY_DEPTH)
+    # Instanciar el Agente de ML (retoma el modelo de la corrida anterior si existe)
+    guider = TemporalMLGuider(
+        history_depth=HISTORY_DEPTH,
+        store=ModelStore(f"fir_ml_memory_d{HISTORY_DEPTH}", [FILTER_V]),
+    )
+    dut._log.info(guider.trainer.store.summary())
     
     # Reset del DUT
     dut.rst.value = 1
@@ -56,14 +73,23 @@ async def fir_ml_test(dut):
     history_magnitudes = []
     overflow_count = 0
     max_magnitude_reached = 0
+    pending = []
+    coverage = FirCoverage()
+    closure = closure_from_env(
+        lambda: coverage.coverage, budget=ITERATIONS, plateau=CLOSURE_PLATEAU,
+        name="ml_temporal", sim_time=lambda: get_sim_time("ns"), clock_period=10,
+    )
 
     # -----------------------------------------------------------
     # 3. Bucle Principal de Simulación
     # -----------------------------------------------------------
     for i in range(ITERATIONS):
         
-        # A) El Agente ML decide el siguiente estímulo basado en la historia
-        next_data_in = guider.get_stimulus(current_coeffs)
+        # A) El Agente ML decide los siguientes estímulos basado en la historia
+        # (BATCH_CYCLES ciclos por cada llamada al modelo)
+        if not pending:
+            pending = list(guider.get_stimulus_batch(current_coeffs, BATCH_CYCLES))
+        next_data_in = pending.pop(0)
         
         # B) Aplicar estímulo al DUT
         dut.data_in.value = int(next_data_in)
@@ -90,6 +116,7 @@ async def fir_ml_test(dut):
         # F) Logging y Estadísticas
         # -------------------------------------------------------
         history_magnitudes.append(magnitude)
+        coverage.sample(int(next_data_in), magnitude, is_overflow)
         
         if magnitude > max_magnitude_reached:
             max_magnitude_reached = magnitude
@@ -104,14 +131,23 @@ async def fir_ml_test(dut):
         if i % 50 == 0:
              dut._log.info(f"Progreso: {i}/{ITERATIONS} | Max Mag: {max_magnitude_reached} | Overflows: {overflow_count}")
 
+        # G) Condición de parada por cobertura (CLOSURE=0 la desactiva)
+        if closure.step():
+            break
+
     # -----------------------------------------------------------
     # 4. Reporte Final y Visualización
     # -----------------------------------------------------------
     dut._log.info("=============================================")
     dut._log.info("SIMULACIÓN FINALIZADA")
-    dut._log.info(f"Total Ciclos: {ITERATIONS}")
+    dut._log.info(f"Total Ciclos: {closure.count}")
     dut._log.info(f"Total Overflows encontrados: {overflow_count}")
     dut._log.info(f"Magnitud Máxima alcanzada: {max_magnitude_reached}")
+    dut._log.info(coverage.report())
+    dut._log.info(closure.summary())
+    coverage.save("fir_ml_memory")
+    guider.close()
+    dut._log.info(guider.trainer.summary())
     dut._log.info("Generando gráfico de aprendizaje...")
 
     try:
@@ -138,4 +174,52 @@ async def fir_ml_test(dut):
         dut._log.info(f"Gráfico guardado exitosamente como: {filename}")
         
     except Exception as e:
-        dut._log.warning(f"No se pudo generar el gráfico: {e}")
\ No newline at end of file
+        dut._log.warning(f"No se pudo generar el gráfico: {e}")
+
+
+@cocotb.test(skip=not bench_requested("fir_ml_stimulus_benchmark"))
+async def fir_ml_stimulus_benchmark(dut):
+    """
+    Compara estímulos/segundo del camino por ciclo (get_stimulus) contra el
+    camino por lotes (get_stimulus_batch) con el mismo modelo entrenado.
+    """
+    cocotb.start_soon(Clock(dut.clk, 10, unit="ns").start())
+    guider = TemporalMLGuider(history_depth=HISTORY_DEPTH)
+    current_coeffs = [80, 80, 80]
+
+    dut.rst.value = 1
+    dut.data_in.value = 0
+    dut.coeff0.value = current_coeffs[0]
+    dut.coeff1.value = current_coeffs[1]
+    dut.coeff2.value = current_coeffs[2]
+    await RisingEdge(dut.clk)
+    await RisingEdge(dut.clk)
+    dut.rst.value = 0
+
+    # Entrenamiento con datos reales del DUT
+    for _ in range(200):
+        data_in = guider.get_stimulus(current_coeffs)
+        dut.data_in.value = int(data_in)
+        await RisingEdge(dut.clk)
+        await Timer(1, unit="ns")
+        try:
+            current_out = dut.data_out.value.to_signed()
+        except ValueError:
+            current_out = 0
+        guider.record_result(data_in, current_coeffs, abs(current_out))
+
+    n_stimuli = 500
+    with Throughput("get_stimulus (por ciclo)", unit="estímulos") as tp:
+        for _ in range(n_stimuli):
+            guider.get_stimulus(current_coeffs)
+        tp.count = n_stimuli
+    dut._log.info(tp.summary())
+    base_rate = tp.rate
+
+    for k in (10, 50):
+        with Throughput(f"get_stimulus_batch (K={k})", unit="estímulos") as tp:
+            for _ in range(n_stimuli // k):
+                guider.get_stimulus_batch(current_coeffs, k)
+            tp.count = (n_stimuli // k) * k
+        dut._log.info(f"{tp.summary()} | {tp.rate / base_rate:.1f}x")
+    guider.close()
@@ -3,11 +3,18 @@ from cocotb.clock import Clock
 from cocotb.triggers import RisingEdge, Timer
 from ml_agent_regressor import MLGuider as ml_agent_regressor
 import matplotlib.pyplot as plt # Para graficar al final
+from pathlib import Path
+
+from tb_utils.model_store import ModelStore
+
+# Modelo guardado entre simulaciones (se invalida si cambia filter.v)
+FILTER_V = Path(__file__).resolve().parent / "filter.v"
 
 @cocotb.test()
 async def fir_ml_test(dut):
     cocotb.start_soon(Clock(dut.clk, 10, unit="ns").start())
-    guider = ml_agent_regressor()
+    guider = ml_agent_regressor(store=ModelStore("fir_ml_regressor", [FILTER_V]))
+    dut._log.info(guider.trainer.store.summary())
 
     dut.rst.value = 1
     await RisingEdge(dut.clk)
@@ -46,6 +53,9 @@ async def fir_ml_test(dut):
         if dut.overflow_detected.value == 1:
             dut._log.info(f"!!! OVERFLOW DETECTADO en ciclo {i} !!! Valor: {current_out}")
 
+    guider.close()
+    dut._log.info(guider.trainer.summary())
+
     # Visualización simple al terminar (se guarda como imagen)
     try:
         plt.figure()
@@ -14,14 +14,116 @@ Características:
 - Tracking de overflows y magnitudes máximas
 """
 
+import os
 import cocotb
 from cocotb.clock import Clock
-from cocotb.triggers import RisingEdge, Timer
+from cocotb.triggers import RisingEdge, Timer, ReadOnly
+from cocotb.utils import get_sim_time
 import random
+import numpy as np
 import matplotlib.pyplot as plt
 
+from fir_coverage import FirCoverage
+from tb_utils.closure import closure_from_env
+from tb_utils.perf import Throughput
+
 # Configuración idéntica a test_fir_ml_memory.py para comparación justa
 ITERATIONS = 600
+# Ventana de estancamiento de cobertura (ciclos) para terminar antes
+CLOSURE_PLATEAU = 200
+
+# Estímulos por bloque en modo reproducción (make replay, TOPLEVEL=filter_replay).
+# 0 = un estímulo por ciclo desde Python (modo original)
+REPLAY_BLOCK = int(os.getenv("REPLAY_BLOCK", "0"))
+# Ciclos por configuración en fir_replay_benchmark
+BENCH_CYCLES = 2048
+
+# Rango de valores posibles para data_in (8 bits con signo)
+MIN_VAL = -128
+MAX_VAL = 127
+
+
+# -----------------------------------------------------------
+# Drivers: (data_out, overflow_detected) de cada estímulo
+# -----------------------------------------------------------
+class CycleDriver:
+    """Un estímulo por ciclo: escribir data_in, esperar el flanco y leer"""
+
+    def __init__(self, dut):
+        self.dut = dut
+
+    async def run(self, stimulus):
+        results = []
+        for data_in in stimulus:
+            self.dut.data_in.value = data_in
+            await RisingEdge(self.dut.clk)
+            await Timer(1, unit="ns")
+            try:
+                current_out = self.dut.data_out.value.to_signed()
+            except ValueError:
+                current_out = 0
+            results.append((current_out, bool(self.dut.overflow_detected.value)))
+        return results
+
+
+class ReplayDriver:
+    """
+    Bloques de estímulos en el wrapper filter_replay.v (replay_wrapper.py):
+    una escritura del bloque, una espera de ack y una lectura de las capturas
+    por bloque, en lugar de varias operaciones por ciclo.
+    """
+
+    def __init__(self, dut, block=None):
+        self.dut = dut
+        self.capacity = len(dut.overflow_detected_block.value)
+        self.block = min(block or self.capacity, self.capacity)
+        self.blocks = 0
+        # Mismo valor que el último req aceptado: no arranca un bloque vacío
+        self.req = int(dut.ack.value)
+        dut.req.value = self.req
+        dut.replay_en.value = 1
+
+    async def run(self, stimulus):
+        results = []
+        for start in range(0, len(stimulus), self.block):
+            results += await self._run_block(stimulus[start:start + self.block])
+        return results
+
+    async def _run_block(self, chunk):
+        n = len(chunk)
+        dut = self.dut
+        dut.data_in_block.value = int.from_bytes(np.asarray(chunk, dtype=np.int8).tobytes(), "little")
+        dut.block_len.value = n
+        self.req ^= 1
+        dut.req.value = self.req
+
+        await dut.ack.value_change
+        await ReadOnly()
+        out = np.frombuffer(
+            int(dut.data_out_block.value).to_bytes(2 * self.capacity, "little"), dtype="<i2")[:n]
+        ovf = np.unpackbits(
+            np.frombuffer(int(dut.overflow_detected_block.value).to_bytes((self.capacity + 7) // 8, "little"),
+                          dtype=np.uint8),
+            bitorder="little")[:n]
+        # Salir de ReadOnly antes de escribir el bloque siguiente (el reloj
+        # del filtro está detenido entre bloques)
+        await RisingEdge(dut.clk)
+        self.blocks += 1
+        return list(zip(out.tolist(), ovf.astype(bool).tolist()))
+
+
+async def reset_dut(dut):
+    """Reset con el wrapper de reproducción (si existe) en modo transparente"""
+    dut.rst.value = 1
+    dut.data_in.value = 0
+    dut.coeff0.value = 0
+    dut.coeff1.value = 0
+    dut.coeff2.value = 0
+    if hasattr(dut, "replay_en"):
+        dut.replay_en.value = 0
+    await RisingEdge(dut.clk)
+    await RisingEdge(dut.clk)
+    dut.rst.value = 0
 
 
 @cocotb.test()
@@ -47,14 +149,7 @@ async def fir_random_test(dut):
     cocotb.start_soon(Clock(dut.clk, 10, unit="ns").start())
     
     # Reset del DUT
-    dut.rst.value = 1
-    dut.data_in.value = 0
-    dut.coeff0.value = 0
-    dut.coeff1.value = 0
-    dut.coeff2.value = 0
-    await RisingEdge(dut.clk)
-    await RisingEdge(dut.clk)
-    dut.rst.value = 0
+    await reset_dut(dut)
     dut._log.info("Reset completado.")
     
     # -----------------------------------------------------------
@@ -78,10 +173,24 @@ async def fir_random_test(dut):
     max_magnitude_reached = 0
     first_overflow_cycle = None
     overflow_cycles = []
+    coverage = FirCoverage()
+    # Termina al cerrar cobertura o si no mejora en CLOSURE_PLATEAU ciclos
+    # (CLOSURE=0 corre siempre las ITERATIONS completas)
+    closure = closure_from_env(
+        lambda: coverage.coverage, budget=ITERATIONS, plateau=CLOSURE_PLATEAU,
+        name="random", sim_time=lambda: get_sim_time("ns"), clock_period=10,
+    )
     
-    # Rango de valores posibles para data_in (8 bits con signo)
-    MIN_VAL = -128
-    MAX_VAL = 127
+    # Driver: ciclo a ciclo, o por bloques en el wrapper de reproducción
+    if REPLAY_BLOCK and not hasattr(dut, "data_in_block"):
+        dut._log.warning("REPLAY_BLOCK requiere TOPLEVEL=filter_replay (make replay); modo ciclo a ciclo")
+    if REPLAY_BLOCK and hasattr(dut, "data_in_block"):
+        driver = ReplayDriver(dut, REPLAY_BLOCK)
+        block = driver.block
+        dut._log.info(f"Modo reproducción: bloques de {block} estímulos")
+    else:
+        driver = CycleDriver(dut)
+        block = 1
     
     # -----------------------------------------------------------
     # 4. Bucle Principal: Estimulación Aleatoria Pura
@@ -89,55 +198,58 @@ async def fir_random_test(dut):
     dut._log.info(f"Iniciando {ITERATIONS} iteraciones con estimulación ALEATORIA...")
     dut._log.info("")
     
-    for i in range(ITERATIONS):
-        
-        # A) Generar estímulo COMPLETAMENTE ALEATORIO
-        # No hay optimización, no hay aprendizaje, no hay memoria
-        random_data_in = random.randint(MIN_VAL, MAX_VAL)
-        
-        # B) Aplicar estímulo al DUT
-        dut.data_in.value = random_data_in
-        
-        # C) Avanzar tiempo
-        await RisingEdge(dut.clk)
-        await Timer(1, unit="ns")
-        
-        # D) Leer resultados
-        try:
-            current_out = dut.data_out.value.to_signed()
-        except ValueError:
-            current_out = 0
-        
-        magnitude = abs(current_out)
-        overflow_detected = bool(dut.overflow_detected.value)
-        
-        # E) Registrar métricas
-        history_magnitudes.append(magnitude)
-        
-        # Tracking de máximo alcanzado
-        if magnitude > max_magnitude_reached:
-            max_magnitude_reached = magnitude
-            dut._log.info(f"[Ciclo {i:3d}] Nuevo máximo: {magnitude:5d} (input={random_data_in:4d})")
-        
-        # Tracking de overflows
-        if overflow_detected:
-            overflow_count += 1
-            overflow_cycles.append(i)
+    simulated = 0
+    with Throughput(f"random (bloque={block})", unit="ciclos",
+                    sim_time=lambda: get_sim_time("ns")) as perf:
+        for i in range(ITERATIONS):
+            
+            # A) Generar estímulos COMPLETAMENTE ALEATORIOS
+            # No hay optimización, no hay aprendizaje, no hay memoria
+            # B-D) Aplicarlos y leer resultados: uno por ciclo, o un bloque
+            # entero de una vez en modo reproducción
+            if i % block == 0:
+                stimulus = [random.randint(MIN_VAL, MAX_VAL) for _ in range(min(block, ITERATIONS - i))]
+                outputs = await driver.run(stimulus)
+                simulated += len(outputs)
+            random_data_in = stimulus[i % block]
+            current_out, overflow_detected = outputs[i % block]
             
-            # Registrar primer overflow
-            if first_overflow_cycle is None:
-                first_overflow_cycle = i
-                dut._log.info("")
-                dut._log.info("!"*60)
-                dut._log.info(f"  PRIMER OVERFLOW detectado en ciclo {i}")
-                dut._log.info(f"  Valor: {current_out}, Magnitud: {magnitude}")
-                dut._log.info(f"  Input que lo causó: {random_data_in}")
-                dut._log.info("!"*60)
-                dut._log.info("")
+            magnitude = abs(current_out)
             
-            # Logging periódico de overflows
-            elif overflow_count <= 5 or overflow_count % 50 == 0:
-                dut._log.info(f"[Ciclo {i:3d}] Overflow #{overflow_count}: mag={magnitude:5d}")
+            # E) Registrar métricas
+            history_magnitudes.append(magnitude)
+            coverage.sample(random_data_in, magnitude, overflow_detected)
+            
+            # Tracking de máximo alcanzado
+            if magnitude > max_magnitude_reached:
+                max_magnitude_reached = magnitude
+                dut._log.info(f"[Ciclo {i:3d}] Nuevo máximo: {magnitude:5d} (input={random_data_in:4d})")
+            
+            # Tracking de overflows
+            if overflow_detected:
+                overflow_count += 1
+                overflow_cycles.append(i)
+            
+                # Registrar primer overflow
+                if first_overflow_cycle is None:
+                    first_overflow_cycle = i
+                    dut._log.info("")
+                    dut._log.info("!"*60)
+                    dut._log.info(f"  PRIMER OVERFLOW detectado en ciclo {i}")
+                    dut._log.info(f"  Valor: {current_out}, Magnitud: {magnitude}")
+                    dut._log.info(f"  Input que lo causó: {random_data_in}")
+                    dut._log.info("!"*60)
+                    dut._log.info("")
+            
+                # Logging periódico de overflows
+                elif overflow_count <= 5 or overflow_count % 50 == 0:
+                    dut._log.info(f"[Ciclo {i:3d}] Overflow #{overflow_count}: mag={magnitude:5d}")
+            
+            # F) Condición de parada por cobertura
+            if closure.step():
+                break
+        perf.count = simulated
+    dut._log.info(perf.summary())
     
     # -----------------------------------------------------------
     # 5. Reporte Final de Resultados
@@ -146,9 +258,10 @@ async def fir_random_test(dut):
     dut._log.info("="*60)
     dut._log.info("RESULTADOS DE VERIFICACIÓN ESTÁNDAR (RANDOM)")
     dut._log.info("="*60)
-    dut._log.info(f"Total de Ciclos:              {ITERATIONS}")
+    cycles_run = closure.count
+    dut._log.info(f"Total de Ciclos:              {cycles_run}")
     dut._log.info(f"Total de Overflows:           {overflow_count}")
-    dut._log.info(f"Tasa de Overflow:             {100*overflow_count/ITERATIONS:.2f}%")
+    dut._log.info(f"Tasa de Overflow:             {100*overflow_count/cycles_run:.2f}%")
     dut._log.info(f"Magnitud Máxima Alcanzada:    {max_magnitude_reached}")
     
     if first_overflow_cycle is not None:
@@ -157,7 +270,11 @@ async def fir_random_test(dut):
         dut._log.info(f"Primer Overflow en Ciclo:     NINGUNO")
     
     dut._log.info(f"Coeficientes usados:          {current_coeffs}")
+    dut._log.info(f"Cobertura funcional:          {coverage.coverage:.1f}%")
     dut._log.info("="*60)
+    dut._log.info(coverage.report())
+    dut._log.info(closure.summary())
+    coverage.save("fir_random")
     
     # -----------------------------------------------------------
     # 6. Visualización de Resultados
@@ -201,3 +318,43 @@ async def fir_random_test(dut):
     
     dut._log.info("")
     dut._log.info("Simulación COMPLETADA")
+
+
+# Solo con TOPLEVEL=filter_replay (make replay)
+@cocotb.test(skip=not hasattr(cocotb.top, "data_in_block"))
+async def fir_replay_benchmark(dut):
+    """
+    Ciclos/s del modo ciclo a ciclo frente al modo reproducción con distintos
+    tamaños de bloque, con el mismo estímulo. Tras cada reset las salidas
+    deben coincidir ciclo a ciclo con las del modo original.
+    """
+    cocotb.start_soon(Clock(dut.clk, 10, unit="ns").start())
+
+    capacity = len(dut.overflow_detected_block.value)
+    blocks = sorted({b for b in (1, 16, 64, capacity) if b <= capacity})
+    stimulus = [random.randint(MIN_VAL, MAX_VAL) for _ in range(BENCH_CYCLES)]
+
+    reference = None
+    rates = {}
+    for block in [0] + blocks:
+        await reset_dut(dut)
+        for name, value in zip(("coeff0", "coeff1", "coeff2"), (80, 80, 80)):
+            getattr(dut, name).value = value
+        driver = ReplayDriver(dut, block) if block else CycleDriver(dut)
+        label = f"bloque={block}" if block else "ciclo a ciclo"
+
+        with Throughput(label, unit="ciclos", sim_time=lambda: get_sim_time("ns")) as tp:
+            outputs = await driver.run(stimulus)
+            tp.count = len(outputs)
+        rates[label] = tp.rate
+        dut._log.info(tp.summary())
+
+        if reference is None:
+            reference = outputs
+        else:
+            mismatches = sum(a != b for a, b in zip(outputs, reference))
+            assert mismatches == 0, f"{label}: {mismatches} ciclos difieren del modo ciclo a ciclo"
+
+    base = rates["ciclo a ciclo"]
+    for label, rate in rates.items():
+        dut._log.info(f"[PERF] {label:<14} {rate:12,.0f} ciclos/s  x{rate / base:.1f}")
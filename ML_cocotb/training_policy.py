@@ -0,0 +1,153 @@
+# training_policy.py
+"""
+Políticas de entrenamiento para los agentes ML (MLGuider, TemporalMLGuider).
+
+Una política decide CUÁNDO reentrenar y CON QUÉ DATOS. Reentrenar un Random
+Forest desde cero sobre todo el historial (FullRefit) tiene un coste que crece
+con la corrida; las demás políticas acotan memoria y latencia por
+actualización:
+
+- FullRefit:     comportamiento original, todo el historial, modelo nuevo.
+- SlidingWindow: solo las últimas `window` muestras.
+- Reservoir:     muestra uniforme de tamaño fijo de todo el historial.
+- WarmStart:     agrega `trees_per_update` árboles entrenados con la ventana
+                 reciente (warm_start de sklearn) y descarta los más viejos
+                 por encima de `max_trees`.
+
+El ajuste lo ejecuta training_service.ModelTrainer (en línea o en background).
+
+Selección por entorno: ML_TRAINING_POLICY=full|window|reservoir|warm,
+ML_TRAINING_WINDOW (tamaño de ventana/reservorio), ML_TRAINING_TREES (árboles
+por actualización en warm).
+"""
+import os
+import random
+from collections import deque
+
+import numpy as np
+
+
+class FullRefit:
+    # True si fit() modifica el modelo existente en lugar de reemplazarlo
+    incremental = False
+
+    def __init__(self, every=10):
+        self.every = every
+        self.n_seen = 0
+        self._X = []
+        self._y = []
+
+    def __len__(self):
+        return len(self._y)
+
+    def _store(self, x, y):
+        self._X.append(x)
+        self._y.append(y)
+
+    def add(self, x, y):
+        """Guarda la muestra; devuelve True cuando toca reentrenar."""
+        self._store(x, y)
+        self.n_seen += 1
+        return self.n_seen % self.every == 0
+
+    def training_set(self):
+        return np.asarray(self._X), np.asarray(self._y)
+
+    def state(self):
+        """Datos guardados, para retomarlos en otra simulación (ModelStore)."""
+        return {"X": list(self._X), "y": list(self._y), "n_seen": self.n_seen}
+
+    def restore(self, state):
+        self._X.clear()
+        self._y.clear()
+        self._X.extend(state["X"])
+        self._y.extend(state["y"])
+        self.n_seen = state["n_seen"]
+
+    def fit(self, model, X, y):
+        model.fit(X, y)
+        return model
+
+
+class SlidingWindow(FullRefit):
+    def __init__(self, every=10, window=1000):
+        super().__init__(every)
+        self._X = deque(maxlen=window)
+        self._y = deque(maxlen=window)
+
+
+class Reservoir(FullRefit):
+    """Muestreo de reservorio (algoritmo R): cada muestra vista tiene la misma
+    probabilidad de estar en el conjunto de entrenamiento."""
+
+    def __init__(self, every=10, capacity=1000, seed=None):
+        super().__init__(every)
+        self.capacity = capacity
+        self._rng = random.Random(seed)
+
+    def restore(self, state):
+        keep = slice(-self.capacity, None)
+        super().restore(dict(state, X=state["X"][keep], y=state["y"][keep]))
+
+    def _store(self, x, y):
+        if len(self._y) < self.capacity:
+            self._X.append(x)
+            self._y.append(y)
+            return
+        j = self._rng.randrange(self.n_seen + 1)
+        if j < self.capacity:
+            self._X[j] = x
+            self._y[j] = y
+
+
+class WarmStart(SlidingWindow):
+    incremental = True
+
+    def __init__(self, every=10, window=500, trees_per_update=2, max_trees=50):
+        super().__init__(every, window)
+        self.trees_per_update = trees_per_update
+        self.max_trees = max_trees
+        self._base_trees = None
+
+    def fit(self, model, X, y):
+        classes = getattr(model, "classes_", None)
+        if not hasattr(model, "estimators_") or (
+            classes is not None and not np.array_equal(np.unique(y), classes)
+        ):
+            # Primer ajuste, o el clasificador ve un conjunto de clases
+            # distinto: los árboles viejos no serían compatibles.
+            if self._base_trees is None:
+                self._base_trees = model.n_estimators
+            model.set_params(warm_start=False, n_estimators=self._base_trees)
+            model.fit(X, y)
+            model.set_params(warm_start=True)
+            return model
+
+        model.set_params(n_estimators=len(model.estimators_) + self.trees_per_update)
+        model.fit(X, y)
+        if len(model.estimators_) > self.max_trees:
+            model.estimators_ = model.estimators_[-self.max_trees:]
+            model.set_params(n_estimators=self.max_trees)
+        return model
+
+
+def make_policy(name, every, window=1000, trees_per_update=2):
+    name = name.lower()
+    if name == "full":
+        return FullRefit(every)
+    if name == "window":
+        return SlidingWindow(every, window)
+    if name == "reservoir":
+        return Reservoir(every, window)
+    if name == "warm":
+        return WarmStart(every, window, trees_per_update)
+    raise ValueError(f"Política de entrenamiento desconocida: {name}")
+
+
+def policy_from_env(every):
+    return make_policy(
+        os.getenv("ML_TRAINING_POLICY", "full"),
+        every,
+        window=int(os.getenv("ML_TRAINING_WINDOW", "1000")),
+        trees_per_update=int(os.getenv("ML_TRAINING_TREES", "2")),
+    )
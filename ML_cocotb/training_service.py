@@ -0,0 +1,136 @@
+# training_service.py
+"""
+Servicio de entrenamiento para los agentes ML.
+
+En modo en línea (por defecto) el `fit` corre dentro de la corrutina de cocotb
+y el simulador queda detenido mientras el bosque se reentrena. En modo
+background (`background=True` o ML_BACKGROUND_TRAINING=1) el ajuste corre en
+un hilo aparte sobre una copia del modelo: el agente sigue generando estímulos
+con el último modelo publicado y el nuevo se publica al terminar reemplazando
+la referencia (`self.model = nuevo`), que es una operación atómica.
+
+Con `store` (tb_utils.model_store.ModelStore) el entrenador retoma el modelo y
+los datos de la simulación anterior contra el mismo RTL y el mismo esquema de
+features, y los guarda al cerrar (`close`).
+
+Métricas: `stall_time` (tiempo que el simulador esperó por el entrenamiento),
+`train_time` (tiempo total de ajuste) y la diferencia entre ambos, que es el
+tiempo de simulación ahorrado.
+"""
+import copy
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from sklearn.base import clone
+
+
+def background_from_env():
+    return os.getenv("ML_BACKGROUND_TRAINING", "0").lower() in ("1", "true", "yes", "on")
+
+
+class ModelTrainer:
+    # Versión del formato guardado en el ModelStore (state/restore)
+    STATE_VERSION = 1
+
+    def __init__(self, model, policy, background=None, store=None, schema=None):
+        self.model = model # Último modelo publicado (el que usa get_stimulus)
+        self.policy = policy
+        self.background = background_from_env() if background is None else background
+        self.trained = False
+
+        self.fits = 0          # Modelos publicados
+        self.skipped = 0       # Ajustes omitidos porque el anterior seguía en curso
+        self.stall_time = 0.0  # Segundos que el simulador estuvo detenido
+        self.train_time = 0.0  # Segundos de ajuste (en cualquier hilo)
+
+        self._executor = None
+        self._future = None
+        if self.background:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ml-train")
+
+        # El esquema identifica el modelo guardado: features del agente,
+        # tipo de modelo con sus hiperparámetros y política de entrenamiento
+        self.store = store
+        self.schema = {
+            "agent": schema,
+            "model": type(model).__name__,
+            "params": model.get_params(),
+            "policy": type(policy).__name__,
+        }
+        self.warm = False
+        self.saved_path = None
+        if store is not None:
+            state = store.load(self.schema, self.STATE_VERSION)
+            if state is not None:
+                self.restore(state)
+                self.warm = True
+
+    def add(self, x, y):
+        """Guarda una muestra; lanza un ajuste si la política lo pide.
+        Devuelve True si se inició (o completó, en línea) un ajuste."""
+        if not self.policy.add(x, y):
+            return False
+
+        start = time.perf_counter()
+        if not self.background:
+            self._train(self.model, *self.policy.training_set())
+            self.stall_time += time.perf_counter() - start
+            return True
+
+        if self._future is not None and not self._future.done():
+            # El ajuste anterior sigue en curso: seguimos con el modelo publicado
+            self.skipped += 1
+            return False
+
+        # Se entrena sobre una copia; los datos se copian al tomar el snapshot
+        if self.policy.incremental and self.trained:
+            candidate = copy.deepcopy(self.model)
+        else:
+            candidate = clone(self.model)
+        X, y = self.policy.training_set()
+        self._future = self._executor.submit(self._train, candidate, X, y)
+        self.stall_time += time.perf_counter() - start
+        return True
+
+    def _train(self, model, X, y):
+        start = time.perf_counter()
+        self.policy.fit(model, X, y)
+        self.train_time += time.perf_counter() - start
+        self.model = model # Publicación atómica
+        self.fits += 1
+        self.trained = True
+
+    def wait(self):
+        """Espera a que termine el ajuste en curso (si lo hay)."""
+        if self._future is not None:
+            self._future.result()
+
+    def state(self):
+        """Modelo publicado y datos de la política (para el ModelStore)."""
+        return {"model": self.model, "trained": self.trained, "policy": self.policy.state()}
+
+    def restore(self, state):
+        self.model = state["model"]
+        self.trained = state["trained"]
+        self.policy.restore(state["policy"])
+
+    def close(self):
+        self.wait()
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+        if self.store is not None and self.trained and self.saved_path is None:
+            self.saved_path = self.store.save(self.state(), self.schema, self.STATE_VERSION,
+                                              samples=self.policy.n_seen, fits=self.fits)
+
+    def summary(self):
+        mode = "background" if self.background else "en línea"
+        # En línea el simulador espera todo el ajuste: no hay ahorro
+        saved = max(0.0, self.train_time - self.stall_time) if self.background else 0.0
+        return (
+            f"[TRAIN] modo {mode}: {self.fits} ajustes ({self.skipped} omitidos), "
+            f"entrenamiento {self.train_time:.2f} s, simulador detenido {self.stall_time:.2f} s, "
+            f"ahorrado {saved:.2f} s"
+            + (" (modelo retomado del ModelStore)" if self.warm else "")
+        )
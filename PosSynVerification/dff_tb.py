@@ -2,10 +2,11 @@ import cocotb
 from cocotb.clock import Clock
 from cocotb.triggers import Event, Timer, ClockCycles
 from cocotb_coverage.crv import Randomized
-from cocotb.utils import get_sim_time
 from cocotb.queue import Queue
 import random
 
+from tb_utils.tb_log import HIGH, LOW, MEDIUM, TbLogger
+
 
 class Transaction(Randomized):
     
@@ -25,6 +26,7 @@ class Generator():
         self.event = event
         self.count = count
         self.event.clear()
+        self.log = TbLogger("GEN")
 
     async def gen_data(self):
 
@@ -32,7 +34,7 @@ class Generator():
             t = Transaction()
             t.randomize()
 
-            cocotb.log.info(f"[GEN]: din: {t.din} @ : {get_sim_time(unit = 'ns')}")
+            self.log.info(HIGH, "[GEN]: din: %s", t.din)
             await self.queue.put(t)
             await self.event.wait()
             self.event.clear()
@@ -42,21 +44,22 @@ class Driver():
     def __init__(self, queue, dut):
         self.queue = queue
         self.dut = dut
+        self.log = TbLogger("DRV")
         
     async def reset_dut(self):
         self.dut.rst.value = 1
         self.dut.din.value = 0
-        cocotb.log.info(f"--------Reset Applied @ : {get_sim_time(unit = 'ns')} ----------------")
+        self.log.info(LOW, "--------Reset Applied ----------------")
         await ClockCycles(self.dut.clk,5)
-        cocotb.log.info(f"--------Reset Removed @ : {get_sim_time(unit = 'ns')} ----------------")
-        cocotb.log.info('-------------------------------------------------------------------------------')
+        self.log.info(LOW, "--------Reset Removed ----------------")
+        self.log.info(LOW, '-------------------------------------------------------------------------------')
         self.dut.rst.value = 0
 
     async def recv_data(self):
         while True:
             temp = Transaction()
             temp = await self.queue.get()
-            cocotb.log.info(f"[DRV]: din: {temp.din} @ : {get_sim_time(unit = 'ns')}")
+            self.log.info(HIGH, "[DRV]: din: %s", temp.din)
               
             self.dut.din.value = temp.din
             await self.dut.clk.rising_edge
@@ -67,6 +70,7 @@ class Monitor():
     def __init__(self, dut,queue):
         self.dut   = dut
         self.queue = queue
+        self.log = TbLogger("MON")
 
     async def sample_data(self):
         while True:
@@ -80,7 +84,7 @@ class Monitor():
             
             
             await self.queue.put(temp)
-            cocotb.log.info(f"[MON] din: {temp.din} dout: {temp.dout} @ :{get_sim_time(unit = 'ns')}")
+            self.log.info(HIGH, "[MON] din: %s dout: %s", temp.din, temp.dout)
 
 class Scoreboard():
 
@@ -88,16 +92,17 @@ class Scoreboard():
 
         self.queue = queue
         self.event = event
+        self.log = TbLogger("SCO")
 
     async def compare_data(self):
         while True:
             temp = await self.queue.get()           
-            cocotb.log.info(f"[SCO] din: {temp.din} dout: {temp.dout} @ : {get_sim_time(unit = 'ns')}")
+            self.log.info(MEDIUM, "[SCO] din: %s dout: %s", temp.din, temp.dout)
             if(temp.dout == temp.din):
-                cocotb.log.info("[SCO] : Test Passed")
+                self.log.info(MEDIUM, "[SCO] : Test Passed")
             else:
-                cocotb.log.error("[SCO] : Test Failed")
-            print('-------------------------')
+                self.log.error("[SCO] : Test Failed")
+            self.log.info(MEDIUM, '-------------------------')
                 
             self.event.set()
 
@@ -5,6 +5,12 @@ import subprocess
 from pathlib import Path
 from cocotb_tools.runner import get_runner
 
+# Make the shared tb_utils package importable from the testbench
+# (cocotb forwards this process' sys.path as the simulator's PYTHONPATH).
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
 
 def test_dff_synthesis():
 
@@ -56,7 +62,7 @@ def test_dff_synthesis():
     runner.build(
         sources=sources,
         hdl_toplevel="dff",
-        build_dir=proj_path / "sim_build_synth",
+        build_dir="sim_build_synth",
         timescale=["1ns", "1ps"],
         build_args=build_args,
         waves=(sim == "verilator"),
@@ -66,7 +72,7 @@ def test_dff_synthesis():
         test_module="dff_tb",
         hdl_toplevel="dff",
         testcase="test",
-        build_dir=proj_path / "sim_build_synth",
+        build_dir="sim_build_synth",
         timescale=("1ns", "1ps"),
     )
 
@@ -0,0 +1,59 @@
+"""
+Benchmark: per-item ``randomize()`` vs ``BatchRandomizer`` on the Course_4
+transaction classes (I2C with simple constraints, FIFO with a multi-variable
+constraint).
+
+Usage:
+    python benchmarks/bench_batch_randomize.py [N]
+"""
+
+import importlib.util
+import sys
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO_ROOT))
+
+from tb_utils.batch_rand import BatchRandomizer  # noqa: E402
+
+
+def load_transaction(rel_path):
+    path = REPO_ROOT / rel_path
+    spec = importlib.util.spec_from_file_location(path.stem, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.Transaction
+
+
+def rate(fn, n):
+    start = time.perf_counter()
+    fn(n)
+    return n / (time.perf_counter() - start)
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+
+    print(f"\n{'Transaction':<12} {'randomize()':>14} {'generate()':>14} {'values()':>14}   items/s (N={n})")
+    print("-" * 72)
+    for name, rel_path in [
+        ("I2C", "Course_4/5_I2C/i2c_tb.py"),
+        ("FIFO", "Course_4/3_FIFO/fifo_tb.py"),
+    ]:
+        cls = load_transaction(rel_path)
+
+        def per_item(count):
+            for _ in range(count):
+                cls().randomize()
+
+        batch = BatchRandomizer(cls, seed=42)
+        r_item = rate(per_item, n)
+        r_gen = rate(batch.generate, n)
+        r_val = rate(batch.values, n)
+        print(f"{name:<12} {r_item:>14,.0f} {r_gen:>14,.0f} {r_val:>14,.0f}   ({r_gen / r_item:.1f}x / {r_val / r_item:.0f}x)")
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Benchmark: SPI genetic algorithm fitness, one CoverageMetrics per candidate
+(previous implementation) vs MLSequenceGenerator.fitness_batch.
+
+Also checks that both give the same fitness for every individual.
+
+Usage:
+    python benchmarks/bench_spi_ga.py [POPULATION] [GENERATIONS]
+"""
+
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO_ROOT))
+sys.path.insert(0, str(REPO_ROOT / "ml_spi"))
+
+from test_spi_ml import CoverageMetrics, MLSequenceGenerator  # noqa: E402
+
+
+def per_candidate_fitness(sequence):
+    coverage = CoverageMetrics()
+    coverage.update(sequence)
+    total_cov, _ = coverage.get_coverage_percentage()
+    unique_slaves = len(set(s[0] for s in sequence))
+    unique_data_ranges = len(set(s[1] // 64 for s in sequence))
+    return total_cov + (unique_slaves * 5) + (unique_data_ranges * 2)
+
+
+def main():
+    population = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    generations = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+
+    gen = MLSequenceGenerator(population_size=population, sequence_length=10, seed=0)
+    slaves, data = gen.random_population(population)
+    sequences = gen.to_sequences(slaves, data)
+
+    start = time.perf_counter()
+    reference = np.array([per_candidate_fitness(s) for s in sequences])
+    t_ref = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batch = gen.fitness_batch(slaves, data)
+    t_batch = time.perf_counter() - start
+
+    assert np.allclose(reference, batch), "fitness mismatch"
+    print(f"\nFitness of {population} individuals:")
+    print(f"  per candidate : {t_ref * 1e3:9.2f} ms")
+    print(f"  fitness_batch : {t_batch * 1e3:9.2f} ms  ({t_ref / t_batch:.0f}x)")
+
+    start = time.perf_counter()
+    gen.evolve(generations)
+    t_evolve = time.perf_counter() - start
+    print(f"\nevolve({generations}) with population {population}: {t_evolve:.2f} s"
+          f" ({t_evolve / generations * 1e3:.1f} ms/generation)\n")
+
+
+if __name__ == "__main__":
+    main()
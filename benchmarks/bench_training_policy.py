@@ -0,0 +1,98 @@
+"""
+Benchmark: training policies of the ML_cocotb guiders on long runs.
+
+Feeds TemporalMLGuider.record_result with a software model of
+ML_cocotb/filter.v (no simulator) and reports, per policy, the total and
+worst-case time spent updating the model, the training-set size at the end
+and the R^2 of the final model on held-out samples.
+
+FullRefit grows quadratically, so it is capped at --full-cycles.
+
+Usage:
+    python benchmarks/bench_training_policy.py [--cycles 100000] [--full-cycles 10000]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO_ROOT / "ML_cocotb"))
+
+from ml_temporal_agent import TemporalMLGuider  # noqa: E402
+from training_policy import FullRefit, Reservoir, SlidingWindow, WarmStart  # noqa: E402
+
+
+def fir_trace(n, seed):
+    """Inputs, coefficients and |data_out| of filter.v for ``n`` cycles."""
+    rng = np.random.default_rng(seed)
+    x = rng.integers(-128, 127, size=n)
+    # New coefficients every 100 cycles
+    coeffs = np.repeat(rng.integers(-128, 127, size=(n // 100 + 1, 3)), 100, axis=0)[:n]
+    z1 = np.concatenate(([0], x[:-1]))
+    z2 = np.concatenate(([0, 0], x[:-2]))
+    out = x * coeffs[:, 0] + z1 * coeffs[:, 1] + z2 * coeffs[:, 2]
+    out = ((out + 2**15) % 2**16) - 2**15  # 16-bit signed wrap
+    return x, coeffs, np.abs(out)
+
+
+def holdout(n=2000, seed=1):
+    x, coeffs, mag = fir_trace(n, seed)
+    z1 = np.concatenate(([0], x[:-1]))
+    z2 = np.concatenate(([0, 0], x[:-2]))
+    return np.column_stack([x, z1, z2, coeffs]), mag
+
+
+def run(policy, cycles, X_test, y_test):
+    guider = TemporalMLGuider(policy=policy)
+    x, coeffs, mag = fir_trace(cycles, seed=0)
+    worst = total = 0.0
+    updates = 0
+    for i in range(cycles):
+        start = time.perf_counter()
+        guider.record_result(int(x[i]), coeffs[i].tolist(), int(mag[i]))
+        dt = time.perf_counter() - start
+        if (i + 1) % policy.every == 0:
+            updates += 1
+            worst = max(worst, dt)
+        total += dt
+    return {
+        "total": total,
+        "worst": worst,
+        "updates": updates,
+        "size": len(policy),
+        "r2": guider.model.score(X_test, y_test),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--cycles", type=int, default=100_000)
+    parser.add_argument("--full-cycles", type=int, default=10_000)
+    parser.add_argument("--every", type=int, default=50)
+    args = parser.parse_args()
+
+    X_test, y_test = holdout()
+    policies = [
+        ("full", lambda: FullRefit(args.every), min(args.cycles, args.full_cycles)),
+        ("window(1000)", lambda: SlidingWindow(args.every, 1000), args.cycles),
+        ("reservoir(1000)", lambda: Reservoir(args.every, 1000, seed=0), args.cycles),
+        ("warm(500, +2 trees)", lambda: WarmStart(args.every, 500, 2, 50), args.cycles),
+    ]
+
+    print(f"\n{'Policy':<22} {'cycles':>8} {'updates':>8} {'train s':>9} {'worst ms':>9} {'set':>7} {'R2':>6}")
+    print("-" * 75)
+    for name, factory, cycles in policies:
+        r = run(factory(), cycles, X_test, y_test)
+        print(
+            f"{name:<22} {cycles:>8} {r['updates']:>8} {r['total']:>9.1f} "
+            f"{r['worst'] * 1e3:>9.1f} {r['size']:>7} {r['r2']:>6.2f}"
+        )
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -9,16 +9,8 @@ from sklearn.neural_network import MLPRegressor
 from sklearn.metrics import mean_squared_error, r2_score
 import time
 
-def engineer_features(a, b):
-    """Features mejoradas para capturar multiplicación"""
-    return [
-        a, b,
-        a * a, b * b,
-        a + b, abs(a - b),
-        min(a, b), max(a, b),
-        (a >> 4), (b >> 4),
-        (a & 0x0F), (b & 0x0F),
-    ]
+from mult_table import engineer_features, load_table
+
 
 def train_and_evaluate(model_name, model, X_train, y_train, X_test, y_test):
     """Entrena y evalúa un modelo"""
@@ -84,7 +76,7 @@ def main():
     test_size = 1000
     test_a = np.random.randint(0, 256, test_size)
     test_b = np.random.randint(0, 256, test_size)
-    X_test = np.array([engineer_features(a, b) for a, b in zip(test_a, test_b)])
+    X_test = engineer_features(test_a, test_b)
     y_test = test_a * test_b
     
     results = {}
@@ -99,7 +91,7 @@ def main():
     np.random.seed(42)
     train_a = np.random.randint(0, 256, 2000)
     train_b = np.random.randint(0, 256, 2000)
-    X_train = np.array([engineer_features(a, b) for a, b in zip(train_a, train_b)])
+    X_train = engineer_features(train_a, train_b)
     y_train = train_a * train_b
     
     model = RandomForestRegressor(
@@ -149,7 +141,7 @@ def main():
     np.random.seed(42)
     train_a = np.random.randint(0, 256, 10000)
     train_b = np.random.randint(0, 256, 10000)
-    X_train = np.array([engineer_features(a, b) for a, b in zip(train_a, train_b)])
+    X_train = engineer_features(train_a, train_b)
     y_train = train_a * train_b
     
     model = MLPRegressor(
@@ -174,20 +166,13 @@ def main():
     print("\n\n" + "#"*60)
     print("#  EXPERIMENTO 4: EXHAUSTIVO (65536 combinaciones)")
     print("#"*60)
-    print("Generando todas las combinaciones posibles...")
-    
-    # Generar TODAS las combinaciones
-    all_a = []
-    all_b = []
-    for a in range(256):
-        for b in range(256):
-            all_a.append(a)
-            all_b.append(b)
-    
-    all_a = np.array(all_a)
-    all_b = np.array(all_b)
-    X_train_exhaustive = np.array([engineer_features(a, b) for a, b in zip(all_a, all_b)])
-    y_train_exhaustive = all_a * all_b
+    print("Cargando la tabla precalculada de todas las combinaciones...")
+    
+    # Tabla de verdad y features de TODAS las combinaciones (mult_table.py):
+    # se genera con NumPy la primera vez y luego se abre con mmap
+    table = load_table()
+    X_train_exhaustive = table.features
+    y_train_exhaustive = table.product
     
     print(f"Total de muestras: {len(X_train_exhaustive):,}")
     
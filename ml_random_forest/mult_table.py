@@ -0,0 +1,118 @@
+"""
+Tabla precalculada del espacio completo del multiplicador de 8 bits
+
+El multiplicador solo tiene 256 x 256 = 65536 entradas posibles, así que la
+tabla de verdad completa (product) y la matriz de features de todos los pares
+caben en ~3 MB. Se generan una sola vez con NumPy (sin bucles de Python) y se
+guardan como .npy en MULT_TABLE_DIR (por defecto ml_random_forest/.mult_table);
+las ejecuciones siguientes las abren con mmap, sin recalcular ni copiar.
+
+Cada par (a, b) ocupa la fila (a << 8) | b:
+
+    table = load_table()
+    expected = table.lookup(a, b)            # golden model, O(1)
+    X = table.features_of(train_a, train_b)  # features de un lote de pares
+    X_all, y_all = table.features, table.product  # entrenamiento exhaustivo
+
+El nombre del archivo incluye un hash de FEATURE_NAMES y de FORMAT_VERSION:
+si cambian las features se genera una tabla nueva en lugar de leer una vieja.
+"""
+
+import hashlib
+import os
+from pathlib import Path
+
+import numpy as np
+
+FEATURE_NAMES = ['a', 'b', 'a²', 'b²', 'a+b', '|a-b|', 'min', 'max', 'a_high', 'b_high', 'a_low', 'b_low']
+FORMAT_VERSION = 1
+WIDTH = 8
+SIZE = 1 << (2 * WIDTH)
+
+DEFAULT_DIR = Path(__file__).resolve().parent / ".mult_table"
+
+
+def engineer_features(a, b):
+    """
+    Features que ayudan al modelo a aprender la multiplicación.
+
+    Acepta escalares o arreglos (de la misma forma); retorna un arreglo con
+    las features en el último eje, en el orden de FEATURE_NAMES.
+    """
+    a = np.asarray(a, dtype=np.int32)
+    b = np.asarray(b, dtype=np.int32)
+    return np.stack([
+        a, b,
+        a * a, b * b,
+        a + b, np.abs(a - b),
+        np.minimum(a, b), np.maximum(a, b),
+        a >> 4, b >> 4,
+        a & 0x0F, b & 0x0F,
+    ], axis=-1)
+
+
+def index(a, b):
+    """Fila de la tabla del par (a, b); escalares o arreglos"""
+    return (np.asarray(a, dtype=np.intp) << WIDTH) | np.asarray(b, dtype=np.intp)
+
+
+def table_key():
+    text = f"v{FORMAT_VERSION}:{WIDTH}:" + ",".join(FEATURE_NAMES)
+    return hashlib.sha1(text.encode()).hexdigest()[:12]
+
+
+class MultTable:
+    """Tabla de verdad (product) y features de los 65536 pares (a, b)"""
+
+    def __init__(self, product, features):
+        self.product = product
+        self.features = features
+        # Lista de enteros de Python: lookup() escalar sin crear escalares NumPy
+        self._product = product.tolist()
+
+    def lookup(self, a, b):
+        """Producto esperado de (a, b) enteros"""
+        return self._product[(a << WIDTH) | b]
+
+    def lookup_batch(self, a, b):
+        """Productos esperados de arreglos de pares"""
+        return self.product[index(a, b)]
+
+    def features_of(self, a, b):
+        """Matriz de features de arreglos de pares (copia de las filas)"""
+        return self.features[index(a, b)]
+
+
+def build_table():
+    """Genera (product, features) del espacio completo en forma vectorizada"""
+    a, b = np.divmod(np.arange(SIZE, dtype=np.int32), 1 << WIDTH)
+    return (a * b).astype(np.uint16), engineer_features(a, b)
+
+
+def _save(path, array):
+    # Escritura atómica: otro proceso nunca ve un .npy a medio escribir
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(tmp, "wb") as f:
+        np.save(f, array)
+    os.replace(tmp, path)
+
+
+def load_table(directory=None, mmap=True):
+    """
+    Tabla del multiplicador, generándola y guardándola la primera vez.
+
+    Con mmap=True los arreglos son mapas de solo lectura del archivo.
+    """
+    directory = Path(directory or os.getenv("MULT_TABLE_DIR") or DEFAULT_DIR)
+    key = table_key()
+    product_path = directory / f"product_{key}.npy"
+    features_path = directory / f"features_{key}.npy"
+
+    if not (product_path.exists() and features_path.exists()):
+        directory.mkdir(parents=True, exist_ok=True)
+        product, features = build_table()
+        _save(product_path, product)
+        _save(features_path, features)
+
+    mode = "r" if mmap else None
+    return MultTable(np.load(product_path, mmap_mode=mode), np.load(features_path, mmap_mode=mode))
@@ -14,14 +14,25 @@ from sklearn.model_selection import train_test_split
 from sklearn.metrics import mean_squared_error, r2_score
 import matplotlib.pyplot as plt
 import os
+import time
 import warnings
 warnings.filterwarnings('ignore', category=UserWarning)
 
+from pathlib import Path
+
+from mult_table import FEATURE_NAMES, load_table
+from tb_utils.model_store import ModelStore
+
+MULT_SV = Path(__file__).resolve().parent / "mult.sv"
+
 
 class RandomForestVerifier:
     """Random Forest based verification agent for the multiplier"""
     
-    def __init__(self, n_estimators=200, max_depth=None, use_neural_net=False):
+    # Version of the state saved in the model store
+    STATE_VERSION = 1
+    
+    def __init__(self, n_estimators=200, max_depth=None, use_neural_net=False, store=None):
         """
         Initialize the Random Forest verifier
         
@@ -29,6 +40,8 @@ class RandomForestVerifier:
             n_estimators: Number of trees in the forest
             max_depth: Maximum depth of each tree (None = unlimited)
             use_neural_net: If True, use Neural Network instead of Random Forest
+            store: Optional tb_utils.model_store.ModelStore; a model trained
+                by an earlier run against the same RTL is loaded from it
         """
         self.use_neural_net = use_neural_net
         
@@ -62,36 +75,33 @@ class RandomForestVerifier:
             )
             self.model_name = "Random Forest"
         
-        self.training_data = []
+        # Truth table and engineered features of every (a, b) pair
+        self.table = load_table()
+        self.training_data = []  # Table rows (a << 8 | b)
         self.training_labels = []
         self.is_trained = False
         
-    def _engineer_features(self, a, b):
-        """Create engineered features to help model learn multiplication"""
-        # Original features
-        features = [a, b]
-        
-        # Add polynomial features that capture multiplication patterns
-        features.extend([
-            a * a,           # a²
-            b * b,           # b²
-            a + b,           # sum
-            abs(a - b),      # difference
-            min(a, b),       # minimum
-            max(a, b),       # maximum
-            (a >> 4),        # high bits of a
-            (b >> 4),        # high bits of b
-            (a & 0x0F),      # low bits of a
-            (b & 0x0F),      # low bits of b
-        ])
-        
-        return features
+        # Warm start from the model store (keyed by mult.sv, features and model)
+        self.store = store
+        self.schema = {
+            "features": FEATURE_NAMES,
+            "model": type(self.model).__name__,
+            "params": self.model.get_params(),
+        }
+        self.warm = False
+        if store is not None:
+            state = store.load(self.schema, self.STATE_VERSION)
+            if state is not None:
+                self.model = state["model"]
+                self.training_data = state["training_data"]
+                self.training_labels = state["training_labels"]
+                self.is_trained = True
+                self.warm = True
         
     def collect_training_data(self, a, b, product):
         """Collect data for training the model"""
-        # Use engineered features
-        features = self._engineer_features(a, b)
-        self.training_data.append(features)
+        # Features come from the precomputed table at train time
+        self.training_data.append((a << 8) | b)
         self.training_labels.append(product)
         
     def train(self):
@@ -99,7 +109,7 @@ class RandomForestVerifier:
         if len(self.training_data) < 10:
             raise ValueError("Need at least 10 samples to train")
             
-        X = np.array(self.training_data)
+        X = self.table.features[np.array(self.training_data)]
         y = np.array(self.training_labels)
         
         # Split data for validation
@@ -125,24 +135,36 @@ class RandomForestVerifier:
         
     def predict(self, a, b):
         """Predict the expected product using the trained model"""
+        return int(self.predict_batch([a], [b])[0])
+        
+    def predict_batch(self, a, b):
+        """Predict the expected products of arrays of inputs in one model call"""
         if not self.is_trained:
             raise ValueError("Model must be trained before prediction")
             
-        # Use engineered features for prediction
-        features = self._engineer_features(a, b)
-        X = np.array([features])
-        prediction = self.model.predict(X)
-        return int(round(prediction[0]))
+        prediction = self.model.predict(self.table.features_of(a, b))
+        return np.rint(prediction).astype(np.int64)
+        
+    def save(self):
+        """Save the trained model to the model store (if any)"""
+        if self.store is None or not self.is_trained:
+            return None
+        state = {
+            "model": self.model,
+            "training_data": self.training_data,
+            "training_labels": self.training_labels,
+        }
+        return self.store.save(state, self.schema, self.STATE_VERSION,
+                               samples=len(self.training_labels))
         
     def get_feature_importance(self):
         """Get feature importance from the Random Forest"""
         if not self.is_trained or self.use_neural_net:
             return None
         
-        feature_names = ['a', 'b', 'a²', 'b²', 'a+b', '|a-b|', 'min', 'max', 'a_high', 'b_high', 'a_low', 'b_low']
         importance_dict = {}
         
-        for i, name in enumerate(feature_names):
+        for i, name in enumerate(FEATURE_NAMES):
             if i < len(self.model.feature_importances_):
                 importance_dict[name] = self.model.feature_importances_[i]
         
@@ -167,48 +189,58 @@ async def test_mult_random_forest(dut):
     cocotb.log.info(f"\n[PHASE 1] Training the {model_type} Model")
     cocotb.log.info("-" * 80)
     
-    verifier = RandomForestVerifier(n_estimators=200, max_depth=None, use_neural_net=use_nn)
+    verifier = RandomForestVerifier(
+        n_estimators=200, max_depth=None, use_neural_net=use_nn,
+        store=ModelStore(f"mult_{'nn' if use_nn else 'rf'}", [MULT_SV]),
+    )
+    cocotb.log.info(verifier.store.summary())
     
-    # Generate training data using known-good samples
-    num_training_samples = 5000 if use_nn else 2000  # More samples for Neural Network
-    training_errors = 0
-    
-    for i in range(num_training_samples):
-        a = random.randint(0, 255)
-        b = random.randint(0, 255)
-        expected_product = a * b
+    if verifier.warm:
+        # Trained by an earlier run against the same mult.sv: skip Phase 1
+        cocotb.log.info(f"Loaded trained model ({len(verifier.training_labels)} samples), "
+                        f"skipping training data collection")
+    else:
+        # Generate training data using known-good samples
+        num_training_samples = 5000 if use_nn else 2000  # More samples for Neural Network
+        training_errors = 0
         
-        # Apply inputs to DUT
-        dut.a.value = a
-        dut.b.value = b
-        await Timer(1, unit='ns')
+        for i in range(num_training_samples):
+            a = random.randint(0, 255)
+            b = random.randint(0, 255)
+            expected_product = verifier.table.lookup(a, b)  # Golden model (table)
+        
+            # Apply inputs to DUT
+            dut.a.value = a
+            dut.b.value = b
+            await Timer(1, unit='ns')
         
-        # Get DUT output
-        dut_product = int(dut.product.value)
+            # Get DUT output
+            dut_product = int(dut.product.value)
         
-        # Verify DUT is working correctly during training
-        if dut_product != expected_product:
-            training_errors += 1
-            cocotb.log.error(f"Training sample {i}: DUT error! {a} * {b} = {dut_product}, expected {expected_product}")
+            # Verify DUT is working correctly during training
+            if dut_product != expected_product:
+                training_errors += 1
+                cocotb.log.error(f"Training sample {i}: DUT error! {a} * {b} = {dut_product}, expected {expected_product}")
         
-        # Collect training data
-        verifier.collect_training_data(a, b, expected_product)
+            # Collect training data
+            verifier.collect_training_data(a, b, expected_product)
         
-        if (i + 1) % 500 == 0:
-            cocotb.log.info(f"Collected {i + 1}/{num_training_samples} training samples")
-    
-    cocotb.log.info(f"Training data collection complete: {num_training_samples} samples")
-    cocotb.log.info(f"DUT errors during training: {training_errors}")
-    
-    # Train the model
-    cocotb.log.info("\nTraining Random Forest model...")
-    training_stats = verifier.train()
-    
-    cocotb.log.info(f"Model training complete!")
-    cocotb.log.info(f"  - Training samples: {training_stats['train_samples']}")
-    cocotb.log.info(f"  - Test samples: {training_stats['test_samples']}")
-    cocotb.log.info(f"  - Mean Squared Error: {training_stats['mse']:.4f}")
-    cocotb.log.info(f"  - R² Score: {training_stats['r2_score']:.4f}")
+            if (i + 1) % 500 == 0:
+                cocotb.log.info(f"Collected {i + 1}/{num_training_samples} training samples")
+        
+        cocotb.log.info(f"Training data collection complete: {num_training_samples} samples")
+        cocotb.log.info(f"DUT errors during training: {training_errors}")
+        
+        # Train the model
+        cocotb.log.info("\nTraining Random Forest model...")
+        training_stats = verifier.train()
+        
+        cocotb.log.info(f"Model training complete!")
+        cocotb.log.info(f"  - Training samples: {training_stats['train_samples']}")
+        cocotb.log.info(f"  - Test samples: {training_stats['test_samples']}")
+        cocotb.log.info(f"  - Mean Squared Error: {training_stats['mse']:.4f}")
+        cocotb.log.info(f"  - R² Score: {training_stats['r2_score']:.4f}")
+        verifier.save()
     
     # Feature importance (only for Random Forest)
     importance = verifier.get_feature_importance()
@@ -224,44 +256,59 @@ async def test_mult_random_forest(dut):
     cocotb.log.info("-" * 80)
     
     num_test_samples = 500
+    # Predictions are made ahead of driving, in chunks of this many stimuli
+    # (0 = the whole planned set in a single model call)
+    predict_chunk = int(os.getenv("PREDICT_CHUNK", "0")) or num_test_samples
     ml_predictions = []
     actual_products = []
     dut_outputs = []
     ml_errors = 0
     dut_errors = 0
-    
-    for i in range(num_test_samples):
-        # Generate random test inputs
-        a = random.randint(0, 255)
-        b = random.randint(0, 255)
-        expected_product = a * b
-        
-        # ML prediction
-        ml_prediction = verifier.predict(a, b)
-        ml_predictions.append(ml_prediction)
-        actual_products.append(expected_product)
-        
-        # DUT simulation
-        dut.a.value = a
-        dut.b.value = b
-        await Timer(1, unit='ns')
-        dut_product = int(dut.product.value)
-        dut_outputs.append(dut_product)
-        
-        # Check ML prediction accuracy
-        if ml_prediction != expected_product:
-            ml_errors += 1
-            if ml_errors <= 5:  # Only log first few errors
-                cocotb.log.warning(f"ML prediction error at test {i}: {a} * {b} = {ml_prediction} (ML), expected {expected_product}")
-        
-        # Check DUT accuracy
-        if dut_product != expected_product:
-            dut_errors += 1
-            cocotb.log.error(f"DUT error at test {i}: {a} * {b} = {dut_product}, expected {expected_product}")
-        
-        # Log progress
-        if (i + 1) % 100 == 0:
-            cocotb.log.info(f"Verified {i + 1}/{num_test_samples} test cases")
+    predict_time = 0.0
+    sim_time = 0.0
+    model_calls = 0
+    
+    # Plan the whole stimulus set up front
+    stimuli = [(random.randint(0, 255), random.randint(0, 255)) for _ in range(num_test_samples)]
+    
+    for chunk_start in range(0, num_test_samples, predict_chunk):
+        chunk = stimuli[chunk_start:chunk_start + predict_chunk]
+        
+        # ML prediction of the whole chunk in one model call
+        start = time.perf_counter()
+        chunk_a, chunk_b = np.array(chunk).T
+        chunk_predictions = verifier.predict_batch(chunk_a, chunk_b).tolist()
+        predict_time += time.perf_counter() - start
+        model_calls += 1
+        
+        for i, (a, b), ml_prediction in zip(range(chunk_start, num_test_samples), chunk, chunk_predictions):
+            expected_product = verifier.table.lookup(a, b)  # Golden model (table)
+            ml_predictions.append(ml_prediction)
+            actual_products.append(expected_product)
+            
+            # DUT simulation
+            start = time.perf_counter()
+            dut.a.value = a
+            dut.b.value = b
+            await Timer(1, unit='ns')
+            dut_product = int(dut.product.value)
+            sim_time += time.perf_counter() - start
+            dut_outputs.append(dut_product)
+            
+            # Check ML prediction accuracy
+            if ml_prediction != expected_product:
+                ml_errors += 1
+                if ml_errors <= 5:  # Only log first few errors
+                    cocotb.log.warning(f"ML prediction error at test {i}: {a} * {b} = {ml_prediction} (ML), expected {expected_product}")
+            
+            # Check DUT accuracy
+            if dut_product != expected_product:
+                dut_errors += 1
+                cocotb.log.error(f"DUT error at test {i}: {a} * {b} = {dut_product}, expected {expected_product}")
+            
+            # Log progress
+            if (i + 1) % 100 == 0:
+                cocotb.log.info(f"Verified {i + 1}/{num_test_samples} test cases")
     
     # Phase 3: Results and Analysis
     cocotb.log.info("\n[PHASE 3] Verification Results")
@@ -275,6 +322,12 @@ async def test_mult_random_forest(dut):
     cocotb.log.info(f"  - ML Prediction accuracy (exact): {ml_accuracy:.2f}% ({num_test_samples - ml_errors}/{num_test_samples})")
     cocotb.log.info(f"  - DUT accuracy: {dut_accuracy:.2f}% ({num_test_samples - dut_errors}/{num_test_samples})")
     
+    cocotb.log.info(f"\nTiming Breakdown (wall clock):")
+    cocotb.log.info(f"  - ML prediction: {predict_time * 1e3:.1f} ms in {model_calls} model call(s) "
+                    f"({predict_time / num_test_samples * 1e6:.1f} us/sample, chunk={predict_chunk})")
+    cocotb.log.info(f"  - DUT simulation: {sim_time * 1e3:.1f} ms "
+                    f"({sim_time / num_test_samples * 1e6:.1f} us/sample)")
+    
     # Calculate accuracy with tolerance (within 1% error)
     ml_predictions_np = np.array(ml_predictions)
     actual_products_np = np.array(actual_products)
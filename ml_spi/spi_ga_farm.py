@@ -0,0 +1,259 @@
+"""
+Algoritmo genético multi-isla con fitness medido en simulación real
+
+MLSequenceGenerator.evolve puntúa los candidatos con un modelo de cobertura
+en Python. Este script los evalúa en simulación: lanza un pool de procesos de
+simulador independientes (una instancia de spi_top cada uno, vía
+cocotb_tools.runner, todos sobre la misma compilación) que quedan vivos
+durante toda la evolución y ejecutan el test spi_ga_worker.ga_worker.
+
+Cada generación, las poblaciones de todas las islas se reparten entre los
+simuladores, se ejecutan en paralelo y el fitness real vuelve a cada isla
+(MLSequenceGenerator.next_generation). Cada `migration_interval`
+generaciones los mejores individuos de cada isla reemplazan a los peores de
+la siguiente (anillo).
+
+Uso:
+    python spi_ga_farm.py [--islands 4] [--workers N] [--population 20]
+                          [--generations 20] [--out best_sequences.json]
+
+Las secuencias ganadoras se guardan en JSON; test_ml_sequence_generation las
+usa en lugar de evolucionar si se define SPI_GA_SEQUENCES=<archivo>.
+"""
+
+import argparse
+import json
+import os
+import random
+import socket
+import sys
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+from cocotb_tools.runner import get_runner
+
+PROJ_PATH = Path(__file__).resolve().parent
+# tb_utils/ vive en la raíz del repositorio (cocotb reenvía sys.path al simulador)
+REPO_ROOT = PROJ_PATH.parent
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from tb_utils.build_cache import cached_build  # noqa: E402
+from test_spi_ml import MLSequenceGenerator  # noqa: E402
+
+SOURCES = [PROJ_PATH / "spi_master.sv", PROJ_PATH / "spi_slave.sv", PROJ_PATH / "spi_top.sv"]
+
+
+class SimulatorPool:
+    """
+    Pool de procesos de simulador persistentes que evalúan secuencias SPI.
+
+    Cada trabajador es un `runner.test(...)` en su propio hilo (el hilo solo
+    espera al proceso del simulador) y se comunica por un socket local con
+    mensajes JSON de una línea.
+    """
+
+    def __init__(self, workers=None, sim="icarus", work_dir="sim_build_ga", connect_timeout=300):
+        self.workers = workers or os.cpu_count() or 1
+        self.sim = sim
+        self.work_dir = Path(work_dir).resolve()
+        self.connect_timeout = connect_timeout
+        self.evaluated = 0
+        self.sim_cycles = 0
+        self.eval_time = 0.0
+        self._threads = []
+        self._streams = []
+        self._errors = []
+        self._server = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def start(self):
+        build = cached_build(
+            get_runner(self.sim), sources=SOURCES, hdl_toplevel="spi_top",
+            build_dir=self.work_dir / "sim_build", timescale=("1ns", "1ps"),
+        )
+
+        self._server = socket.create_server(("127.0.0.1", 0))
+        self._server.settimeout(1.0)
+        address = "%s:%d" % self._server.getsockname()
+
+        for i in range(self.workers):
+            t = threading.Thread(target=self._run_worker, args=(i, build, address), daemon=True)
+            t.start()
+            self._threads.append(t)
+
+        # Esperar a que todos los simuladores se conecten
+        deadline = time.monotonic() + self.connect_timeout
+        while len(self._streams) < self.workers:
+            if self._errors or not any(t.is_alive() for t in self._threads):
+                self.close()
+                raise RuntimeError(f"Un simulador terminó antes de conectarse: {self._errors}")
+            if time.monotonic() > deadline:
+                self.close()
+                raise TimeoutError("Los simuladores no se conectaron a tiempo")
+            try:
+                conn, _ = self._server.accept()
+            except socket.timeout:
+                continue
+            conn.settimeout(None)
+            stream = conn.makefile("rw")
+            json.loads(stream.readline())  # {"worker": id}
+            self._streams.append(stream)
+
+    def _run_worker(self, i, build, address):
+        test_dir = self.work_dir / f"worker_{i}"
+        test_dir.mkdir(parents=True, exist_ok=True)
+        kwargs = build.test_kwargs()
+        kwargs["test_dir"] = test_dir
+        try:
+            # Un Runner por hilo: runner.test guarda estado en el objeto
+            get_runner(self.sim).test(
+                hdl_toplevel="spi_top",
+                test_module="spi_ga_worker",
+                testcase="ga_worker",
+                extra_env={"SPI_GA_ADDRESS": address, "SPI_GA_WORKER": str(i)},
+                results_xml=str(test_dir / "results.xml"),
+                log_file=test_dir / "sim.log",
+                **kwargs,
+            )
+        except Exception as e:  # noqa: BLE001 - se reporta desde start()
+            self._errors.append(f"worker {i}: {e} (ver {test_dir / 'sim.log'})")
+
+    def evaluate(self, populations):
+        """
+        Fitness real de varias poblaciones (slaves, data). Todos los
+        candidatos se reparten en partes iguales entre los simuladores.
+        Retorna un arreglo de fitness por población.
+        """
+        start = time.perf_counter()
+        sequences = []
+        for slaves, data in populations:
+            sequences += MLSequenceGenerator.to_sequences(slaves, data)
+
+        chunks = np.array_split(np.arange(len(sequences)), len(self._streams))
+        for stream, idx in zip(self._streams, chunks):
+            stream.write(json.dumps({"sequences": [sequences[i] for i in idx]}) + "\n")
+            stream.flush()
+        results = []
+        for stream in self._streams:
+            line = stream.readline()
+            if not line:
+                raise RuntimeError(f"Un simulador se cerró durante la evaluación: {self._errors}")
+            results += json.loads(line)["results"]
+
+        self.evaluated += len(results)
+        self.sim_cycles += sum(r["cycles"] for r in results)
+        self.eval_time += time.perf_counter() - start
+
+        fitness = np.array([r["fitness"] for r in results])
+        sizes = np.cumsum([len(s) for s, _ in populations])[:-1]
+        return np.split(fitness, sizes)
+
+    def close(self):
+        for stream in self._streams:
+            try:
+                stream.write(json.dumps({"stop": True}) + "\n")
+                stream.flush()
+                stream.close()
+            except OSError:
+                pass
+        self._streams = []
+        for t in self._threads:
+            t.join()
+        self._threads = []
+        if self._server is not None:
+            self._server.close()
+            self._server = None
+
+    def summary(self):
+        rate = self.evaluated / self.eval_time if self.eval_time else 0.0
+        return (
+            f"[GA pool] {self.workers} simuladores: {self.evaluated} secuencias evaluadas, "
+            f"{self.sim_cycles} ciclos simulados, {self.eval_time:.1f} s ({rate:.1f} secuencias/s)"
+        )
+
+
+class IslandGA:
+    """Una población (MLSequenceGenerator) por isla, con migración en anillo."""
+
+    def __init__(self, pool, islands=4, population_size=20, sequence_length=10,
+                 migration_interval=5, migrants=2, seed=None):
+        self.pool = pool
+        self.migration_interval = migration_interval
+        self.migrants = migrants
+        base = random.getrandbits(32) if seed is None else seed
+        self.islands = [
+            MLSequenceGenerator(population_size, sequence_length, seed=base + i)
+            for i in range(islands)
+        ]
+
+    def migrate(self):
+        """Los mejores de cada isla (primeras filas, élite) reemplazan a los
+        últimos de la isla siguiente."""
+        m = self.migrants
+        best = [(s[:m].copy(), d[:m].copy()) for s, d in (isl.population for isl in self.islands)]
+        for i, isl in enumerate(self.islands):
+            slaves, data = isl.population
+            src_slaves, src_data = best[i - 1]
+            slaves[-m:], data[-m:] = src_slaves, src_data
+
+    def evolve(self, generations=20, k=5):
+        for isl in self.islands:
+            isl.initialize_population()
+
+        for gen in range(generations):
+            fitness = self.pool.evaluate([isl.population for isl in self.islands])
+            best = [isl.next_generation(f) for isl, f in zip(self.islands, fitness)]
+            if self.migrants and (gen + 1) % self.migration_interval == 0:
+                self.migrate()
+            print(f"  Generación {gen+1}/{generations}: mejor fitness real por isla = "
+                  + ", ".join(f"{b:.1f}" for b in best))
+
+        # Mejores k secuencias entre todas las islas
+        fitness = self.pool.evaluate([isl.population for isl in self.islands])
+        ranked = []
+        for isl, f in zip(self.islands, fitness):
+            ranked += zip(f.tolist(), isl.best(f, k))
+        ranked.sort(key=lambda r: -r[0])
+        return ranked[:k]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--islands", type=int, default=4)
+    parser.add_argument("--workers", type=int, default=None,
+                        help="procesos de simulador (por defecto min(islas, CPUs))")
+    parser.add_argument("--population", type=int, default=20)
+    parser.add_argument("--length", type=int, default=10)
+    parser.add_argument("--generations", type=int, default=20)
+    parser.add_argument("--migration-interval", type=int, default=5)
+    parser.add_argument("--migrants", type=int, default=2)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--sim", default=os.getenv("SIM", "icarus"))
+    parser.add_argument("--out", type=Path, default=PROJ_PATH / "best_sequences.json")
+    args = parser.parse_args(argv)
+
+    workers = args.workers or min(args.islands, os.cpu_count() or 1)
+    with SimulatorPool(workers, args.sim, PROJ_PATH / "sim_build_ga") as pool:
+        ga = IslandGA(pool, args.islands, args.population, args.length,
+                      args.migration_interval, args.migrants, args.seed)
+        best = ga.evolve(args.generations)
+        print(pool.summary())
+
+    for fitness, seq in best:
+        print(f"  fitness {fitness:6.1f}: {seq}")
+    args.out.write_text(json.dumps([seq for _, seq in best]))
+    print(f"Secuencias guardadas en {args.out} (SPI_GA_SEQUENCES={args.out} make test_ml)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,114 @@
+"""
+Trabajador de simulación para el algoritmo genético de spi_ga_farm.py
+
+Cada proceso de simulador (una instancia de spi_top) ejecuta el test
+`ga_worker`: se conecta al proceso padre (SPI_GA_ADDRESS=host:puerto), recibe
+lotes de secuencias candidatas como líneas JSON, ejecuta cada una en el DUT
+desde reset y responde con su fitness medido en simulación.
+
+Fitness real = MLSequenceGenerator.evaluate_fitness de la secuencia aplicada
++ RESPONSE_WEIGHT * la cobertura de las RESPUESTAS observadas en rx_data
+(que dependen del estado interno de cada slave y el modelo en Python no ve).
+
+Protocolo (una línea JSON por mensaje):
+    trabajador -> padre: {"worker": id}
+    padre -> trabajador: {"sequences": [[[slave, data], ...], ...]} | {"stop": true}
+    trabajador -> padre: {"results": [{"fitness", "coverage", "response", "cycles"}, ...]}
+"""
+
+import json
+import os
+import socket
+
+import cocotb
+from cocotb.clock import Clock
+from cocotb.triggers import ClockCycles
+from cocotb.utils import get_sim_time
+
+from test_spi_ml import CoverageMetrics, MLSequenceGenerator, spi_write_read
+from tb_utils.coverage_db import CoverageDB
+
+CLOCK_PERIOD_NS = 10
+# Peso de la cobertura de respuestas en el fitness real
+RESPONSE_WEIGHT = 0.5
+SLAVE_IDS = (0xA0, 0xB1)  # internal_reg de cada slave después de reset
+# Solo para evaluate_fitness: la semilla fija no consume el `random` de cocotb
+STIMULUS_MODEL = MLSequenceGenerator(seed=0)
+
+
+class ResponseCoverage:
+    """Cobertura de lo que devuelve el DUT: rango de rx_data por slave y ID de reset"""
+
+    def __init__(self):
+        self.db = CoverageDB("spi_response")
+        cg = self.db.covergroup("response")
+        self.rx_ranges = cg.coverpoint(
+            "rx_ranges", (2, 4), labels=[f"slave{s}_rx_range{r}" for s in range(2) for r in range(4)])
+        self.reset_id = cg.coverpoint("reset_id", [f"slave{s}_id" for s in range(2)])
+        self.group = cg
+
+    def sample(self, slave_id, rx_data):
+        self.rx_ranges.sample(slave_id, rx_data // 64)
+        if rx_data == SLAVE_IDS[slave_id]:
+            self.reset_id.sample(slave_id)
+
+
+async def reset_dut(dut):
+    dut.rst_n.value = 0
+    dut.tx_valid.value = 0
+    dut.tx_data.value = 0
+    dut.slave_select.value = 0
+    await ClockCycles(dut.clk, 2)
+    dut.rst_n.value = 1
+    await ClockCycles(dut.clk, 2)
+
+
+async def evaluate(dut, sequence):
+    """Ejecuta una secuencia desde reset y mide su fitness real"""
+    await reset_dut(dut)
+    start = get_sim_time("ns")
+
+    stimulus = CoverageMetrics()
+    response = ResponseCoverage()
+    for slave_id, tx_data in sequence:
+        rx_data = await spi_write_read(dut, slave_id, tx_data)
+        response.sample(slave_id, rx_data)
+    stimulus.update(sequence)
+
+    total_cov, _ = stimulus.get_coverage_percentage()
+    fitness = (
+        STIMULUS_MODEL.evaluate_fitness(sequence)
+        + RESPONSE_WEIGHT * response.group.coverage
+    )
+    return {
+        "fitness": fitness,
+        "coverage": total_cov,
+        "response": response.group.coverage,
+        "cycles": round((get_sim_time("ns") - start) / CLOCK_PERIOD_NS),
+    }
+
+
+@cocotb.test()
+async def ga_worker(dut):
+    """Evalúa lotes de candidatos enviados por spi_ga_farm.py hasta recibir stop"""
+    host, port = os.environ["SPI_GA_ADDRESS"].rsplit(":", 1)
+    worker_id = int(os.getenv("SPI_GA_WORKER", "0"))
+
+    cocotb.start_soon(Clock(dut.clk, CLOCK_PERIOD_NS, unit="ns").start())
+
+    # Las lecturas del socket bloquean el simulador: no hay nada más que
+    # simular mientras el padre prepara la siguiente generación.
+    with socket.create_connection((host, int(port))) as sock, sock.makefile("rw") as stream:
+        stream.write(json.dumps({"worker": worker_id}) + "\n")
+        stream.flush()
+        evaluated = 0
+        for line in stream:
+            msg = json.loads(line)
+            if msg.get("stop"):
+                break
+            results = [await evaluate(dut, [tuple(t) for t in seq]) for seq in msg["sequences"]]
+            evaluated += len(results)
+            stream.write(json.dumps({"results": results}) + "\n")
+            stream.flush()
+
+    cocotb.log.info(f"[GA worker {worker_id}] {evaluated} secuencias evaluadas")
@@ -10,12 +10,23 @@ OBJETIVO PRINCIPAL:
 ML se usa para OPTIMIZAR qué secuencias probar, no para predecir comportamiento.
 """
 
+import json
+import os
+
 import cocotb
 from cocotb.triggers import RisingEdge, ClockCycles
 from cocotb.clock import Clock
+from cocotb.utils import get_sim_time
 import random
 import numpy as np
-from collections import defaultdict
+
+from tb_utils.closure import closure_from_env
+from tb_utils.coverage_db import CoverageDB, coverage_path
+from tb_utils.waits import wait_until
+
+# Timeouts de los handshakes del maestro SPI (ciclos de reloj)
+TX_READY_TIMEOUT = 100
+RX_VALID_TIMEOUT = 500
 
 
 # ==============================================================================
@@ -38,111 +49,88 @@ class SPITransaction:
 class CoverageMetrics:
     """
     Define y rastrea cobertura funcional del sistema SPI
+
+    Los bins se declaran una vez como coverpoints enteros de un CoverageDB
+    (tb_utils.coverage_db): muestrear es incrementar un contador y los bins
+    sin cubrir se mantienen como máscara de bits.
     """
-    
+
+    CORNERS = {0x00: 0, 0xFF: 1, 0xAA: 2, 0x55: 3}
+    CORNER_NAMES = ['zero', 'max', 'pattern_AA', 'pattern_55']
+
     def __init__(self):
-        # Bins de cobertura
-        self.slave_access = defaultdict(int)  # Accesos por esclavo
-        self.transitions = defaultdict(int)   # Transiciones S0->S1, S1->S0, etc
-        self.data_ranges = defaultdict(int)   # Rangos de datos: 0x00-0x3F, 0x40-0x7F, etc
-        self.sequence_patterns = defaultdict(int)  # Patrones de 3 transacciones
-        self.corner_cases = defaultdict(int)  # Casos especiales
-        
+        self.db = CoverageDB("spi")
+        cg = self.db.covergroup("spi")
+
+        # Bins de cobertura (los nombres son las categorías del reporte)
+        self.slave_access = cg.coverpoint(  # Accesos por esclavo
+            'slaves', [f"slave_{s}" for s in range(2)])
+        self.transitions = cg.cross(        # Transiciones S0->S1, S1->S0, etc
+            'transitions', self.slave_access, self.slave_access,
+            labels=[f"S{a}->S{b}" for a in range(2) for b in range(2)])
+        self.data_ranges = cg.coverpoint(   # Rangos de datos: 0x00-0x3F, 0x40-0x7F, etc (× slave)
+            'data_ranges', (2, 4),
+            labels=[f"slave{s}_range{r}" for s in range(2) for r in range(4)])
+        self.corner_cases = cg.coverpoint(  # Casos especiales (× slave)
+            'corner_cases', (2, 4),
+            labels=[f"slave{s}_{c}" for s in range(2) for c in self.CORNER_NAMES])
+        self.sequence_patterns = cg.coverpoint(  # Patrones de 3 transacciones (3 bits)
+            'patterns', [f"S{a}S{b}S{c}" for a in range(2) for b in range(2) for c in range(2)])
+        self.group = cg
+
         self.total_transactions = 0
-        
+
     def update(self, sequence):
         """
         Actualiza cobertura con una secuencia de transacciones
         sequence: lista de (slave_id, data)
         """
         self.total_transactions += len(sequence)
-        
+
         for slave_id, data in sequence:
             # Cobertura: accesos a cada esclavo
-            self.slave_access[slave_id] += 1
-            
+            self.slave_access.sample(slave_id)
+
             # Cobertura: rangos de datos
-            data_bin = data // 64  # 0-63, 64-127, 128-191, 192-255
-            self.data_ranges[f"slave{slave_id}_range{data_bin}"] += 1
-            
+            self.data_ranges.sample(slave_id, data // 64)  # 0-63, 64-127, 128-191, 192-255
+
             # Cobertura: corner cases
-            if data == 0x00:
-                self.corner_cases[f"slave{slave_id}_zero"] += 1
-            elif data == 0xFF:
-                self.corner_cases[f"slave{slave_id}_max"] += 1
-            elif data == 0xAA:
-                self.corner_cases[f"slave{slave_id}_pattern_AA"] += 1
-            elif data == 0x55:
-                self.corner_cases[f"slave{slave_id}_pattern_55"] += 1
-        
+            corner = self.CORNERS.get(data)
+            if corner is not None:
+                self.corner_cases.sample(slave_id, corner)
+
         # Cobertura: transiciones entre esclavos
-        for i in range(len(sequence) - 1):
-            curr_slave = sequence[i][0]
-            next_slave = sequence[i + 1][0]
-            self.transitions[f"S{curr_slave}->S{next_slave}"] += 1
-        
+        slaves = [s[0] for s in sequence]
+        for curr_slave, next_slave in zip(slaves, slaves[1:]):
+            self.transitions.sample(curr_slave, next_slave)
+
         # Cobertura: patrones de secuencia (3 elementos)
-        if len(sequence) >= 3:
-            for i in range(len(sequence) - 2):
-                pattern = tuple(s[0] for s in sequence[i:i+3])
-                self.sequence_patterns[pattern] += 1
-    
+        for a, b, c in zip(slaves, slaves[1:], slaves[2:]):
+            self.sequence_patterns.sample(a * 4 + b * 2 + c)
+
     def get_coverage_percentage(self):
         """Calcula porcentaje de cobertura alcanzado"""
-        # Definir bins esperados
-        expected_bins = {
-            'slaves': 2,  # Slave 0, Slave 1
-            'transitions': 4,  # S0->S0, S0->S1, S1->S0, S1->S1
-            'data_ranges': 8,  # 4 rangos × 2 slaves
-            'corner_cases': 8,  # 4 corners × 2 slaves
-            'patterns': 8,  # Al menos 8 patrones diferentes
-        }
-        
-        coverage = {
-            'slaves': len(self.slave_access) / expected_bins['slaves'] * 100,
-            'transitions': len(self.transitions) / expected_bins['transitions'] * 100,
-            'data_ranges': len(self.data_ranges) / expected_bins['data_ranges'] * 100,
-            'corner_cases': len(self.corner_cases) / expected_bins['corner_cases'] * 100,
-            'patterns': min(len(self.sequence_patterns) / expected_bins['patterns'] * 100, 100),
-        }
-        
-        # Promedio ponderado
-        total_coverage = sum(coverage.values()) / len(coverage)
-        
-        return total_coverage, coverage
-    
+        coverage = {point.name: point.coverage for point in self.group}
+
+        # Promedio de las categorías
+        return self.group.coverage, coverage
+
     def get_uncovered_items(self):
         """Retorna items que aún no se han cubierto"""
-        uncovered = []
-        
-        # Slaves no accedidos
-        for slave_id in [0, 1]:
-            if slave_id not in self.slave_access:
-                uncovered.append(f"slave_{slave_id}")
-        
-        # Transiciones faltantes
-        for s1 in [0, 1]:
-            for s2 in [0, 1]:
-                trans = f"S{s1}->S{s2}"
-                if trans not in self.transitions:
-                    uncovered.append(trans)
-        
-        # Rangos de datos faltantes
-        for slave_id in [0, 1]:
-            for bin_id in range(4):
-                key = f"slave{slave_id}_range{bin_id}"
-                if key not in self.data_ranges:
-                    uncovered.append(key)
-        
-        # Corner cases faltantes
-        for slave_id in [0, 1]:
-            for corner in ['zero', 'max', 'pattern_AA', 'pattern_55']:
-                key = f"slave{slave_id}_{corner}"
-                if key not in self.corner_cases:
-                    uncovered.append(key)
-        
-        return uncovered
-    
+        # Slaves no accedidos, transiciones, rangos de datos y corner cases faltantes
+        return (
+            self.slave_access.uncovered()
+            + self.transitions.uncovered()
+            + self.data_ranges.uncovered()
+            + self.corner_cases.uncovered()
+        )
+
+    def save(self, test_name):
+        """Escribe la base de cobertura del test (una por semilla)"""
+        path = self.db.save(coverage_path(test_name, cocotb.RANDOM_SEED))
+        cocotb.log.info(f"Cobertura guardada en {path}")
+        return path
+
     def print_report(self):
         """Imprime reporte de cobertura"""
         total_cov, detailed_cov = self.get_coverage_percentage()
@@ -170,106 +158,173 @@ class MLSequenceGenerator:
     """
     Generador de secuencias usando algoritmo genético simple
     Optimiza secuencias para maximizar cobertura
+
+    La población se codifica como dos matrices NumPy (population_size ×
+    sequence_length): slave_id y data. El fitness de todos los individuos se
+    calcula a la vez marcando los bins que toca cada uno con np.bincount, sin
+    crear un CoverageMetrics por candidato.
     """
-    
-    def __init__(self, population_size=20, sequence_length=10):
+
+    # Bins del fitness (mismas categorías que CoverageMetrics), como columnas
+    # de la matriz de hits: [inicio, fin) de cada categoría
+    SLAVE_BINS = (0, 2)        # slave_id
+    TRANSITION_BINS = (2, 6)   # prev*2 + next
+    RANGE_BINS = (6, 14)       # slave*4 + data//64
+    CORNER_BINS = (14, 22)     # slave*4 + tipo de corner
+    PATTERN_BINS = (22, 30)    # 3 slaves consecutivos como número de 3 bits
+    ANY_RANGE_BINS = (30, 34)  # data//64 sin importar el slave (bonus diversidad)
+    N_BINS = 35                # + 1 bin descartable para datos que no son corner
+
+    # data -> tipo de corner (0x00, 0xFF, 0xAA, 0x55) o el bin descartable
+    CORNER_KIND = np.full(256, -1, dtype=np.int64)
+    CORNER_KIND[[0x00, 0xFF, 0xAA, 0x55]] = [0, 1, 2, 3]
+
+    def __init__(self, population_size=20, sequence_length=10, seed=None):
         self.population_size = population_size
         self.sequence_length = sequence_length
-        self.population = []
+        self.population = None # (slaves, data)
         self.best_sequences = []
-        
+        # Semilla derivada de `random` para respetar la semilla de cocotb
+        self.rng = np.random.default_rng(random.getrandbits(32) if seed is None else seed)
+
+    def random_population(self, n):
+        """n secuencias aleatorias como matrices (slaves, data)"""
+        slaves = self.rng.integers(0, 2, size=(n, self.sequence_length))
+        data = self.rng.integers(0, 256, size=(n, self.sequence_length))
+        return slaves, data
+
     def generate_random_sequence(self):
         """Genera una secuencia aleatoria"""
-        sequence = []
-        for _ in range(self.sequence_length):
-            slave_id = random.randint(0, 1)
-            data = random.randint(0, 255)
-            sequence.append((slave_id, data))
-        return sequence
-    
+        slaves, data = self.random_population(1)
+        return self.to_sequences(slaves, data)[0]
+
     def initialize_population(self):
         """Inicializa población con secuencias aleatorias"""
-        self.population = [self.generate_random_sequence() 
-                          for _ in range(self.population_size)]
-    
+        self.population = self.random_population(self.population_size)
+
+    @staticmethod
+    def to_sequences(slaves, data):
+        """Matrices (slaves, data) -> lista de secuencias [(slave_id, data), ...]"""
+        return [list(zip(s, d)) for s, d in zip(slaves.tolist(), data.tolist())]
+
+    def bin_hits(self, slaves, data):
+        """Matriz booleana (n × N_BINS): qué bins toca cada individuo"""
+        n, length = slaves.shape
+        ranges = data // 64
+        corner = self.CORNER_KIND[data]
+        cols = [
+            self.SLAVE_BINS[0] + slaves,
+            self.TRANSITION_BINS[0] + slaves[:, :-1] * 2 + slaves[:, 1:],
+            self.RANGE_BINS[0] + slaves * 4 + ranges,
+            np.where(corner >= 0, self.CORNER_BINS[0] + slaves * 4 + corner, self.N_BINS - 1),
+            self.PATTERN_BINS[0] + slaves[:, :-2] * 4 + slaves[:, 1:-1] * 2 + slaves[:, 2:],
+            self.ANY_RANGE_BINS[0] + ranges,
+        ]
+        idx = np.concatenate(cols, axis=1)
+        flat = idx + (np.arange(n) * self.N_BINS)[:, None]
+        counts = np.bincount(flat.ravel(), minlength=n * self.N_BINS)
+        return counts.reshape(n, self.N_BINS) > 0
+
+    def fitness_batch(self, slaves, data):
+        """Fitness de toda la población a la vez (mismo cálculo que evaluate_fitness)"""
+        hits = self.bin_hits(slaves, data)
+
+        def covered(bins):
+            return hits[:, bins[0]:bins[1]].sum(axis=1)
+
+        coverage = (
+            covered(self.SLAVE_BINS) / 2
+            + covered(self.TRANSITION_BINS) / 4
+            + covered(self.RANGE_BINS) / 8
+            + covered(self.CORNER_BINS) / 8
+            + np.minimum(covered(self.PATTERN_BINS) / 8, 1.0)
+        ) * 100 / 5
+
+        # Bonus por diversidad
+        unique_slaves = covered(self.SLAVE_BINS)
+        unique_data_ranges = covered(self.ANY_RANGE_BINS)
+        return coverage + (unique_slaves * 5) + (unique_data_ranges * 2)
+
     def evaluate_fitness(self, sequence):
         """
         Evalúa qué tan buena es una secuencia
         Fitness = cobertura que aporta
         """
-        coverage = CoverageMetrics()
-        coverage.update(sequence)
-        total_cov, _ = coverage.get_coverage_percentage()
-        
-        # Bonus por diversidad
-        unique_slaves = len(set(s[0] for s in sequence))
-        unique_data_ranges = len(set(s[1] // 64 for s in sequence))
-        
-        fitness = total_cov + (unique_slaves * 5) + (unique_data_ranges * 2)
-        return fitness
-    
-    def crossover(self, parent1, parent2):
-        """Cruza dos secuencias padres"""
-        crossover_point = random.randint(1, self.sequence_length - 1)
-        child = parent1[:crossover_point] + parent2[crossover_point:]
-        return child
-    
-    def mutate(self, sequence, mutation_rate=0.2):
-        """Muta una secuencia"""
-        mutated = sequence.copy()
-        for i in range(len(mutated)):
-            if random.random() < mutation_rate:
-                # Mutar: cambiar slave o data
-                if random.random() < 0.5:
-                    mutated[i] = (1 - mutated[i][0], mutated[i][1])  # Cambiar slave
-                else:
-                    mutated[i] = (mutated[i][0], random.randint(0, 255))  # Cambiar data
-        return mutated
-    
-    def evolve(self, generations=10):
+        arr = np.asarray(sequence, dtype=np.int64).reshape(1, -1, 2)
+        return float(self.fitness_batch(arr[:, :, 0], arr[:, :, 1])[0])
+
+    def crossover(self, parents1, parents2):
+        """Cruza pares de secuencias padres (un punto de corte por hijo)"""
+        slaves1, data1 = parents1
+        slaves2, data2 = parents2
+        points = self.rng.integers(1, self.sequence_length, size=len(slaves1))
+        take_first = np.arange(self.sequence_length)[None, :] < points[:, None]
+        return np.where(take_first, slaves1, slaves2), np.where(take_first, data1, data2)
+
+    def mutate(self, slaves, data, mutation_rate=0.2):
+        """Muta las secuencias: cambiar slave o data con probabilidad mutation_rate"""
+        mutate = self.rng.random(slaves.shape) < mutation_rate
+        flip_slave = self.rng.random(slaves.shape) < 0.5
+        slaves = np.where(mutate & flip_slave, 1 - slaves, slaves)
+        data = np.where(mutate & ~flip_slave, self.rng.integers(0, 256, size=data.shape), data)
+        return slaves, data
+
+    def next_generation(self, fitness):
+        """
+        Reemplaza la población por la siguiente generación a partir del
+        fitness de la actual. Las primeras filas son la élite (mejor primero).
+        Retorna el mejor fitness de la generación evaluada.
+        """
+        slaves, data = self.population
+        elite_count = self.population_size // 4
+        n_children = self.population_size - elite_count
+
+        # Ordenar por fitness (mejor primero)
+        order = np.argsort(-fitness, kind="stable")
+
+        # Seleccionar mejores (elitismo)
+        elite = order[:elite_count]
+
+        # Padres elegidos al azar entre la mejor mitad
+        top_half = order[:max(1, self.population_size // 2)]
+        p1 = self.rng.choice(top_half, size=n_children)
+        p2 = self.rng.choice(top_half, size=n_children)
+
+        # Crossover y mutación de todos los hijos a la vez
+        child_slaves, child_data = self.crossover((slaves[p1], data[p1]), (slaves[p2], data[p2]))
+        child_slaves, child_data = self.mutate(child_slaves, child_data)
+
+        self.population = (
+            np.concatenate([slaves[elite], child_slaves]),
+            np.concatenate([data[elite], child_data]),
+        )
+        return fitness[order[0]]
+
+    def best(self, fitness, k=5):
+        """Las k mejores secuencias de la población actual según `fitness`"""
+        slaves, data = self.population
+        order = np.argsort(-fitness, kind="stable")[:k]
+        return self.to_sequences(slaves[order], data[order])
+
+    def evolve(self, generations=10, fitness=None):
         """
         Evoluciona la población durante N generaciones
         Retorna las mejores secuencias
+
+        fitness: función (slaves, data) -> arreglo con el fitness de cada
+        individuo. Por defecto la cobertura estimada en Python
+        (fitness_batch); spi_ga_farm.py la reemplaza por simulación real.
         """
+        fitness_fn = fitness or self.fitness_batch
         self.initialize_population()
-        
+
         for gen in range(generations):
-            # Evaluar fitness de toda la población
-            fitness_scores = [(seq, self.evaluate_fitness(seq)) 
-                            for seq in self.population]
-            
-            # Ordenar por fitness (mejor primero)
-            fitness_scores.sort(key=lambda x: x[1], reverse=True)
-            
-            # Seleccionar mejores (elitismo)
-            elite_count = self.population_size // 4
-            next_generation = [seq for seq, _ in fitness_scores[:elite_count]]
-            
-            # Generar nueva población mediante crossover y mutación
-            while len(next_generation) < self.population_size:
-                # Selección por torneo
-                parent1 = random.choice(fitness_scores[:self.population_size // 2])[0]
-                parent2 = random.choice(fitness_scores[:self.population_size // 2])[0]
-                
-                # Crossover
-                child = self.crossover(parent1, parent2)
-                
-                # Mutación
-                child = self.mutate(child)
-                
-                next_generation.append(child)
-            
-            self.population = next_generation
-            
-            best_fitness = fitness_scores[0][1]
+            best_fitness = self.next_generation(fitness_fn(*self.population))
             if (gen + 1) % 5 == 0:
                 print(f"  Generación {gen+1}/{generations}: Mejor fitness = {best_fitness:.2f}")
-        
+
         # Retornar top 5 mejores secuencias
-        final_scores = [(seq, self.evaluate_fitness(seq)) for seq in self.population]
-        final_scores.sort(key=lambda x: x[1], reverse=True)
-        
-        self.best_sequences = [seq for seq, _ in final_scores[:5]]
+        self.best_sequences = self.best(fitness_fn(*self.population))
         return self.best_sequences
     
     def generate_coverage_driven_sequence(self, uncovered_items):
@@ -327,14 +382,8 @@ class MLSequenceGenerator:
 
 async def spi_write_read(dut, slave_id, tx_data):
     """Realiza una transacción SPI completa"""
-    start_cycle = 0
-    
-    # Esperar a que master esté listo
-    while dut.tx_ready.value == 0:
-        await RisingEdge(dut.clk)
-        start_cycle += 1
-        if start_cycle > 100:
-            raise Exception("Timeout esperando tx_ready")
+    # Esperar a que master esté listo (Python despierta solo cuando cambia)
+    await wait_until(dut.tx_ready, 1, TX_READY_TIMEOUT, clock=dut.clk)
     
     # Iniciar transacción
     dut.slave_select.value = slave_id
@@ -345,12 +394,7 @@ async def spi_write_read(dut, slave_id, tx_data):
     dut.tx_valid.value = 0
     
     # Esperar rx_valid
-    cycles = 0
-    while dut.rx_valid.value == 0:
-        await RisingEdge(dut.clk)
-        cycles += 1
-        if cycles > 500:
-            raise Exception("Timeout esperando rx_valid")
+    await wait_until(dut.rx_valid, 1, RX_VALID_TIMEOUT, clock=dut.clk)
     
     rx_data = int(dut.rx_data.value)
     
@@ -369,6 +413,19 @@ async def execute_sequence(dut, sequence):
     return results
 
 
+def phase_closure(coverage, budget, name, plateau=None, enabled=True):
+    """
+    Condición de parada de una fase: cobertura completa o sin mejora en
+    `plateau` transacciones. Se evalúa después de cada secuencia. Con
+    `enabled=False` solo se reporta y la fase corre todo su presupuesto.
+    """
+    return closure_from_env(
+        lambda: coverage.get_coverage_percentage()[0], budget=budget, plateau=plateau,
+        every=1, enabled=enabled, name=name, sim_time=lambda: get_sim_time("ns"),
+        clock_period=10,
+    )
+
+
 # ==============================================================================
 # TESTS DE COCOTB
 # ==============================================================================
@@ -411,6 +468,13 @@ async def test_ml_sequence_generation(dut):
     cocotb.log.info(f"Ejecutando {num_random_sequences} secuencias random de {sequence_length} transacciones cada una")
     cocotb.log.info(f"Total de transacciones: {num_random_sequences * sequence_length}\n")
     
+    # Línea base: corre siempre su presupuesto fijo (pararla antes sesgaría
+    # la comparación con ML); el estancamiento solo se reporta
+    random_closure = phase_closure(
+        random_coverage, num_random_sequences * sequence_length, "random",
+        plateau=3 * sequence_length, enabled=False,
+    )
+    
     for i in range(num_random_sequences):
         # Generar secuencia random
         sequence = []
@@ -424,7 +488,10 @@ async def test_ml_sequence_generation(dut):
         
         # Actualizar cobertura
         random_coverage.update(sequence)
+        if random_closure.step(len(sequence)):
+            break
     
+    cocotb.log.info(random_closure.summary())
     cocotb.log.info("Resultados RANDOM:")
     random_total_cov = random_coverage.print_report()
     
@@ -438,7 +505,14 @@ async def test_ml_sequence_generation(dut):
     cocotb.log.info("Optimizando secuencias mediante algoritmo genético:\n")
     
     ml_generator = MLSequenceGenerator(population_size=20, sequence_length=10)
-    best_sequences = ml_generator.evolve(generations=20)
+    ga_file = os.getenv("SPI_GA_SEQUENCES")
+    if ga_file:
+        # Secuencias evolucionadas con fitness de simulación real (spi_ga_farm.py)
+        with open(ga_file) as f:
+            best_sequences = [[tuple(t) for t in seq] for seq in json.load(f)]
+        cocotb.log.info(f"Secuencias cargadas de {ga_file}")
+    else:
+        best_sequences = ml_generator.evolve(generations=20)
     
     cocotb.log.info(f"\n✓ ML generó {len(best_sequences)} secuencias optimizadas\n")
     
@@ -446,13 +520,18 @@ async def test_ml_sequence_generation(dut):
     
     cocotb.log.info(f"Ejecutando {len(best_sequences)} secuencias ML-guided...")
     
+    ml_closure = phase_closure(ml_coverage, sum(len(s) for s in best_sequences), "ml")
+    
     for i, sequence in enumerate(best_sequences):
         # Ejecutar en DUT
         await execute_sequence(dut, sequence)
         
         # Actualizar cobertura
         ml_coverage.update(sequence)
+        if ml_closure.step(len(sequence)):
+            break
     
+    cocotb.log.info(ml_closure.summary())
     cocotb.log.info("Resultados ML-GUIDED:")
     ml_total_cov = ml_coverage.print_report()
     
@@ -473,6 +552,9 @@ async def test_ml_sequence_generation(dut):
         cocotb.log.info("Generando secuencias dirigidas para cubrir gaps...")
         
         num_directed_sequences = min(5, (len(uncovered) + 9) // 10)
+        directed_closure = phase_closure(
+            ml_coverage, num_directed_sequences * ml_generator.sequence_length, "directed",
+        )
         
         for i in range(num_directed_sequences):
             sequence = ml_generator.generate_coverage_driven_sequence(uncovered)
@@ -481,7 +563,10 @@ async def test_ml_sequence_generation(dut):
             
             # Recalcular items sin cubrir
             uncovered = ml_coverage.get_uncovered_items()
+            if directed_closure.step(len(sequence)):
+                break
         
+        cocotb.log.info(directed_closure.summary())
         cocotb.log.info("\nResultados FINALES (ML + Coverage-Driven):")
         final_cov = ml_coverage.print_report()
     else:
@@ -523,6 +608,9 @@ async def test_ml_sequence_generation(dut):
     
     cocotb.log.info("="*80 + "\n")
     
+    # Base de cobertura para fusionar entre corridas (python -m tb_utils.coverage_db)
+    ml_coverage.save("spi_ml_sequence_generation")
+
     # Validación
     assert ml_coverage.total_transactions > 0, "No se ejecutaron transacciones ML"
     assert final_cov >= random_total_cov * 0.9, "ML no debe ser significativamente peor que random"
@@ -565,6 +653,7 @@ async def test_corner_case_coverage(dut):
     
     cocotb.log.info(f"\nCobertura de corner cases: {detailed['corner_cases']:.1f}%")
     cocotb.log.info(f"Cobertura total: {total_cov:.1f}%\n")
+    coverage.save("spi_corner_case_coverage")
     
     assert detailed['corner_cases'] >= 75.0, "Debe cubrir al menos 75% de corner cases"
 
@@ -604,10 +693,12 @@ async def test_transition_coverage(dut):
     total_cov, detailed = coverage.get_coverage_percentage()
     
     cocotb.log.info(f"\nCobertura de transiciones: {detailed['transitions']:.1f}%")
-    cocotb.log.info(f"Transiciones cubiertas: {len(coverage.transitions)}/4")
+    cocotb.log.info(f"Transiciones cubiertas: {coverage.transitions.hits}/4")
     
     for trans, count in coverage.transitions.items():
-        cocotb.log.info(f"  {trans}: {count} veces")
+        if count:
+            cocotb.log.info(f"  {trans}: {count} veces")
+    coverage.save("spi_transition_coverage")
     
     assert detailed['transitions'] == 100.0, "Debe cubrir todas las transiciones"
 
@@ -618,14 +709,8 @@ async def test_transition_coverage(dut):
 
 async def spi_write_read(dut, slave_id, tx_data):
     """Realiza una transacción SPI completa y retorna los datos recibidos"""
-    start_cycle = 0
-    
-    # Esperar a que master esté listo
-    while dut.tx_ready.value == 0:
-        await RisingEdge(dut.clk)
-        start_cycle += 1
-        if start_cycle > 100:
-            raise Exception("Timeout esperando tx_ready")
+    # Esperar a que master esté listo (Python despierta solo cuando cambia)
+    await wait_until(dut.tx_ready, 1, TX_READY_TIMEOUT, clock=dut.clk)
     
     # Iniciar transacción
     dut.slave_select.value = slave_id
@@ -636,12 +721,7 @@ async def spi_write_read(dut, slave_id, tx_data):
     dut.tx_valid.value = 0
     
     # Esperar rx_valid
-    cycles = 0
-    while dut.rx_valid.value == 0:
-        await RisingEdge(dut.clk)
-        cycles += 1
-        if cycles > 500:
-            raise Exception("Timeout esperando rx_valid")
+    cycles = await wait_until(dut.rx_valid, 1, RX_VALID_TIMEOUT, clock=dut.clk)
     
     rx_data = int(dut.rx_data.value)
     await ClockCycles(dut.clk, 5)
@@ -0,0 +1,41 @@
+module fifo_array #(
+    parameter N     = 16,
+    parameter WIDTH = 8,
+    parameter DEPTH = 8
+)(
+    input  wire                clk,
+    input  wire                rst_n,
+
+    // Bit / campo i = FIFO i
+    input  wire [N-1:0]        push,
+    input  wire [N-1:0]        pop,
+    input  wire [N*WIDTH-1:0]  data_in,
+
+    output wire [N*WIDTH-1:0]  data_out,
+    output wire [N-1:0]        full,
+    output wire [N-1:0]        empty
+);
+
+    // -------------------------------------------------
+    // N copias independientes de la FIFO
+    // -------------------------------------------------
+    genvar i;
+    generate
+        for (i = 0; i < N; i = i + 1) begin : g_fifo
+            fifo #(
+                .WIDTH(WIDTH),
+                .DEPTH(DEPTH)
+            ) u_fifo (
+                .clk      (clk),
+                .rst_n    (rst_n),
+                .push     (push[i]),
+                .pop      (pop[i]),
+                .data_in  (data_in[i*WIDTH +: WIDTH]),
+                .data_out (data_out[i*WIDTH +: WIDTH]),
+                .full     (full[i]),
+                .empty    (empty[i])
+            );
+        end
+    endgenerate
+
+endmodule
@@ -1,12 +1,31 @@
 import cocotb
+from cocotb.clock import Clock
 from cocotb.triggers import RisingEdge, Timer, ReadOnly, NextTimeStep
+from cocotb.utils import get_sim_time
 import pyuvm
 from pyuvm import *
+import copy
+import os
 import random
+import numpy as np
 import torch
 import torch.nn as nn
 import torch.optim as optim
 
+from pathlib import Path
+
+from tb_utils.fifo_model import FifoModel
+from tb_utils.model_store import ModelStore
+from tb_utils.perf import Throughput, bench_requested
+
+# Q-network saved between simulations (invalidated when fifo.v changes)
+FIFO_V = Path(__file__).resolve().parent / "fifo.v"
+
+# Agent training mode (RL_BATCH=0 keeps one optimizer step per transition)
+RL_BATCH = int(os.getenv("RL_BATCH", "0"))                # minibatch size
+RL_TRAIN_EVERY = int(os.getenv("RL_TRAIN_EVERY", "4"))    # steps between updates
+RL_TARGET_UPDATE = int(os.getenv("RL_TARGET_UPDATE", "0"))  # updates between target syncs (0 = no target net)
+
 # ============================================================
 # 🧱 BFM
 # ============================================================
@@ -81,13 +100,108 @@ class QNet(nn.Module):
 # 🤖 RL Agent
 # ============================================================
 
+class ReplayBuffer:
+    """Fixed-capacity ring buffer of transitions in preallocated arrays"""
+
+    def __init__(self, capacity=10000, state_dim=3, seed=None):
+        self.capacity = capacity
+        self.states = np.zeros((capacity, state_dim), dtype=np.float32)
+        self.actions = np.zeros(capacity, dtype=np.int64)
+        self.rewards = np.zeros(capacity, dtype=np.float32)
+        self.next_states = np.zeros((capacity, state_dim), dtype=np.float32)
+        self.pos = 0
+        self.size = 0
+        self.rng = np.random.default_rng(seed)
+
+    def __len__(self):
+        return self.size
+
+    def add(self, state, action, reward, next_state):
+        i = self.pos
+        self.states[i] = state
+        self.actions[i] = action
+        self.rewards[i] = reward
+        self.next_states[i] = next_state
+        self.pos = (i + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+
+    def add_batch(self, states, actions, rewards, next_states):
+        """Store one transition per row (e.g. one per FIFO of a vectorized env)"""
+        idx = (self.pos + np.arange(len(actions))) % self.capacity
+        self.states[idx] = states
+        self.actions[idx] = actions
+        self.rewards[idx] = rewards
+        self.next_states[idx] = next_states
+        self.pos = int(idx[-1] + 1) % self.capacity
+        self.size = min(self.size + len(actions), self.capacity)
+
+    def sample(self, batch_size):
+        """Uniform minibatch as tensors (states, actions, rewards, next_states)"""
+        idx = self.rng.integers(0, self.size, size=batch_size)
+        return (
+            torch.from_numpy(self.states[idx]),
+            torch.from_numpy(self.actions[idx]),
+            torch.from_numpy(self.rewards[idx]),
+            torch.from_numpy(self.next_states[idx]),
+        )
+
+
 class RLAgent:
-    def __init__(self):
+    # Version of the state saved in the model store
+    STATE_VERSION = 1
+
+    def __init__(self, store=None, warm_epsilon=0.05, batch_size=RL_BATCH,
+                 train_every=RL_TRAIN_EVERY, target_update=RL_TARGET_UPDATE, capacity=10000):
+        """
+        batch_size: 0 trains on each transition as it happens; otherwise
+            transitions go to a replay buffer and every `train_every` steps
+            one minibatch of `batch_size` is sampled from it.
+        target_update: if > 0, bootstrap targets come from a copy of the
+            Q-network synced every `target_update` optimizer steps.
+        """
         self.qnet = QNet()
         self.optimizer = optim.Adam(self.qnet.parameters(), lr=1e-3)
         self.gamma = 0.9
         self.epsilon = 0.3
 
+        self.batch_size = batch_size
+        self.train_every = max(1, train_every)
+        self.target_update = target_update
+        self.replay = ReplayBuffer(capacity, seed=random.getrandbits(32)) if batch_size else None
+        self.steps = 0
+        self.updates = 0
+        self._due = 0  # Transitions since the last replay update
+        self._rng = np.random.default_rng(random.getrandbits(32))
+
+        # Warm start: a Q-network trained by an earlier run against the same
+        # RTL only needs a little exploration
+        self.store = store
+        self.schema = {
+            "state": ["level", "full", "empty"],
+            "actions": ["push", "pop", "idle"],
+            "qnet": str(self.qnet),
+            "gamma": self.gamma,
+        }
+        self.warm = False
+        if store is not None:
+            state = store.load(self.schema, self.STATE_VERSION)
+            if state is not None:
+                self.qnet.load_state_dict(state["qnet"])
+                self.optimizer.load_state_dict(state["optimizer"])
+                self.epsilon = warm_epsilon
+                self.warm = True
+
+        self.target_net = None
+        if target_update:
+            self.target_net = copy.deepcopy(self.qnet)
+            self.target_net.requires_grad_(False)
+
+    def save(self, **info):
+        if self.store is None:
+            return None
+        state = {"qnet": self.qnet.state_dict(), "optimizer": self.optimizer.state_dict()}
+        return self.store.save(state, self.schema, self.STATE_VERSION, **info)
+
     def select_action(self, state):
         if random.random() < self.epsilon:
             return random.randint(0, 2)
@@ -98,22 +212,84 @@ class RLAgent:
             return torch.argmax(q).item()
 
     def train_step(self, state, action, reward, next_state):
-        s = torch.tensor(state, dtype=torch.float32)
-        ns = torch.tensor(next_state, dtype=torch.float32)
+        self.steps += 1
+        if self.replay is None:
+            self._update(
+                torch.tensor([state], dtype=torch.float32),
+                torch.tensor([action]),
+                torch.tensor([reward], dtype=torch.float32),
+                torch.tensor([next_state], dtype=torch.float32),
+            )
+            return
+
+        self.replay.add(state, action, reward, next_state)
+        self._train_replay(1)
+
+    def select_actions(self, states):
+        """Epsilon-greedy actions for a batch of states (one Q-network call)"""
+        states = np.asarray(states, dtype=np.float32)
+        with torch.no_grad():
+            actions = self.qnet(torch.from_numpy(states)).argmax(dim=1).numpy()
+        explore = self._rng.random(len(states)) < self.epsilon
+        actions[explore] = self._rng.integers(0, 3, size=int(explore.sum()))
+        return actions
+
+    def train_batch(self, states, actions, rewards, next_states):
+        """Learn from N transitions gathered in the same cycle.
+
+        Without replay they form one batch of the TD update; with replay they
+        are stored and minibatch updates keep the same ratio of one update
+        per `train_every` transitions as train_step.
+        """
+        n = len(actions)
+        self.steps += n
+        if self.replay is None:
+            self._update(
+                torch.as_tensor(np.asarray(states, dtype=np.float32)),
+                torch.as_tensor(np.asarray(actions, dtype=np.int64)),
+                torch.as_tensor(np.asarray(rewards, dtype=np.float32)),
+                torch.as_tensor(np.asarray(next_states, dtype=np.float32)),
+            )
+            return
+
+        self.replay.add_batch(states, actions, rewards, next_states)
+        self._train_replay(n)
+
+    def _train_replay(self, n):
+        self._due += n
+        updates, self._due = divmod(self._due, self.train_every)
+        if len(self.replay) >= self.batch_size:
+            for _ in range(updates):
+                self._update(*self.replay.sample(self.batch_size))
 
-        q_values = self.qnet(s)
-        q_value = q_values[action]
+    def _update(self, s, a, r, ns):
+        """One optimizer step of the TD loss over a batch of transitions"""
+        q_value = self.qnet(s).gather(1, a.unsqueeze(1)).squeeze(1)
 
         with torch.no_grad():
-            next_q = torch.max(self.qnet(ns))
+            bootstrap = self.target_net if self.target_net is not None else self.qnet
+            next_q = bootstrap(ns).max(dim=1).values
 
-        target = reward + self.gamma * next_q
-        loss = (q_value - target) ** 2
+        target = r + self.gamma * next_q
+        loss = ((q_value - target) ** 2).mean()
 
         self.optimizer.zero_grad()
         loss.backward()
         self.optimizer.step()
 
+        self.updates += 1
+        if self.target_net is not None and self.updates % self.target_update == 0:
+            self.target_net.load_state_dict(self.qnet.state_dict())
+
+    def describe(self):
+        if self.replay is None:
+            mode = "per-step updates"
+        else:
+            mode = f"replay minibatch={self.batch_size} every {self.train_every} steps"
+        if self.target_net is not None:
+            mode += f", target net sync every {self.target_update} updates"
+        return mode
+
 
 # ============================================================
 # ✅ SCOREBOARD MODEL (FUENTE DE VERDAD)
@@ -122,7 +298,7 @@ class RLAgent:
 class FifoScoreboardModel:
     def __init__(self, depth=8):
         self.depth = depth
-        self.model = []
+        self.model = FifoModel(depth)
         self.error_count = 0
         self.sample_count = 0
 
@@ -140,13 +316,13 @@ class FifoScoreboardModel:
         pop_accepted = bool(req_pop and not was_empty)
 
         if pop_accepted:
-            expected = self.model.pop(0)
+            expected = self.model.pop()
             actual = sample["data_out"]
             if expected != actual:
                 self.error_count += 1
 
         if push_accepted:
-            self.model.append(sample["data_in"])
+            self.model.push(sample["data_in"])
 
         expected_full = 1 if len(self.model) == self.depth else 0
         expected_empty = 1 if len(self.model) == 0 else 0
@@ -241,7 +417,9 @@ class FifoRLTest(uvm_test):
         self.raise_objection()
 
         env = FifoEnvRL(self.bfm)
-        agent = RLAgent()
+        agent = RLAgent(store=ModelStore("fifo_rl", [FIFO_V]))
+        print(agent.store.summary())
+        print(f"[RL] training: {agent.describe()}")
 
         state = await env.reset()
 
@@ -258,6 +436,8 @@ class FifoRLTest(uvm_test):
                     f"sb_errors={env.scoreboard.error_count}"
                 )
 
+        agent.save(steps=2000)
+
         if env.scoreboard.error_count > 0:
             raise AssertionError(
                 f"RL checker detected {env.scoreboard.error_count} errors "
@@ -287,4 +467,37 @@ async def run_fifo_rl_test(dut):
 
     ConfigDB().set(None, "*", "bfm", bfm)
 
-    await uvm_root().run_test("FifoRLTest", keep_set={ConfigDB})
\ No newline at end of file
+    await uvm_root().run_test("FifoRLTest", keep_set={ConfigDB})
+
+
+# Only with `make bench` (TESTCASE) or BENCH=1
+@cocotb.test(skip=not bench_requested("rl_training_benchmark"))
+async def rl_training_benchmark(dut):
+    """Simulation steps/s of per-step updates vs replay minibatch training"""
+    cocotb.start_soon(Clock(dut.clk, 10, unit="ns").start())
+    bfm = FifoBFM(dut)
+    steps = int(os.getenv("RL_BENCH_STEPS", "1000"))
+
+    configs = [
+        dict(batch_size=0),
+        dict(batch_size=32, train_every=4, target_update=0),
+        dict(batch_size=32, train_every=4, target_update=50),
+    ]
+    base_rate = None
+    for kwargs in configs:
+        torch.manual_seed(0)
+        env = FifoEnvRL(bfm)
+        agent = RLAgent(**kwargs)
+        state = await env.reset()
+
+        with Throughput(agent.describe(), unit="steps", sim_time=lambda: get_sim_time("ns")) as tp:
+            for _ in range(steps):
+                action = agent.select_action(state)
+                next_state, reward = await env.step(action)
+                agent.train_step(state, action, reward, next_state)
+                state = next_state
+            tp.count = steps
+
+        base_rate = base_rate or tp.rate
+        cocotb.log.info(f"{tp.summary()} | {agent.updates} updates | {tp.rate / base_rate:.1f}x")
+        assert env.scoreboard.error_count == 0
@@ -0,0 +1,209 @@
+import cocotb
+from cocotb.clock import Clock
+from cocotb.triggers import RisingEdge, ReadOnly, NextTimeStep
+from cocotb.utils import get_sim_time
+import pyuvm
+from pyuvm import *
+import random
+import numpy as np
+
+from tb_utils.model_store import ModelStore
+from tb_utils.perf import Throughput
+from test_fifo_rl import FIFO_V, RLAgent
+
+# N copies of fifo.v in one top (fifo_array.v). The Q-network is the same
+# as for a single FIFO, so the model store entry is shared with test_fifo_rl
+CYCLES = 500
+
+# ============================================================
+# 🧱 BATCHED BFM
+# ============================================================
+
+class FifoArrayBFM:
+    """Drives and samples all FIFOs of fifo_array with one write/read per bus"""
+
+    def __init__(self, dut, width=8):
+        self.dut = dut
+        self.n = len(dut.push.value)
+        self.width = width
+        self.data_dtype = np.dtype(f"<u{width // 8}")
+        self.flag_bytes = (self.n + 7) // 8
+
+    async def reset(self):
+        self.dut.push.value = 0
+        self.dut.pop.value = 0
+        self.dut.data_in.value = 0
+
+        self.dut.rst_n.value = 0
+        for _ in range(5):
+            await RisingEdge(self.dut.clk)
+        self.dut.rst_n.value = 1
+        await RisingEdge(self.dut.clk)
+
+    def _pack_bits(self, bits):
+        return int.from_bytes(np.packbits(bits, bitorder="little").tobytes(), "little")
+
+    def _unpack_bits(self, value):
+        raw = np.frombuffer(int(value).to_bytes(self.flag_bytes, "little"), dtype=np.uint8)
+        return np.unpackbits(raw, bitorder="little")[:self.n]
+
+    async def step(self, push, pop, data):
+        """
+        Apply one cycle of requests (arrays of N) and return the registered
+        outputs (data_out, full, empty) as arrays of N.
+        """
+        self.dut.push.value = self._pack_bits(push)
+        self.dut.pop.value = self._pack_bits(pop)
+        self.dut.data_in.value = int.from_bytes(data.astype(self.data_dtype).tobytes(), "little")
+
+        await RisingEdge(self.dut.clk)
+        await ReadOnly()
+
+        data_out = np.frombuffer(
+            int(self.dut.data_out.value).to_bytes(self.n * self.data_dtype.itemsize, "little"),
+            dtype=self.data_dtype,
+        )
+        return data_out, self._unpack_bits(self.dut.full.value), self._unpack_bits(self.dut.empty.value)
+
+# ============================================================
+# ✅ VECTORIZED SCOREBOARD MODEL
+# ============================================================
+
+class FifoArrayModel:
+    """Golden model of N FIFOs as ring buffers in one (N, depth) array"""
+
+    def __init__(self, n, depth=8):
+        self.n = n
+        self.depth = depth
+        self.mem = np.zeros((n, depth), dtype=np.int64)
+        self.head = np.zeros(n, dtype=np.int64)
+        self.count = np.zeros(n, dtype=np.int64)
+        self.rows = np.arange(n)
+        self.error_count = 0
+        self.sample_count = 0
+
+    def process(self, push, pop, data, data_out, full, empty):
+        """Returns (prev_level, new_level, push_accepted, pop_accepted) arrays"""
+        self.sample_count += self.n
+        prev_level = self.count.copy()
+
+        push_accepted = push & (prev_level < self.depth)
+        pop_accepted = pop & (prev_level > 0)
+
+        expected = self.mem[self.rows, self.head]
+        self.error_count += int(np.count_nonzero(pop_accepted & (expected != data_out)))
+
+        tail = (self.head + prev_level) % self.depth
+        rows = self.rows[push_accepted]
+        self.mem[rows, tail[push_accepted]] = data[push_accepted]
+        self.head = (self.head + pop_accepted) % self.depth
+        self.count += push_accepted.astype(np.int64) - pop_accepted
+
+        self.error_count += int(np.count_nonzero(full != (self.count == self.depth)))
+        self.error_count += int(np.count_nonzero(empty != (self.count == 0)))
+        return prev_level, self.count.copy(), push_accepted, pop_accepted
+
+# ============================================================
+# 🌍 VECTORIZED RL ENV
+# ============================================================
+
+class VecFifoEnvRL:
+    """FifoEnvRL over N FIFOs: step() takes N actions and returns
+    (states (N, 3), rewards (N,)), one transition per FIFO per clock"""
+
+    def __init__(self, bfm, depth=8):
+        self.bfm = bfm
+        self.n = bfm.n
+        self.depth = depth
+        self.model = FifoArrayModel(self.n, depth)
+        self.rng = np.random.default_rng(random.getrandbits(32))
+
+    async def reset(self):
+        await self.bfm.reset()
+        self.model = FifoArrayModel(self.n, self.depth)
+        return np.tile(np.array([0, 0, 1], dtype=np.float32), (self.n, 1))
+
+    async def step(self, actions):
+        push = actions == 0
+        pop = actions == 1
+        data = self.rng.integers(0, 256, size=self.n)
+
+        data_out, full, empty = await self.bfm.step(push, pop, data)
+        prev_level, new_level, push_accepted, pop_accepted = self.model.process(
+            push, pop, data, data_out, full.astype(bool), empty.astype(bool))
+
+        # Same shaping as FifoEnvRL.step, for all FIFOs at once
+        depth = self.depth
+        reward = np.full(self.n, -0.05)
+        reward += new_level == depth
+        reward += new_level == 0
+        reward += 2.0 * ((prev_level == depth - 1) & (new_level == depth) & push_accepted)
+        reward += 2.0 * ((prev_level == 1) & (new_level == 0) & pop_accepted)
+        reward -= 0.2 * (push & ~push_accepted)
+        reward -= 0.2 * (pop & ~pop_accepted)
+
+        states = np.stack([np.clip(new_level, 0, depth), full, empty], axis=1).astype(np.float32)
+
+        await NextTimeStep()
+
+        return states, reward
+
+# ============================================================
+# 🧪 RL TEST
+# ============================================================
+
+class FifoVecRLTest(uvm_test):
+    def build_phase(self):
+        self.bfm = ConfigDB().get(self, "", "bfm")
+
+    async def run_phase(self):
+        self.raise_objection()
+
+        env = VecFifoEnvRL(self.bfm)
+        agent = RLAgent(store=ModelStore("fifo_rl", [FIFO_V]))
+        print(agent.store.summary())
+        print(f"[RL vec] {env.n} FIFOs, training: {agent.describe()}")
+
+        states = await env.reset()
+
+        with Throughput(f"RL vec N={env.n}", unit="transitions",
+                        sim_time=lambda: get_sim_time("ns")) as tp:
+            for cycle in range(CYCLES):
+                actions = agent.select_actions(states)
+                next_states, rewards = await env.step(actions)
+
+                agent.train_batch(states, actions, rewards, next_states)
+                states = next_states
+
+                if cycle % 100 == 0:
+                    print(
+                        f"[RL vec] cycle={cycle} mean_level={states[:, 0].mean():.2f} "
+                        f"mean_reward={rewards.mean():.3f} sb_errors={env.model.error_count}"
+                    )
+            tp.count = env.model.sample_count
+        print(f"{tp.summary()} | {tp.count / CYCLES:.0f} transitions/cycle, {agent.updates} updates")
+
+        agent.save(steps=agent.steps)
+
+        if env.model.error_count > 0:
+            raise AssertionError(
+                f"RL checker detected {env.model.error_count} errors "
+                f"in {env.model.sample_count} samples"
+            )
+
+        self.drop_objection()
+
+# ============================================================
+# 🔌 TOP
+# ============================================================
+
+@cocotb.test()
+async def run_fifo_rl_vec_test(dut):
+    cocotb.start_soon(Clock(dut.clk, 10, unit="ns").start())
+
+    bfm = FifoArrayBFM(dut)
+    await bfm.reset()
+
+    ConfigDB().set(None, "*", "bfm", bfm)
+
+    await uvm_root().run_test("FifoVecRLTest", keep_set={ConfigDB})
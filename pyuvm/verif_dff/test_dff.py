@@ -1,10 +1,20 @@
+import os
 import cocotb
-from cocotb.triggers import RisingEdge, FallingEdge, ReadOnly
+from cocotb.triggers import RisingEdge, FallingEdge, ReadOnly, Event
 from cocotb.clock import Clock
+from cocotb.utils import get_sim_time
 import pyuvm
 from pyuvm import *
 import random
 
+from tb_utils.dispatch import CycleDispatcher, WakeupCounter
+from tb_utils.perf import Throughput, bench_requested
+
+# Driver, monitor y scoreboard como callbacks de un CycleDispatcher (un
+# despertar por fase del reloj); DISPATCH=0 usa una corrutina por componente
+DISPATCH = os.getenv("DISPATCH", "1") != "0"
+CLK_PERIOD_NS = 10
+
 # --- 1. Sequence Item (Transacción) ---
 # Define los datos que queremos enviar o recibir del DFF
 
@@ -57,11 +67,23 @@ class DFFDriver(uvm_driver):
     def build_phase(self):
         # Obtenemos la jerarquía del DUT desde cocotb
         self.dut = cocotb.top
+        self.cycles = ConfigDB().get(self, "", "cycles", None)
+        self.next_item = None  # Ítem recibido, pendiente del próximo flanco descendente
+        self.item = None  # Ítem aplicado, pendiente de item_done
+        self.done = Event()
+
+    def connect_phase(self):
+        if self.cycles is not None:
+            self.cycles.on_drive(self.drive)
+            self.cycles.on_check(self.finish)
 
     async def run_phase(self):
         # Inicializar señales
         self.dut.d.value = 0
         self.dut.rst.value = 0
+        if self.cycles is not None:
+            await self.feed()
+            return
 
         # Esperar al primer flanco de reloj para sincronizar
         await FallingEdge(self.dut.clk)
@@ -81,6 +103,32 @@ class DFFDriver(uvm_driver):
             # Avisar que el ítem ha sido procesado
             self.seq_item_port.item_done()
 
+    async def feed(self):
+        # Con dispatcher, esta corrutina solo despierta una vez por ítem:
+        # lo pide al secuenciador y lo deja listo para drive(). La API
+        # bloqueante (get_next_item) existe en todas las versiones de pyuvm
+        while True:
+            self.next_item = await self.seq_item_port.get_next_item()
+            await self.done.wait()
+            self.done.clear()
+
+    def drive(self):
+        # Fase drive (flanco descendente): aplicar el siguiente ítem si ya hay uno
+        item, self.next_item = self.next_item, None
+        if item is not None:
+            self.item = item
+            self.dut.rst.value = item.rst
+            self.dut.d.value = item.d
+
+    def finish(self):
+        # Fase check: el DUT ya capturó el ítem en este flanco ascendente.
+        # item_done aquí deja que la secuencia entregue el siguiente antes
+        # del próximo flanco descendente
+        if self.item is not None:
+            self.item = None
+            self.seq_item_port.item_done()
+            self.done.set()
+
 
 # --- 4. Monitor ---
 # Observa los pines del DUT y envía los datos capturados al scoreboard
@@ -94,22 +142,31 @@ class DFFMonitor(uvm_monitor):
 
     def build_phase(self):
         self.dut = cocotb.top
+        self.cycles = ConfigDB().get(self, "", "cycles", None)
+
+    def connect_phase(self):
+        if self.cycles is not None:
+            self.cycles.on_sample(self.sample)
 
     async def run_phase(self):
+        if self.cycles is not None:
+            return
         while True:
             # Muestrear justo antes del flanco ascendente (para capturar D actual)
             await RisingEdge(self.dut.clk)
             # Esperar un tiempo delta para que Q se actualice en la simulación
             await ReadOnly()
+            self.sample()
 
-            # Capturar el estado actual
-            item = DFFItem("MON_ITEM")
-            item.rst = int(self.dut.rst.value)
-            item.d = int(self.dut.d.value)
-            item.q = int(self.dut.q.value)
+    def sample(self):
+        # Capturar el estado actual
+        item = DFFItem("MON_ITEM")
+        item.rst = int(self.dut.rst.value)
+        item.d = int(self.dut.d.value)
+        item.q = int(self.dut.q.value)
 
-            # Enviar al scoreboard
-            self.ap.write(item)
+        # Enviar al scoreboard
+        self.ap.write(item)
 
 
 # --- 5. Scoreboard ---
@@ -124,31 +181,48 @@ class DFFScoreboard(uvm_scoreboard):
         self.ap = uvm_analysis_port("ap", self)
         self.expected_q = 0  # Modelo de referencia interno
 
+    def build_phase(self):
+        self.cycles = ConfigDB().get(self, "", "cycles", None)
+
     def connect_phase(self):
         self.ap.connect(self.fifo.analysis_export)
+        if self.cycles is not None:
+            self.cycles.on_check(self.check)
 
     async def run_phase(self):
+        if self.cycles is not None:
+            return
         while True:
             # Obtener el item capturado por el monitor
             actual_item = await self.fifo.get()
+            self.compare(actual_item)
 
-            # --- Modelo de Referencia ---
-            # Lógica del DFF: Si rst es 1, Q es 0. Si no, Q es D.
-            if actual_item.rst == 1:
-                self.expected_q = 0
-            else:
-                self.expected_q = actual_item.d
-
-            # --- Comparación ---
-            if actual_item.q != self.expected_q:
-                self.logger.error(f"¡ERROR DE VERIFICACIÓN!")
-                self.logger.error(f"  Entradas muestreadas: {actual_item}")
-                self.logger.error(
-                    f"  Q Esperada: {self.expected_q}, Q Real: {actual_item.q}"
-                )
-                assert False  # Detener la simulación si falla
-            else:
-                self.logger.info(f"OK: {actual_item}")
+    def check(self):
+        # Fase check: comparar lo que el monitor muestreó en este ciclo
+        while True:
+            got, actual_item = self.fifo.try_get()
+            if not got:
+                break
+            self.compare(actual_item)
+
+    def compare(self, actual_item):
+        # --- Modelo de Referencia ---
+        # Lógica del DFF: Si rst es 1, Q es 0. Si no, Q es D.
+        if actual_item.rst == 1:
+            self.expected_q = 0
+        else:
+            self.expected_q = actual_item.d
+
+        # --- Comparación ---
+        if actual_item.q != self.expected_q:
+            self.logger.error(f"¡ERROR DE VERIFICACIÓN!")
+            self.logger.error(f"  Entradas muestreadas: {actual_item}")
+            self.logger.error(
+                f"  Q Esperada: {self.expected_q}, Q Real: {actual_item.q}"
+            )
+            assert False  # Detener la simulación si falla
+        else:
+            self.logger.info(f"OK: {actual_item}")
 
 
 # --- 6. Agent ---
@@ -187,6 +261,9 @@ class DFFEnv(uvm_env):
 @pyuvm.test()
 class DFFTest(uvm_test):
     def build_phase(self):
+        # Despachador de ciclos compartido por driver, monitor y scoreboard
+        self.cycles = CycleDispatcher(cocotb.top.clk) if DISPATCH else None
+        ConfigDB().set(self, "*", "cycles", self.cycles)
         self.env = DFFEnv("env", self)
 
     async def run_phase(self):
@@ -194,11 +271,33 @@ class DFFTest(uvm_test):
         self.raise_objection()
 
         # Arrancar el reloj de cocotb (período de 10 unidades de tiempo)
-        cocotb.start_soon(Clock(cocotb.top.clk, 10, unit="ns").start())
+        cocotb.start_soon(Clock(cocotb.top.clk, CLK_PERIOD_NS, unit="ns").start())
+        if self.cycles is not None:
+            self.cycles.start()
 
         # Ejecutar la secuencia
         seq = DFFSequence("seq")
-        await seq.start(self.env.agent.sequencer)
+        await self.run_sequence(seq)
 
         # Bajar objeción para permitir el fin de la simulación
         self.drop_objection()
+
+    async def run_sequence(self, seq):
+        await seq.start(self.env.agent.sequencer)
+
+
+# Benchmark: solo con `make bench` (TESTCASE) o BENCH=1; comparar con DISPATCH=0
+@pyuvm.test(skip=not bench_requested("DFFDispatchBench"))
+class DFFDispatchBench(DFFTest):
+    async def run_sequence(self, seq):
+        # Despertares del scheduler y tiempo de pared por ciclo simulado
+        start = get_sim_time("ns")
+        label = "dispatcher" if self.cycles is not None else "coroutines"
+        with WakeupCounter() as wakeups, Throughput(label, unit="cycles") as tp:
+            await seq.start(self.env.agent.sequencer)
+            tp.count = int((get_sim_time("ns") - start) // CLK_PERIOD_NS)
+        self.logger.info(tp.summary())
+        cycles = max(tp.count, 1)
+        per_cycle = (f"{wakeups.count / cycles:.2f} wakeups/cycle"
+                     if wakeups.available else "wakeups n/a")
+        self.logger.info(f"[PERF] {label}: {per_cycle}, {1e6 * tp.wall / cycles:.1f} us/cycle")
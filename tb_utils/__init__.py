@@ -0,0 +1,6 @@
+"""Shared testbench infrastructure for the cocotb projects in this repository.
+
+Modules are imported explicitly (``from tb_utils.flow import CreditWindow``)
+so that helpers which do not need a running simulator can be used from plain
+Python scripts and runners.
+"""
@@ -0,0 +1,158 @@
+import inspect
+import itertools
+
+import numpy as np
+from cocotb_coverage.crv import Randomized
+
+
+class BatchRandomizer:
+    """Pre-randomize many ``Randomized`` transactions in one call.
+
+    The constraint set of a prototype transaction is solved once: every
+    random variable domain is filtered by its simple constraints, and groups
+    of variables tied together by multi-variable constraints are enumerated
+    into a table of legal tuples (with distribution weights when present).
+    :meth:`generate` then draws N rows per group with a seeded NumPy
+    generator instead of calling the solver N times.
+
+    Groups that cannot be compiled (joint domain larger than ``max_joint``,
+    ``solve_order``, ``pre_randomize`` overrides or zero total weight) fall
+    back to ``randomize()`` per item; the compiled groups are still drawn in
+    bulk and written on top, which is safe because groups share no
+    constraint.
+
+    Non-random attributes referenced by constraints are read from the
+    prototype at compile time.
+
+    Args:
+        factory: Zero-argument callable (usually the transaction class)
+            returning a fresh ``Randomized`` instance.
+        seed: Seed for the NumPy generator. Testbenches draw it with
+            ``random.getrandbits(32)`` so the batch follows the global PRNG
+            (seeded by cocotb, or by ``random.seed()`` in the test).
+        max_joint: Largest cartesian product enumerated for one group.
+    """
+
+    def __init__(self, factory, seed=None, max_joint=1 << 20):
+        self.factory = factory
+        self.rng = np.random.default_rng(seed)
+        self.max_joint = max_joint
+        self.groups = []  # (names, domains, table, probs)
+        self.fallback_vars = []
+        self._compile(factory())
+
+    @property
+    def fully_compiled(self):
+        return not self.fallback_vars
+
+    def _compile(self, proto):
+        rand_vars = proto._randVariables
+        cls = type(proto)
+
+        if proto._solve_order or cls.pre_randomize is not Randomized.pre_randomize:
+            self.fallback_vars = list(rand_vars)
+            return
+
+        def call(fn, values):
+            args = [values[p] if p in values else getattr(proto, p)
+                    for p in inspect.signature(fn).parameters]
+            return fn(*args)
+
+        domains = {}
+        weights = {}
+        for var, domain in rand_vars.items():
+            domain = list(domain)
+            cstr = proto._simpleConstraints.get(var)
+            if cstr is not None:
+                domain = [v for v in domain if call(cstr, {var: v})]
+            dist = proto._simpleDistributions.get(var)
+            w = None
+            if dist is not None:
+                w = np.array([call(dist, {var: v}) for v in domain], dtype=float)
+            domains[var] = domain
+            weights[var] = w
+
+        # Group variables connected through multi-variable constraints.
+        parent = {var: var for var in rand_vars}
+
+        def find(var):
+            while parent[var] != var:
+                parent[var] = parent[parent[var]]
+                var = parent[var]
+            return var
+
+        multi = list(proto._implConstraints.items()) + list(proto._implDistributions.items())
+        for names, fn in multi:
+            for other in names[1:]:
+                parent[find(other)] = find(names[0])
+
+        members = {}
+        for var in rand_vars:
+            members.setdefault(find(var), []).append(var)
+
+        for names in members.values():
+            group_cstr = [fn for key, fn in proto._implConstraints.items() if set(key) <= set(names)]
+            group_dist = [fn for key, fn in proto._implDistributions.items() if set(key) <= set(names)]
+            size = 1
+            for var in names:
+                size *= len(domains[var])
+            if size == 0 or size > self.max_joint:
+                self.fallback_vars.extend(names)
+                continue
+
+            rows = []
+            probs = []
+            for idx in itertools.product(*(range(len(domains[v])) for v in names)):
+                values = {v: domains[v][i] for v, i in zip(names, idx)}
+                if not all(call(fn, values) for fn in group_cstr):
+                    continue
+                p = 1.0
+                for v, i in zip(names, idx):
+                    if weights[v] is not None:
+                        p *= weights[v][i]
+                for fn in group_dist:
+                    p *= call(fn, values)
+                rows.append(idx)
+                probs.append(p)
+
+            probs = np.array(probs, dtype=float)
+            if not rows or probs.sum() <= 0:
+                self.fallback_vars.extend(names)
+                continue
+
+            uniform = bool(np.all(probs == probs[0]))
+            self.groups.append((
+                names,
+                [np.array(domains[v], dtype=object) for v in names],
+                np.array(rows, dtype=np.int64),
+                None if uniform else probs / probs.sum(),
+            ))
+
+    def values(self, n):
+        """Draw ``n`` solutions of the compiled groups as ``{name: list}`` columns."""
+        columns = {}
+        for names, domains, table, probs in self.groups:
+            if probs is None:
+                pick = self.rng.integers(0, len(table), size=n)
+            else:
+                pick = self.rng.choice(len(table), size=n, p=probs)
+            rows = table[pick]
+            for col, (var, domain) in enumerate(zip(names, domains)):
+                columns[var] = domain[rows[:, col]].tolist()
+        return columns
+
+    def generate(self, n):
+        """Return ``n`` freshly built transactions with randomized fields."""
+        columns = self.values(n)
+        items = []
+        for i in range(n):
+            item = self.factory()
+            if self.fallback_vars:
+                item.randomize()
+            for var, col in columns.items():
+                setattr(item, var, col[i])
+            if not self.fallback_vars:
+                # randomize() already called it for fallback items
+                item.post_randomize()
+            items.append(item)
+        return items
@@ -0,0 +1,252 @@
+"""
+Content-addressed cache of simulator builds.
+
+``runner.build(..., always=True)`` recompiles the RTL on every run even when
+only the Python testbench changed. :func:`cached_build` hashes everything
+that determines the compiled image (sources, include files, parameters,
+defines, build args, timescale, waves, simulator and cocotb version) and
+builds into ``<cache>/<hash>/``, reusing that directory on the next run with
+the same inputs. Tests run from their own ``test_dir`` so results and
+waveforms stay where they always were (``sim_build/``).
+
+Environment:
+    BUILD_CACHE=0            disable the cache (plain ``always=True`` build)
+    BUILD_CACHE_DIR          cache location (default ``<repo>/.build_cache``)
+    BUILD_CACHE_MAX_MB       evict least recently used entries above this size
+    BUILD_CACHE_MAX_ENTRIES  ... or above this number of entries
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # not available on Windows; builds are then unlocked
+    fcntl = None
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+MARKER = ".cache_entry.json"
+
+HDL_SUFFIXES = (".v", ".sv", ".vh", ".svh", ".vhd", ".vhdl")
+
+# Executable whose identity stands for the simulator version.
+SIM_EXECUTABLES = {
+    "Icarus": "iverilog",
+    "Verilator": "verilator",
+    "Questa": "vsim",
+    "QuestaQIS": "qrun",
+    "Ghdl": "ghdl",
+    "Nvc": "nvc",
+    "Riviera": "vsimsa",
+    "ActiveHDL": "vsimsa",
+    "Xcelium": "xrun",
+    "Vcs": "vcs",
+    "Dsim": "dsim",
+}
+
+
+@dataclass
+class CachedBuild:
+    """Where a build lives and how to run tests against it."""
+
+    build_dir: Path
+    test_dir: Path
+    key: str = ""
+    hit: bool = False
+    plusargs: list = field(default_factory=list)
+
+    def test_kwargs(self):
+        """Keyword arguments for ``runner.test(...)``."""
+        kwargs = {"build_dir": self.build_dir, "test_dir": self.test_dir}
+        if self.plusargs:
+            kwargs["plusargs"] = list(self.plusargs)
+        return kwargs
+
+
+def _enabled():
+    return os.getenv("BUILD_CACHE", "1").lower() not in ("0", "false", "no", "off")
+
+
+def cache_root():
+    return Path(os.getenv("BUILD_CACHE_DIR", REPO_ROOT / ".build_cache")).resolve()
+
+
+def _value(item):
+    # Sources and build args may be tagged as Verilog(...)/VHDL(...).
+    return getattr(item, "value", item)
+
+
+def _include_dirs(includes, build_args):
+    dirs = [Path(_value(d)) for d in includes]
+    args = [str(_value(a)) for a in build_args]
+    for i, arg in enumerate(args):
+        if arg == "-I" and i + 1 < len(args):
+            dirs.append(Path(args[i + 1]))
+        elif arg.startswith("-I") and len(arg) > 2:
+            dirs.append(Path(arg[2:]))
+        elif arg.startswith("+incdir+"):
+            dirs += [Path(d) for d in arg[len("+incdir+"):].split("+") if d]
+    return dirs
+
+
+def _simulator_id(runner):
+    name = type(runner).__name__
+    exe = shutil.which(SIM_EXECUTABLES.get(name, name.lower()))
+    if exe is None:
+        return name
+    st = os.stat(exe)
+    return f"{name}:{exe}:{st.st_size}:{int(st.st_mtime)}"
+
+
+def build_key(runner, sources, hdl_toplevel=None, includes=(), defines=None,
+              parameters=None, build_args=(), timescale=None, waves=False,
+              hdl_library="top"):
+    """Hash of every input that changes the compiled image."""
+    import cocotb
+
+    h = hashlib.sha256()
+
+    def add(tag, value):
+        h.update(f"{tag}={value}\n".encode())
+
+    add("simulator", _simulator_id(runner))
+    add("cocotb", cocotb.__version__)
+    add("toplevel", hdl_toplevel)
+    add("library", hdl_library)
+    add("timescale", tuple(timescale) if timescale else None)
+    add("waves", waves)
+    add("defines", sorted((k, str(v)) for k, v in (defines or {}).items()))
+    add("parameters", sorted((k, str(v)) for k, v in (parameters or {}).items()))
+    add("build_args", [f"{type(a).__name__}:{_value(a)}" for a in build_args])
+
+    files = [Path(_value(s)).resolve() for s in sources]
+    for d in _include_dirs(includes, build_args):
+        if d.is_dir():
+            files += sorted(p.resolve() for p in d.iterdir() if p.suffix in HDL_SUFFIXES)
+    for path in dict.fromkeys(files):
+        add("file", path)
+        h.update(hashlib.sha256(path.read_bytes()).digest())
+    return h.hexdigest()[:20]
+
+
+@contextmanager
+def _locked(path, blocking=True):
+    """Exclusive lock on ``path``; yields whether it was taken (always true
+    when ``blocking``)."""
+    if fcntl is None:
+        yield True
+        return
+    with open(path, "w") as f:
+        try:
+            fcntl.flock(f, fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def _dir_size(path):
+    return sum(p.stat().st_size for p in path.rglob("*") if p.is_file())
+
+
+def evict(root=None, max_bytes=None, max_entries=None, keep=()):
+    """Remove least recently used entries until the cache fits the limits.
+
+    Entries whose lock another process holds (being built or reused) are
+    skipped. Lock files are never removed: a process may already have one
+    open, and a fresh file would give a second process the same lock.
+    """
+    root = cache_root() if root is None else root
+    if max_bytes is None:
+        max_bytes = int(float(os.getenv("BUILD_CACHE_MAX_MB", "2048")) * 1024 * 1024)
+    if max_entries is None:
+        max_entries = int(os.getenv("BUILD_CACHE_MAX_ENTRIES", "32"))
+    if not root.is_dir():
+        return []
+
+    entries = []
+    for d in root.iterdir():
+        marker = d / MARKER
+        if d.is_dir() and marker.exists():
+            entries.append((marker.stat().st_mtime, d, _dir_size(d)))
+    entries.sort()  # oldest use first
+    total = sum(size for _, _, size in entries)
+
+    removed = []
+    for _, d, size in entries:
+        if total <= max_bytes and len(entries) - len(removed) <= max_entries:
+            break
+        if d.name in keep:
+            continue
+        with _locked(root / f"{d.name}.lock", blocking=False) as acquired:
+            if not acquired:
+                continue
+            shutil.rmtree(d, ignore_errors=True)
+        total -= size
+        removed.append(d)
+    return removed
+
+
+def cached_build(runner, sources, hdl_toplevel=None, build_dir="sim_build",
+                 includes=(), defines=None, parameters=None, build_args=(),
+                 timescale=None, waves=False, **kwargs):
+    """Drop-in for ``runner.build(..., always=True)`` that reuses identical builds.
+
+    ``build_dir`` becomes the test directory; the compiled image lives in the
+    cache. Pass ``**result.test_kwargs()`` to ``runner.test`` so the test finds
+    it. Remaining ``kwargs`` go straight to ``runner.build``.
+    """
+    test_dir = Path(build_dir).resolve()
+    build_kwargs = dict(
+        sources=sources, hdl_toplevel=hdl_toplevel, includes=includes,
+        defines=defines or {}, parameters=parameters or {},
+        build_args=build_args, timescale=timescale, waves=waves, **kwargs,
+    )
+    if not _enabled():
+        runner.build(build_dir=test_dir, always=True, **build_kwargs)
+        return CachedBuild(test_dir, test_dir)
+
+    waves = os.getenv("WAVES", str(int(waves))).lower() in ("1", "true", "yes", "on")
+    key = build_key(
+        runner, sources, hdl_toplevel, includes, defines, parameters, build_args,
+        timescale, waves, kwargs.get("hdl_library", "top"),
+    )
+    root = cache_root()
+    root.mkdir(parents=True, exist_ok=True)
+    entry = root / key
+    marker = entry / MARKER
+
+    with _locked(root / f"{key}.lock"):
+        hit = marker.exists()
+        if not hit:
+            shutil.rmtree(entry, ignore_errors=True)
+        # On a hit the simulator's own up-to-date check skips compilation but
+        # the runner still records the build settings needed by test().
+        runner.build(build_dir=entry, always=not hit, **build_kwargs)
+        if hit:
+            os.utime(marker)
+        else:
+            marker.write_text(json.dumps({
+                "toplevel": hdl_toplevel,
+                "simulator": type(runner).__name__,
+                "parameters": {k: str(v) for k, v in (parameters or {}).items()},
+                "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+            }, indent=2))
+
+    evict(root, keep={key})
+    runner.log.info("Build cache %s: %s", "hit" if hit else "miss", entry)
+
+    plusargs = []
+    if type(runner).__name__ == "Icarus" and waves:
+        # The dump path compiled into the image points at the cache entry.
+        plusargs.append(f"+dumpfile_path={test_dir / f'{hdl_toplevel}.fst'}")
+    return CachedBuild(entry, test_dir, key, hit, plusargs)
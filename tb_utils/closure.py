@@ -0,0 +1,157 @@
+"""
+Coverage-closure stop conditions.
+
+A :class:`ClosureMonitor` is stepped once per transaction and samples the
+coverage every ``every`` transactions. It reports ``done`` once the coverage
+reaches ``target`` or when it gained no more than ``min_gain`` points over
+the last ``plateau`` transactions. Tests use it to leave a fixed-length loop
+(or move to their next phase) early, and to report how much of the fixed
+budget was saved::
+
+    closure = closure_from_env(lambda: cov.coverage, budget=ITERATIONS,
+                               plateau=200, sim_time=lambda: get_sim_time("ns"),
+                               clock_period=10)
+    for i in range(ITERATIONS):
+        ...
+        if closure.step():
+            break
+    log.info(closure.summary())
+
+Environment (overrides the arguments of :func:`closure_from_env`):
+``CLOSURE=0`` runs the whole budget (stop conditions are still evaluated
+and reported), ``CLOSURE_TARGET``, ``CLOSURE_PLATEAU`` and ``CLOSURE_EVERY``.
+"""
+
+import os
+from collections import deque
+
+
+class ClosureMonitor:
+    """Stop condition over a coverage percentage.
+
+    Args:
+        coverage: Zero-argument callable returning the coverage in percent.
+        budget: Transactions of the fixed-length test, for :meth:`summary`.
+        target: Stop once the coverage is at least this (``None``: never).
+        plateau: Stop when the last ``plateau`` transactions added at most
+            ``min_gain`` points of coverage (``None``: never).
+        min_gain: See ``plateau``.
+        every: Transactions between two coverage samples.
+        enabled: ``False`` never reports ``done``; the stop point that would
+            have been taken is still recorded.
+        name: Label for :meth:`summary`.
+        sim_time: Optional zero-argument callable returning simulated time
+            in ns, used to estimate the simulated time saved.
+        clock_period: Clock period in ns, to express that time in cycles.
+    """
+
+    def __init__(self, coverage, budget=None, target=100.0, plateau=None, min_gain=0.0,
+                 every=10, enabled=True, name="closure", sim_time=None, clock_period=None):
+        self.coverage = coverage
+        self.budget = budget
+        self.target = target
+        self.plateau = plateau
+        self.min_gain = min_gain
+        self.every = max(1, every)
+        self.enabled = enabled
+        self.name = name
+        self.sim_time = sim_time
+        self.clock_period = clock_period
+
+        self.count = 0
+        self.last = 0.0       # Last sampled coverage
+        self.reason = None    # "target" or "plateau" once met
+        self.met_at = None    # Transactions run when it was met
+        self._next = self.every
+        self._samples = deque()  # (count, coverage) within the plateau window
+        self._sim0 = sim_time() if sim_time is not None else None
+
+    @property
+    def done(self):
+        return self.enabled and self.reason is not None
+
+    def step(self, n=1):
+        """Count ``n`` transactions; returns :attr:`done`."""
+        self.count += n
+        if self.count >= self._next:
+            self._next = self.count + self.every
+            self.check()
+        return self.done
+
+    def check(self):
+        """Sample the coverage now and evaluate the stop conditions."""
+        cov = self.last = self.coverage()
+        if self.reason is not None:
+            return self.done
+        if self.target is not None and cov >= self.target:
+            self._met("target")
+        elif self.plateau:
+            samples = self._samples
+            samples.append((self.count, cov))
+            horizon = self.count - self.plateau
+            # Keep the newest sample at or before the start of the window
+            while len(samples) > 1 and samples[1][0] <= horizon:
+                samples.popleft()
+            start, start_cov = samples[0]
+            if start <= horizon and cov - start_cov <= self.min_gain:
+                self._met("plateau")
+        return self.done
+
+    def _met(self, reason):
+        self.reason = reason
+        self.met_at = self.count
+
+    @property
+    def saved(self):
+        """Transactions of the budget not run (0 without a budget)."""
+        if self.budget is None:
+            return 0
+        return max(0, self.budget - self.count)
+
+    def summary(self):
+        if self.reason is None:
+            stop = f"no stop condition met ({self.last:.1f}%)"
+        else:
+            stop = f"{self.reason} met at {self.met_at} ({self.last:.1f}%)"
+            if not self.enabled:
+                stop += ", ignored (report only)"
+                if self.budget is not None:
+                    stop += f"; stopping would have saved {max(0, self.budget - self.met_at)} transactions"
+        text = f"[{self.name}] {self.count}"
+        if self.budget is not None:
+            text += f"/{self.budget}"
+        text += f" transactions, {stop}"
+        if self.saved:
+            text += f"; saved {self.saved} transactions"
+            if self.sim_time is not None and self.count:
+                ns = (self.sim_time() - self._sim0) / self.count * self.saved
+                text += f" (~{ns:.0f} ns"
+                if self.clock_period:
+                    text += f", ~{ns / self.clock_period:.0f} cycles"
+                text += ")"
+        return text
+
+
+def _env_float(name, default):
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return None if value.lower() in ("", "none", "off") else float(value)
+
+
+def closure_from_env(coverage, budget=None, target=100.0, plateau=None, every=10,
+                     enabled=True, **kwargs):
+    """:class:`ClosureMonitor` with ``CLOSURE*`` environment overrides.
+
+    ``enabled=False`` makes the monitor report-only whatever ``CLOSURE`` says.
+    """
+    plateau = _env_float("CLOSURE_PLATEAU", plateau)
+    return ClosureMonitor(
+        coverage,
+        budget=budget,
+        target=_env_float("CLOSURE_TARGET", target),
+        plateau=None if plateau is None else int(plateau),
+        every=int(os.getenv("CLOSURE_EVERY", every)),
+        enabled=enabled and os.getenv("CLOSURE", "1").lower() not in ("0", "false", "no", "off"),
+        **kwargs,
+    )
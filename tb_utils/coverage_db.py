@@ -0,0 +1,450 @@
+"""
+Integer-indexed functional coverage database.
+
+Bins are declared once, as covergroups of coverpoints and crosses, and each
+bin gets a fixed index into one flat array of hit counters. Sampling is an
+index computation plus an array increment; string keys are never built. Each
+coverpoint keeps its count of covered bins, updated when a bin first
+reaches ``at_least`` hits, and the set of uncovered bins is a bitmask (one bit per
+bin, cleared the first time a bin reaches ``at_least`` hits). Nothing is
+rescanned when reading the coverage or the uncovered bins::
+
+    db = CoverageDB("spi")
+    cg = db.covergroup("spi")
+    slave = cg.coverpoint("slaves", ["slave_0", "slave_1"])
+    ranges = cg.coverpoint("data_ranges", (2, 4))     # slave x data // 64
+    trans = cg.cross("transitions", slave, slave)      # 2 x 2 bins
+
+    slave.sample(1)
+    ranges.sample(1, data // 64)
+    trans.sample(prev, curr)
+    cg.coverage, slave.uncovered(), print(db.report())
+
+Bin indices are plain integers: mapping a value to its bin (``data // 64``,
+a lookup table...) is done by the caller, once per sample.
+
+At the end of a test the database is written with :meth:`CoverageDB.save`
+(a JSON schema followed by the raw counters, which can be memory-mapped).
+Files from parallel runs and seeds with the same schema are merged by adding
+their hit counts, which gives one closure number for the regression:
+    python -m tb_utils.coverage_db [--out DIR] [--uncovered] FILE_OR_DIR...
+"""
+
+import argparse
+import hashlib
+import itertools
+import json
+import os
+import struct
+import sys
+from array import array
+from pathlib import Path
+
+import numpy as np
+
+MAGIC = b"COVDB1\n"
+SUFFIX = ".cdb"
+
+
+class Coverpoint:
+    """A block of ``size`` bins inside a :class:`CoverageDB`.
+
+    Created with :meth:`Covergroup.coverpoint` or :meth:`Covergroup.cross`,
+    never directly. A multi-dimensional coverpoint (a cross) is sampled with
+    one index per dimension, flattened in row-major order.
+    """
+
+    def __init__(self, group, name, shape, labels, at_least):
+        self.group = group
+        self.db = group.db
+        self.name = name
+        self.shape = shape
+        self.size = 1
+        for n in shape:
+            self.size *= n
+        if len(labels) != self.size:
+            raise ValueError(f"{name}: {len(labels)} labels for {self.size} bins")
+        self.labels = list(labels)
+        self.at_least = at_least
+        self.hits = 0  # Bins with at least ``at_least`` samples
+        self.offset = self.db._allocate(self.size)
+        self._counts = self.db.counts  # Grows in place, the reference stays valid
+        self._mask = (1 << self.size) - 1
+        if len(shape) == 1:
+            self.sample = self._sample_1d
+        elif len(shape) == 2:
+            self.sample = self._sample_2d
+
+    def __len__(self):
+        return self.size
+
+    def index(self, *idx):
+        """Flat bin number (within this coverpoint) of a sample."""
+        if len(idx) != len(self.shape):
+            raise TypeError(f"{self.name} takes {len(self.shape)} indices, got {len(idx)}")
+        k = 0
+        for v, n in zip(idx, self.shape):
+            if not 0 <= v < n:
+                raise IndexError(f"{self.name}: bin {idx} out of range {self.shape}")
+            k = k * n + v
+        return k
+
+    def sample(self, *idx):
+        """Count one hit of the bin at ``idx``."""
+        i = self.offset + self.index(*idx)
+        counts = self._counts
+        counts[i] += 1
+        if counts[i] == self.at_least:
+            self._cover(i)
+
+    # Specialised ``sample`` for one and two dimensions (the common cases),
+    # installed by __init__: no argument packing or loop per sample.
+
+    def _sample_1d(self, i):
+        if not 0 <= i < self.size:
+            raise IndexError(f"{self.name}: bin {i} out of range {self.shape}")
+        i += self.offset
+        counts = self._counts
+        counts[i] += 1
+        if counts[i] == self.at_least:
+            self._cover(i)
+
+    def _sample_2d(self, i, j):
+        n0, n1 = self.shape
+        if not (0 <= i < n0 and 0 <= j < n1):
+            raise IndexError(f"{self.name}: bin {(i, j)} out of range {self.shape}")
+        i = self.offset + i * n1 + j
+        counts = self._counts
+        counts[i] += 1
+        if counts[i] == self.at_least:
+            self._cover(i)
+
+    def sample_array(self, *idx):
+        """Count a batch of hits: one integer array per dimension."""
+        flat = np.ravel_multi_index([np.asarray(a) for a in idx], self.shape)
+        add = np.bincount(np.ravel(flat), minlength=self.size).astype(np.uint64)
+        view = np.frombuffer(self.db.counts, dtype=np.uint64)[self.offset:self.offset + self.size]
+        below = view < self.at_least
+        view += add
+        newly = np.flatnonzero(below & (view >= self.at_least))
+        del view  # Release the buffer so the counter array can grow again
+        for k in newly.tolist():
+            self._cover(self.offset + k)
+
+    def _cover(self, i):
+        self.db.uncovered_mask &= ~(1 << i)
+        self.hits += 1
+
+    @property
+    def coverage(self):
+        """Percentage of covered bins."""
+        return 100.0 * self.hits / self.size
+
+    @property
+    def counts(self):
+        """Hit counters as an array of ``shape``."""
+        return np.array(self.db.counts[self.offset:self.offset + self.size]).reshape(self.shape)
+
+    def uncovered_bins(self):
+        """Flat bin numbers that have not reached ``at_least`` hits."""
+        m = (self.db.uncovered_mask >> self.offset) & self._mask
+        bins = []
+        while m:
+            low = m & -m
+            bins.append(low.bit_length() - 1)
+            m ^= low
+        return bins
+
+    def uncovered(self):
+        """Labels of the uncovered bins, in declaration order."""
+        return [self.labels[k] for k in self.uncovered_bins()]
+
+    def items(self):
+        """``(label, count)`` for every bin."""
+        return list(zip(self.labels, self.db.counts[self.offset:self.offset + self.size]))
+
+
+class Covergroup:
+    """A named set of coverpoints; its coverage is the mean of theirs."""
+
+    def __init__(self, db, name):
+        self.db = db
+        self.name = name
+        self.points = []
+
+    def __iter__(self):
+        return iter(self.points)
+
+    def __getitem__(self, name):
+        for point in self.points:
+            if point.name == name:
+                return point
+        raise KeyError(name)
+
+    def coverpoint(self, name, bins, labels=None, at_least=1):
+        """Declare a coverpoint.
+
+        Args:
+            bins: Number of bins, a shape tuple for a multi-dimensional
+                coverpoint, or the list of bin labels.
+            labels: Bin labels when ``bins`` is a number or a shape
+                (default: the bin indices).
+            at_least: Hits needed for a bin to count as covered.
+        """
+        if isinstance(bins, int):
+            shape = (bins,)
+        elif isinstance(bins, tuple):
+            shape = bins
+        else:
+            labels = list(bins)
+            shape = (len(labels),)
+        if labels is None:
+            ranges = [range(n) for n in shape]
+            if len(shape) == 1:
+                labels = [str(i) for i in ranges[0]]
+            else:
+                labels = [",".join(map(str, k)) for k in itertools.product(*ranges)]
+        point = Coverpoint(self, name, shape, labels, at_least)
+        self.points.append(point)
+        return point
+
+    def cross(self, name, *points, labels=None, at_least=1):
+        """Declare the cross of one-dimensional coverpoints.
+
+        The cross has its own counters and is sampled explicitly with one
+        index per crossed coverpoint, e.g. ``trans.sample(prev, curr)``.
+        """
+        if labels is None:
+            labels = [",".join(k) for k in itertools.product(*(p.labels for p in points))]
+        return self.coverpoint(name, tuple(p.size for p in points), labels, at_least)
+
+    @property
+    def coverage(self):
+        """Mean of the coverage percentages of the coverpoints."""
+        if not self.points:
+            return 0.0
+        return sum(p.coverage for p in self.points) / len(self.points)
+
+
+class CoverageDB:
+    """Hit counters and uncovered bitmask for all the covergroups of a testbench.
+
+    Attributes:
+        counts: ``array('Q')`` with one counter per bin, in declaration order.
+        uncovered_mask: Integer with bit ``i`` set while bin ``i`` is uncovered.
+    """
+
+    def __init__(self, name="coverage"):
+        self.name = name
+        self.groups = []
+        self.counts = array("Q")
+        self.uncovered_mask = 0
+
+    def __iter__(self):
+        return iter(self.groups)
+
+    def __getitem__(self, name):
+        for group in self.groups:
+            if group.name == name:
+                return group
+        raise KeyError(name)
+
+    def _allocate(self, size):
+        offset = len(self.counts)
+        self.counts.extend(itertools.repeat(0, size))
+        self.uncovered_mask |= ((1 << size) - 1) << offset
+        return offset
+
+    def covergroup(self, name):
+        group = Covergroup(self, name)
+        self.groups.append(group)
+        return group
+
+    @property
+    def size(self):
+        return len(self.counts)
+
+    @property
+    def coverage(self):
+        """Mean of the covergroup percentages."""
+        if not self.groups:
+            return 0.0
+        return sum(g.coverage for g in self.groups) / len(self.groups)
+
+    def schema(self):
+        """Declaration of every bin (no counts); equal schemas can be merged."""
+        return {
+            "name": self.name,
+            "groups": [
+                {
+                    "name": g.name,
+                    "points": [
+                        {"name": p.name, "shape": list(p.shape), "labels": p.labels,
+                         "at_least": p.at_least}
+                        for p in g.points
+                    ],
+                }
+                for g in self.groups
+            ],
+        }
+
+    @property
+    def key(self):
+        """Short hash of :meth:`schema`, used to group files for merging."""
+        text = json.dumps(self.schema(), sort_keys=True)
+        return hashlib.sha1(text.encode()).hexdigest()[:12]
+
+    @classmethod
+    def from_schema(cls, schema):
+        db = cls(schema["name"])
+        for g in schema["groups"]:
+            group = db.covergroup(g["name"])
+            for p in g["points"]:
+                group.coverpoint(p["name"], tuple(p["shape"]), p["labels"], p["at_least"])
+        return db
+
+    def _refresh(self):
+        """Recompute covered bins and the uncovered mask from the counters."""
+        counts = np.frombuffer(self.counts, dtype=np.uint64)
+        uncovered = np.zeros(self.size, dtype=bool)
+        for group in self.groups:
+            for p in group.points:
+                block = counts[p.offset:p.offset + p.size] < p.at_least
+                uncovered[p.offset:p.offset + p.size] = block
+                p.hits = int(p.size - block.sum())
+        del counts
+        packed = np.packbits(uncovered, bitorder="little").tobytes()
+        self.uncovered_mask = int.from_bytes(packed, "little")
+
+    def merge(self, other):
+        """Add the hit counts of ``other`` (same schema) to this database."""
+        if other.schema() != self.schema():
+            raise ValueError(f"cannot merge coverage '{other.name}' into '{self.name}': schemas differ")
+        counts = np.frombuffer(self.counts, dtype=np.uint64)
+        counts += np.frombuffer(other.counts, dtype=np.uint64)
+        del counts
+        self._refresh()
+        return self
+
+    def save(self, path):
+        """Write the database to ``path`` (atomically); returns the path.
+
+        Layout: ``MAGIC``, header length (``<I``), JSON schema padded to a
+        multiple of 8 bytes, then one little-endian ``uint64`` per bin.
+        """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        header = json.dumps(self.schema()).encode()
+        header += b" " * (-(len(MAGIC) + 4 + len(header)) % 8)
+        tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        with open(tmp, "wb") as f:
+            f.write(MAGIC + struct.pack("<I", len(header)) + header)
+            f.write(np.frombuffer(self.counts, dtype=np.uint64).astype("<u8").tobytes())
+        os.replace(tmp, path)
+        return path
+
+    @classmethod
+    def load(cls, path, mmap=False):
+        """Read a file written by :meth:`save`.
+
+        With ``mmap=True`` the counters are read through ``np.memmap``
+        instead of loading the whole file first.
+        """
+        with open(path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{path}: not a coverage database")
+            (length,) = struct.unpack("<I", f.read(4))
+            db = cls.from_schema(json.loads(f.read(length)))
+            offset = f.tell()
+            if not mmap:
+                data = np.fromfile(f, dtype="<u8", count=db.size)
+        if mmap:
+            data = np.memmap(path, dtype="<u8", mode="r", offset=offset, shape=(db.size,))
+        if len(data) != db.size:
+            raise ValueError(f"{path}: truncated coverage database")
+        counts = np.frombuffer(db.counts, dtype=np.uint64)
+        counts[:] = data
+        del counts, data
+        db._refresh()
+        return db
+
+    def report(self):
+        """Multi-line coverage summary, one line per coverpoint."""
+        lines = [f"{self.name}: {self.coverage:.1f}% ({self.size} bins)"]
+        for group in self.groups:
+            lines.append(f"  {group.name}: {group.coverage:.1f}%")
+            for p in group.points:
+                lines.append(f"    {p.name:<20} {p.hits:>5}/{p.size:<5} {p.coverage:6.1f}%")
+        return "\n".join(lines)
+
+
+def coverage_path(name, seed=None, directory=None):
+    """Where a test writes its database: ``<dir>/<name>[.seed<N>].cdb``.
+
+    The directory is ``COVERAGE_DB_DIR`` (set per job by
+    ``tb_utils.regression``) or the current directory.
+    """
+    directory = Path(directory or os.getenv("COVERAGE_DB_DIR", "."))
+    suffix = "" if seed is None else f".seed{seed}"
+    return directory / f"{name}{suffix}{SUFFIX}"
+
+
+def find_files(paths, exclude=None):
+    """Coverage files among ``paths``; directories are searched recursively,
+    skipping anything under ``exclude`` (e.g. a previous merge output)."""
+    exclude = Path(exclude).resolve() if exclude else None
+    files = []
+    for path in map(Path, paths):
+        if path.is_dir():
+            files += sorted(
+                f for f in path.rglob(f"*{SUFFIX}")
+                if exclude is None or not f.resolve().is_relative_to(exclude)
+            )
+        else:
+            files.append(path)
+    return files
+
+
+def merge_files(paths, exclude=None):
+    """Merge every file by schema; returns ``{key: (db, number_of_files)}``."""
+    merged = {}
+    for path in find_files(paths, exclude):
+        db = CoverageDB.load(path, mmap=True)
+        if db.key in merged:
+            total, n = merged[db.key]
+            merged[db.key] = (total.merge(db), n + 1)
+        else:
+            merged[db.key] = (db, 1)
+    return merged
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m tb_utils.coverage_db",
+        description="Merge coverage databases from parallel runs and report closure.",
+    )
+    parser.add_argument("paths", nargs="+", help="coverage files or directories to search")
+    parser.add_argument("--out", type=Path, help="write one merged <name>.cdb per schema here")
+    parser.add_argument("--uncovered", action="store_true", help="list the uncovered bins")
+    args = parser.parse_args(argv)
+
+    merged = merge_files(args.paths, exclude=args.out)
+    if not merged:
+        print("No coverage databases found")
+        return 1
+    for db, n in sorted(merged.values(), key=lambda m: m[0].name):
+        print(f"\n[{n} run{'s' if n != 1 else ''}] {db.report()}")
+        if args.uncovered:
+            for group in db:
+                for p in group:
+                    missing = p.uncovered()
+                    if missing:
+                        print(f"    {group.name}.{p.name} uncovered: {' | '.join(missing)}")
+        if args.out:
+            name = db.name if sum(m.name == db.name for m, _ in merged.values()) == 1 else f"{db.name}.{db.key}"
+            print(f"    -> {db.save(args.out / f'{name}{SUFFIX}')}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,121 @@
+"""
+One coroutine per clock for the per-cycle parts of a testbench.
+
+In the Course_4 and pyuvm testbenches the driver, the monitor and the
+scoreboard each run their own loop (``await clk.falling_edge``,
+``await clk.rising_edge; await ReadOnly()``, ``await queue.get()``), so every
+simulated cycle resumes several coroutines. :class:`CycleDispatcher` awaits
+each phase once and calls plain functions registered for it::
+
+    cycles = CycleDispatcher(dut.clk)
+    cycles.on_drive(driver.drive)         # falling edge: apply next inputs
+    cycles.on_sample(monitor.sample)      # rising edge + ReadOnly: read outputs
+    cycles.on_check(scoreboard.check)     # same wakeup, after every sample
+    cycles.start()
+
+Callbacks are synchronous: they take work with ``get_nowait()`` /
+``try_next_item()`` instead of awaiting it, and may not write signals in the
+sample and check phases (ReadOnly). Adding components adds function calls,
+not scheduler wakeups.
+
+:class:`WakeupCounter` counts coroutine resumptions over a block of code, to
+measure what the dispatcher saves.
+"""
+
+import cocotb
+from cocotb.task import Task
+from cocotb.triggers import ReadOnly
+
+
+class CycleDispatcher:
+    """Runs per-phase callbacks on every cycle of ``clock``.
+
+    Phases, in order: ``drive`` (falling edge), ``sample`` (rising edge,
+    ReadOnly) and ``check`` (right after ``sample``, same wakeup).
+    """
+
+    def __init__(self, clock):
+        self.clock = clock
+        self.drive = []
+        self.sample = []
+        self.check = []
+        self.cycles = 0
+        self.wakeups = 0
+        self._task = None
+
+    def on_drive(self, fn):
+        self.drive.append(fn)
+        return fn
+
+    def on_sample(self, fn):
+        self.sample.append(fn)
+        return fn
+
+    def on_check(self, fn):
+        self.check.append(fn)
+        return fn
+
+    def start(self):
+        if self._task is None:
+            self._task = cocotb.start_soon(self.run())
+        return self._task
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def run(self):
+        falling = self.clock.falling_edge
+        rising = self.clock.rising_edge
+        readonly = ReadOnly()
+        while True:
+            await falling
+            for fn in self.drive:
+                fn()
+            await rising
+            await readonly
+            for fn in self.sample:
+                fn()
+            for fn in self.check:
+                fn()
+            self.cycles += 1
+            self.wakeups += 3
+
+
+# Task method the scheduler calls on every resumption: ``_resume`` in
+# cocotb 2.1, ``_advance`` in 2.0. None if this version has neither.
+_RESUME = next((name for name in ("_resume", "_advance") if hasattr(Task, name)), None)
+
+
+class WakeupCounter:
+    """Counts coroutine resumptions by the cocotb scheduler inside a ``with`` block.
+
+    Wraps the private ``Task._resume`` (``Task._advance`` in cocotb 2.0);
+    meant for benchmarks only. If the installed cocotb has neither,
+    :attr:`available` is False and :attr:`count` stays ``None``.
+    """
+
+    available = _RESUME is not None
+
+    def __init__(self):
+        self.count = 0 if self.available else None
+        self._orig = None
+
+    def __enter__(self):
+        if not self.available:
+            return self
+        orig = self._orig = getattr(Task, _RESUME)
+
+        def resume(task, *args, **kwargs):
+            self.count += 1
+            return orig(task, *args, **kwargs)
+
+        setattr(Task, _RESUME, resume)
+        return self
+
+    def __exit__(self, *exc):
+        if self._orig is not None:
+            setattr(Task, _RESUME, self._orig)
+            self._orig = None
+        return False
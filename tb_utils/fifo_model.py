@@ -0,0 +1,57 @@
+from collections import deque
+
+
+class _LazyDump:
+    """Formats the model contents only when the log record is emitted."""
+
+    __slots__ = ("_items",)
+
+    def __init__(self, items):
+        self._items = items
+
+    def __str__(self):
+        return " ".join(str(int(v)) for v in self._items)
+
+
+class FifoModel:
+    """Golden FIFO queue with constant-time push/pop.
+
+    Backed by ``collections.deque`` (a ring of blocks), so ``pop`` from the
+    head does not shift the remaining entries like ``list.pop(0)`` does.
+
+    Args:
+        depth: Capacity of the modelled FIFO, or ``None`` for unbounded.
+    """
+
+    def __init__(self, depth=None):
+        self.depth = depth
+        self._items = deque()
+
+    def __len__(self):
+        return len(self._items)
+
+    @property
+    def full(self):
+        return self.depth is not None and len(self._items) >= self.depth
+
+    @property
+    def empty(self):
+        return not self._items
+
+    def push(self, value):
+        """Append ``value``; returns ``False`` (and drops it) when full."""
+        if self.full:
+            return False
+        self._items.append(value)
+        return True
+
+    def pop(self):
+        """Remove and return the oldest entry. Raises ``IndexError`` when empty."""
+        return self._items.popleft()
+
+    def clear(self):
+        self._items.clear()
+
+    def dump(self):
+        """Contents for logging, e.g. ``log.info("FIFO: %s", model.dump())``."""
+        return _LazyDump(self._items)
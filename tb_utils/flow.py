@@ -0,0 +1,61 @@
+import os
+
+from cocotb.triggers import Event
+
+
+def flow_window(default=1):
+    """Outstanding-transaction window requested through ``FLOW_WINDOW``."""
+    return int(os.getenv("FLOW_WINDOW", str(default)))
+
+
+class CreditWindow:
+    """Bounded-credit flow control between a Generator and its Scoreboard.
+
+    The generator calls :meth:`acquire` before putting a transaction in the
+    driver queue and the scoreboard calls :meth:`release` after checking one.
+    With ``window=1`` this is the classic ``event.wait()``/``event.set()``
+    lockstep; larger windows let stimulus be generated and driven
+    back-to-back while checking happens asynchronously.
+
+    Args:
+        window: Maximum number of transactions generated but not yet checked.
+    """
+
+    def __init__(self, window=1):
+        if window < 1:
+            raise ValueError(f"window must be >= 1, got {window}")
+        self.window = window
+        self.outstanding = 0
+        self.issued = 0
+        self.retired = 0
+        self._credit = Event()
+        self._idle = Event()
+        self._idle.set()
+
+    async def acquire(self):
+        """Wait for a free credit and take it."""
+        while self.outstanding >= self.window:
+            self._credit.clear()
+            await self._credit.wait()
+        self.outstanding += 1
+        self.issued += 1
+        self._idle.clear()
+
+    def release(self):
+        """Return the credit of one checked transaction.
+
+        Raises:
+            RuntimeError: No transaction is outstanding, i.e. the scoreboard
+                checked something the generator never issued.
+        """
+        if self.outstanding == 0:
+            raise RuntimeError("CreditWindow.release() with no outstanding credit")
+        self.outstanding -= 1
+        self.retired += 1
+        self._credit.set()
+        if self.outstanding == 0:
+            self._idle.set()
+
+    async def drain(self):
+        """Wait until every issued transaction has been checked."""
+        await self._idle.wait()
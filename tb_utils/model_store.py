@@ -0,0 +1,147 @@
+"""
+Persistent store for trained testbench models.
+
+The ML agents learn the DUT from scratch on every simulation. A
+:class:`ModelStore` saves whatever state an agent needs to resume (a fitted
+estimator, its training set, network weights...) at the end of a test and
+loads it back at the start of the next one, so repeated runs skip the
+exploration phase::
+
+    store = ModelStore("fir_ml_memory", sources=[PROJ_DIR / "filter.v"])
+    state = store.load(schema={"features": [...]}, version=1)
+    if state is None:
+        ...                                   # cold start: explore and train
+    store.save(state, schema={"features": [...]}, version=1)
+
+Entries are keyed by the contents of the DUT sources, the model ``schema``
+(anything JSON-serializable describing inputs, outputs and hyperparameters)
+and its ``version``. Editing the RTL or the features therefore misses the
+old entry; it is reported as stale and replaced by the next :meth:`save`.
+
+Environment:
+    MODEL_STORE=0      disable loading and saving
+    MODEL_STORE=save   always start cold, but save at the end
+    MODEL_STORE_DIR    store location (default ``<repo>/.model_store``)
+"""
+
+import hashlib
+import json
+import os
+import pickle
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+SUFFIX = ".model.pkl"
+
+
+def store_root():
+    return Path(os.getenv("MODEL_STORE_DIR", REPO_ROOT / ".model_store")).resolve()
+
+
+def _mode():
+    value = os.getenv("MODEL_STORE", "1").lower()
+    if value in ("0", "false", "no", "off"):
+        return "off"
+    return "save" if value == "save" else "on"
+
+
+class ModelStore:
+    """Saved models of one agent (``name``) trained against ``sources``.
+
+    Args:
+        name: Entry name, unique per agent and model kind.
+        sources: HDL files whose contents the model depends on.
+        directory: Store location (default :func:`store_root`).
+        mode: ``"on"``, ``"save"`` or ``"off"`` (default from ``MODEL_STORE``).
+    """
+
+    def __init__(self, name, sources=(), directory=None, mode=None):
+        self.name = name
+        self.sources = [Path(s).resolve() for s in sources]
+        self.directory = Path(directory).resolve() if directory is not None else store_root()
+        self.mode = mode or _mode()
+        self.status = "cold"  # "hit", "miss", "stale", "cold", "off" or "error"
+        self.loaded_meta = None
+
+    def key(self, schema=None, version=1):
+        """Hash of the sources, the schema and the version."""
+        h = hashlib.sha256()
+        h.update(f"name={self.name}\nversion={version}\n".encode())
+        h.update(json.dumps(schema, sort_keys=True, default=str).encode())
+        for path in self.sources:
+            h.update(f"\nfile={path.name}\n".encode())
+            h.update(hashlib.sha256(path.read_bytes()).digest())
+        return h.hexdigest()[:16]
+
+    def path(self, key):
+        return self.directory / f"{self.name}-{key}{SUFFIX}"
+
+    def _entries(self):
+        return sorted(self.directory.glob(f"{self.name}-*{SUFFIX}"))
+
+    def load(self, schema=None, version=1):
+        """Saved payload for this schema and version, or ``None``."""
+        if self.mode != "on":
+            self.status = "off" if self.mode == "off" else "cold"
+            return None
+        key = self.key(schema, version)
+        path = self.path(key)
+        if not path.exists():
+            self.status = "stale" if self._entries() else "miss"
+            return None
+        try:
+            with open(path, "rb") as f:
+                entry = pickle.load(f)
+        except Exception:  # noqa: BLE001 - a broken entry is just a miss
+            self.status = "error"
+            return None
+        if entry.get("meta", {}).get("key") != key:
+            self.status = "error"
+            return None
+        self.status = "hit"
+        self.loaded_meta = entry["meta"]
+        return entry["payload"]
+
+    def save(self, payload, schema=None, version=1, **info):
+        """Write ``payload`` and drop stale entries of this name.
+
+        ``info`` is stored in the metadata (e.g. how many samples trained it).
+        Returns the entry path, or ``None`` when the store is disabled.
+        """
+        if self.mode == "off":
+            return None
+        key = self.key(schema, version)
+        meta = {
+            "name": self.name,
+            "key": key,
+            "version": version,
+            "schema": schema,
+            "sources": [str(p) for p in self.sources],
+            "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+            **info,
+        }
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.path(key)
+        # Atomic write: parallel regression jobs may save the same entry
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with open(tmp, "wb") as f:
+            pickle.dump({"meta": meta, "payload": payload}, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+        for old in self._entries():
+            if old != path:
+                old.unlink(missing_ok=True)
+        return path
+
+    def summary(self):
+        text = f"[MODEL STORE] {self.name}: {self.status}"
+        if self.status == "hit":
+            created = self.loaded_meta.get("created")
+            text += f" (warm start from {created})"
+        elif self.status == "stale":
+            text += " (sources or schema changed, cold start)"
+        elif self.status in ("miss", "error"):
+            text += " (cold start)"
+        elif self.status == "cold":
+            text += " (MODEL_STORE=save)"
+        return text
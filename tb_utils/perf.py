@@ -0,0 +1,70 @@
+import os
+import time
+
+
+def bench_requested(name):
+    """Whether the benchmark test ``name`` should run instead of being skipped.
+
+    Benchmarks stay out of plain ``make`` runs and regressions. They run with
+    ``BENCH=1`` or when selected by name (``make TESTCASE=<name>``, as the
+    ``bench`` targets do, or ``COCOTB_TEST_FILTER``)::
+
+        @cocotb.test(skip=not bench_requested("rl_training_benchmark"))
+    """
+    if os.getenv("BENCH", "0").lower() in ("1", "true", "yes", "on"):
+        return True
+    selected = (os.getenv(v, "") for v in ("TESTCASE", "COCOTB_TESTCASE", "COCOTB_TEST_FILTER"))
+    return any(name in s for s in selected)
+
+
+class Throughput:
+    """Wall-clock (and optionally simulated) time spent on a batch of items.
+
+    Use as a context manager and set :attr:`count` before leaving the block::
+
+        with Throughput("fifo window=4", sim_time=lambda: get_sim_time("ns")) as tp:
+            ...
+            tp.count = n
+        cocotb.log.info(tp.summary())
+
+    Args:
+        label: Name printed in :meth:`summary`.
+        unit: Name of the counted items.
+        sim_time: Optional zero-argument callable returning simulated time in ns.
+    """
+
+    def __init__(self, label, unit="items", sim_time=None):
+        self.label = label
+        self.unit = unit
+        self.sim_time = sim_time
+        self.count = 0
+        self.wall = 0.0
+        self.sim_ns = None
+        self._wall0 = None
+        self._sim0 = None
+
+    def __enter__(self):
+        self._wall0 = time.perf_counter()
+        if self.sim_time is not None:
+            self._sim0 = self.sim_time()
+        return self
+
+    def __exit__(self, *exc):
+        self.wall = time.perf_counter() - self._wall0
+        if self.sim_time is not None:
+            self.sim_ns = self.sim_time() - self._sim0
+        return False
+
+    @property
+    def rate(self):
+        """Items per wall-clock second."""
+        return self.count / self.wall if self.wall > 0 else float("inf")
+
+    def summary(self):
+        text = (
+            f"[PERF] {self.label}: {self.count} {self.unit} in {self.wall:.3f} s"
+            f" -> {self.rate:,.1f} {self.unit}/s"
+        )
+        if self.sim_ns is not None:
+            text += f" ({self.sim_ns:,.0f} ns simulated)"
+        return text
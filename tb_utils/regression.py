@@ -0,0 +1,304 @@
+"""
+Parallel regression over every cocotb flow in the repository.
+
+Discovers the Python runners (files that call ``get_runner`` and define
+``test_*`` functions, e.g. ``Course_4/3_FIFO/runner_fifo.py``) and the
+cocotb Makefiles (``ML_cocotb``, ``ml_spi``, ``pyuvm/*``...), expands them
+over a seed sweep and runs each job in its own process and working
+directory, so ``sim_build``, waveforms and ``results.xml`` never collide.
+The per-job results are merged into a single xUnit report with the wall
+time of each job.
+
+Usage:
+    python -m tb_utils.regression [-j N] [--seeds N | --seed S ...]
+                                  [-k PATTERN] [--out DIR] [--list]
+"""
+
+import argparse
+import ast
+import os
+import shlex
+import subprocess
+import sys
+import time
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from tb_utils.coverage_db import SUFFIX, merge_files
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+# Directories never scanned for flows (the runner template has no DUT).
+SKIP_DIRS = {".git", ".venv", "venv", "__pycache__", "sim_build", "regression_build", "assets"}
+
+# Imports the runner by path and calls one of its test_* functions, like
+# pytest would, from the job's working directory.
+_RUN_FUNCTION = """
+import importlib.util, sys
+from pathlib import Path
+path, func = Path(sys.argv[1]), sys.argv[2]
+sys.path.insert(0, str(path.parent))
+spec = importlib.util.spec_from_file_location(path.stem, path)
+module = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(module)
+getattr(module, func)()
+"""
+
+
+@dataclass
+class Flow:
+    """A runnable flow: ``kind`` is ``"runner"`` (function in a runner file) or ``"make"``."""
+
+    kind: str
+    path: Path
+    func: str = ""
+
+    @property
+    def name(self):
+        rel = self.path.relative_to(REPO_ROOT).as_posix()
+        return f"{rel}::{self.func}" if self.func else rel
+
+
+@dataclass
+class Job:
+    flow: Flow
+    seed: int | None
+    workdir: Path
+
+    @property
+    def name(self):
+        return self.flow.name if self.seed is None else f"{self.flow.name}[seed={self.seed}]"
+
+
+@dataclass
+class JobResult:
+    job: Job
+    returncode: int
+    wall: float
+    log: Path
+    results: list
+
+
+def _walk(root):
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(d for d in dirnames if d not in SKIP_DIRS)
+        yield Path(dirpath), sorted(filenames)
+
+
+def discover(root=REPO_ROOT):
+    """Return every runner test function and cocotb Makefile under ``root``."""
+    flows = []
+    for dirpath, filenames in _walk(root):
+        for name in filenames:
+            path = dirpath / name
+            if name.endswith(".py"):
+                source = path.read_text(errors="ignore")
+                if "get_runner" not in source:
+                    continue
+                tree = ast.parse(source, filename=str(path))
+                for node in tree.body:
+                    if isinstance(node, ast.FunctionDef) and node.name.startswith("test_"):
+                        flows.append(Flow("runner", path, node.name))
+            elif name == "Makefile":
+                if "Makefile.sim" in path.read_text(errors="ignore"):
+                    flows.append(Flow("make", path))
+    return flows
+
+
+def _job_command(job):
+    env = dict(os.environ)
+    # Coverage databases, saved models and transaction logs written by the
+    # tests land next to the job's results, never in a directory shared by
+    # concurrent seeds.
+    env["COVERAGE_DB_DIR"] = str(job.workdir)
+    env["MODEL_STORE_DIR"] = str(job.workdir / "model_store")
+    if env.get("TB_TXN_LOG_DIR"):
+        env["TB_TXN_LOG_DIR"] = str(job.workdir / "txlog")
+    if job.seed is not None:
+        env["COCOTB_RANDOM_SEED"] = str(job.seed)
+    if job.flow.kind == "make":
+        # Sources are resolved from the Makefile directory (PWD is not
+        # updated by ``make -C`` on its own), but the simulator runs in the
+        # job directory, so files the testbench writes to its current
+        # directory (plots, logs) do not collide either. The testbench
+        # module is then found through PYTHONPATH.
+        proj = job.flow.path.parent
+        env["PWD"] = str(proj)
+        env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(proj), env.get("PYTHONPATH")]))
+        cmd = [
+            "make", "-C", str(proj),
+            f"SIM_BUILD={job.workdir / 'sim_build'}",
+            f"COCOTB_RESULTS_FILE={job.workdir / 'results.xml'}",
+            # Portable "cd then exec" wrapper (``env -C`` is GNU-only); ``$$`` is
+            # make's escape for ``$``.
+            "SIM_CMD_PREFIX=sh -c 'cd \"$$0\" && exec \"$$@\"' "
+            + shlex.quote(str(job.workdir)),
+        ]
+        return cmd, proj, env
+    # Runners build into ./sim_build, so the job directory isolates them.
+    cmd = [sys.executable, "-c", _RUN_FUNCTION, str(job.flow.path), job.flow.func]
+    return cmd, job.workdir, env
+
+
+def run_job(job):
+    """Run one job to completion; returns a :class:`JobResult`."""
+    job.workdir.mkdir(parents=True, exist_ok=True)
+    log = job.workdir / "job.log"
+    cmd, cwd, env = _job_command(job)
+    start = time.perf_counter()
+    with open(log, "w") as f:
+        proc = subprocess.run(cmd, cwd=cwd, env=env, stdout=f, stderr=subprocess.STDOUT)
+    wall = time.perf_counter() - start
+    results = sorted(
+        p for p in job.workdir.rglob("*.xml")
+        if p.name == "results.xml" or p.name.endswith(".result.xml")
+    )
+    return JobResult(job, proc.returncode, wall, log, results)
+
+
+@dataclass
+class SuiteResult:
+    """One ``testsuite`` of a merged report: the xUnit files of a single job."""
+
+    name: str
+    files: list
+    wall: float
+    properties: dict = field(default_factory=dict)
+    # Set when the job failed without the simulator reporting a failing test.
+    error: str | None = None
+    package: str = ""
+
+
+def merge_xunit(suites, out_file, name="regression"):
+    """Write one xUnit file with a ``testsuite`` per job; returns ``(tests, failures)``."""
+    root = ET.Element("testsuites", name=name)
+    total_tests = total_failures = 0
+    for res in sorted(suites, key=lambda r: r.name):
+        suite = ET.SubElement(root, "testsuite", name=res.name, package=res.package or res.name)
+        props = ET.SubElement(suite, "properties")
+        ET.SubElement(props, "property", name="wall_time", value=f"{res.wall:.3f}")
+        for key, value in res.properties.items():
+            ET.SubElement(props, "property", name=key, value=str(value))
+
+        cases = []
+        for xml in res.files:
+            try:
+                cases += ET.parse(xml).getroot().iter("testcase")
+            except (ET.ParseError, OSError):
+                pass
+        if not cases or (res.error and not any(c.find("failure") is not None for c in cases)):
+            # Build error, crash or a failure the simulator did not report.
+            case = ET.Element("testcase", name="job", classname=res.package or res.name, time="0")
+            ET.SubElement(case, "error", message=res.error or "no results were written")
+            cases.append(case)
+
+        failures = sum(
+            1 for c in cases if c.find("failure") is not None or c.find("error") is not None
+        )
+        suite.extend(cases)
+        suite.set("tests", str(len(cases)))
+        suite.set("failures", str(failures))
+        suite.set("time", f"{res.wall:.3f}")
+        total_tests += len(cases)
+        total_failures += failures
+
+    root.set("tests", str(total_tests))
+    root.set("failures", str(total_failures))
+    ET.indent(root)
+    ET.ElementTree(root).write(out_file, encoding="unicode", xml_declaration=False)
+    return total_tests, total_failures
+
+
+def merge_results(job_results, out_file):
+    """Merge the results of :func:`run_job` calls; returns ``(tests, failures)``."""
+    suites = []
+    for res in job_results:
+        props = {"returncode": res.returncode, "log": res.log}
+        if res.job.seed is not None:
+            props["random_seed"] = res.job.seed
+        error = None
+        if res.returncode != 0:
+            error = f"job exited with code {res.returncode}, see {res.log}"
+        suites.append(SuiteResult(res.job.name, res.results, res.wall, props, error, res.job.flow.name))
+    return merge_xunit(suites, out_file)
+
+
+def _seeds(args):
+    if args.seed:
+        return args.seed
+    if args.seeds:
+        return list(range(args.base_seed, args.base_seed + args.seeds))
+    return [None]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m tb_utils.regression", description="Run every cocotb flow in parallel."
+    )
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1,
+                        help="concurrent jobs (default: number of CPUs)")
+    parser.add_argument("--seeds", type=int, default=0, help="run each flow with N seeds")
+    parser.add_argument("--base-seed", type=int, default=1, help="first seed of --seeds")
+    parser.add_argument("--seed", type=int, action="append", help="explicit seed (repeatable)")
+    parser.add_argument("-k", dest="pattern", action="append",
+                        help="only flows whose name contains PATTERN (repeatable)")
+    parser.add_argument("--out", type=Path, default=REPO_ROOT / "regression_build",
+                        help="output directory (default: regression_build/)")
+    parser.add_argument("--list", action="store_true", help="list the flows and exit")
+    args = parser.parse_args(argv)
+
+    flows = discover()
+    if args.pattern:
+        flows = [f for f in flows if any(p in f.name for p in args.pattern)]
+    if args.list:
+        for flow in flows:
+            print(f"{flow.kind:<7} {flow.name}")
+        return 0
+
+    out = args.out.resolve()
+    jobs = []
+    for flow in flows:
+        slug = flow.name.replace("/", "__").replace("::", "__")
+        for seed in _seeds(args):
+            workdir = out / slug / ("default" if seed is None else f"seed_{seed}")
+            jobs.append(Job(flow, seed, workdir))
+
+    print(f"Running {len(jobs)} jobs on {args.jobs} workers -> {out}")
+    start = time.perf_counter()
+    results = []
+    # Each job is its own simulator process; the pool only waits on them.
+    with ThreadPoolExecutor(max_workers=args.jobs) as pool:
+        futures = [pool.submit(run_job, job) for job in jobs]
+        for fut in as_completed(futures):
+            res = fut.result()
+            results.append(res)
+            status = "PASS" if res.returncode == 0 else f"FAIL({res.returncode})"
+            print(f"  {status:<9} {res.wall:8.1f} s  {res.job.name}")
+    wall = time.perf_counter() - start
+
+    report = out / "results.xml"
+    tests, failures = merge_results(results, report)
+    serial = sum(r.wall for r in results)
+    print(
+        f"\n{tests} tests, {failures} failed. Wall {wall:.1f} s "
+        f"(sum of jobs {serial:.1f} s, {serial / wall if wall else 0:.1f}x). Report: {report}"
+    )
+    merge_coverage([r.job.workdir for r in results], out / "coverage")
+    return 1 if failures else 0
+
+
+def merge_coverage(workdirs, out_dir):
+    """Merge the coverage databases of every job (all seeds) into ``out_dir``."""
+    merged = merge_files([d for d in workdirs if d.is_dir()])
+    if not merged:
+        return
+    print("\nCoverage closure (all jobs merged):")
+    for db, n in sorted(merged.values(), key=lambda m: m[0].name):
+        path = db.save(out_dir / f"{db.name}.{db.key}{SUFFIX}")
+        print(f"  {db.name:<12} {db.coverage:6.1f}%  from {n} runs -> {path}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
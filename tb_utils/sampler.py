@@ -0,0 +1,127 @@
+"""
+Pre-bound signal sampling for monitors.
+
+A monitor that does ``self.dut.din.value`` for every signal on every edge
+resolves each handle through attribute lookup (twice for hierarchical
+handles such as ``dut.uart_tx_inst.uclk``), and typically converts every
+``LogicArray`` to ``int`` and stores it in a freshly built transaction
+object even when nothing reads it. :class:`Sampler` resolves the handles
+once and reads the whole signal set in one call into a :class:`Record`
+that keeps the raw values; they are converted to ``int`` together, the
+first time any field is read::
+
+    class FifoSample(Record):
+        __slots__ = ()
+        fields = ("wr", "rd", "din", "dout", "empty", "full")
+
+    sampler = Sampler(dut, FifoSample, clock=dut.clk)
+    while True:
+        s = await sampler.next()        # rising edge + ReadOnly, then sample()
+        await queue.put(s)              # s.din -> int, converted on first use
+
+:class:`SampleBuffer` keeps raw samples and converts a whole capture into a
+NumPy structured array at once, for checks done after the run.
+"""
+
+from operator import attrgetter
+
+import numpy as np
+from cocotb.triggers import ReadOnly
+
+_value = attrgetter("value")
+
+
+def resolve(dut, path):
+    """Handle for a dotted path relative to ``dut`` (``"uart_tx_inst.uclk"``)."""
+    handle = dut
+    for name in path.split("."):
+        handle = getattr(handle, name)
+    return handle
+
+
+class Record:
+    """Raw signal values of one sample with lazy ``int`` conversion.
+
+    Subclasses declare ``fields`` (and ``__slots__ = ()``); each field becomes
+    a read-only attribute. Reading any field converts all of them once.
+    """
+
+    __slots__ = ("_raw", "_ints", "time")
+    fields = ()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        for i, name in enumerate(cls.fields):
+            setattr(cls, name, property(lambda self, i=i: self.ints()[i]))
+
+    def __init__(self, raw, time=None):
+        self._raw = raw
+        self._ints = None
+        self.time = time
+
+    def ints(self):
+        """All fields as a tuple of ``int``."""
+        if self._ints is None:
+            self._ints = tuple(map(int, self._raw))
+        return self._ints
+
+    def raw(self, name):
+        """Unconverted value (``Logic``/``LogicArray``) of one field."""
+        return self._raw[self.fields.index(name)]
+
+    def as_dict(self):
+        return dict(zip(self.fields, self.ints()))
+
+    def __repr__(self):
+        return f"{type(self).__name__}({', '.join(f'{k}={v}' for k, v in self.as_dict().items())})"
+
+
+class Sampler:
+    """Reads ``record.fields`` (dotted paths allowed via ``signals``) in one call.
+
+    Args:
+        dut: Toplevel handle.
+        record: :class:`Record` subclass built by :meth:`sample`.
+        signals: Signal paths, one per field (default: the field names).
+        clock: Clock handle for :meth:`next`.
+        time: Optional zero-argument callable stamped on every record.
+    """
+
+    def __init__(self, dut, record, signals=None, clock=None, time=None):
+        self.record = record
+        self.handles = tuple(resolve(dut, s) for s in (signals or record.fields))
+        if len(self.handles) != len(record.fields):
+            raise ValueError(f"{len(self.handles)} signals for {len(record.fields)} fields")
+        self.edge = clock.rising_edge if clock is not None else None
+        self.time = time
+        self.count = 0
+
+    def sample(self):
+        """Record of the current values (call in the ReadOnly phase)."""
+        self.count += 1
+        raw = tuple(map(_value, self.handles))
+        return self.record(raw, self.time() if self.time is not None else None)
+
+    async def next(self):
+        """Wait for the next rising clock edge and sample its settled values."""
+        await self.edge
+        await ReadOnly()
+        return self.sample()
+
+
+class SampleBuffer:
+    """Capture of raw samples, converted to a NumPy structured array on demand."""
+
+    def __init__(self, record):
+        self.record = record
+        self._raw = []
+
+    def __len__(self):
+        return len(self._raw)
+
+    def append(self, sample):
+        self._raw.append(sample._raw)
+
+    def to_array(self):
+        dtype = np.dtype([(name, np.int64) for name in self.record.fields])
+        return np.array([tuple(map(int, raw)) for raw in self._raw], dtype=dtype)
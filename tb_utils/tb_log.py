@@ -0,0 +1,83 @@
+import logging
+import os
+
+from tb_utils.txn_log import TxnLogWriter
+
+# UVM verbosity levels: a message is printed when its level is <= the
+# component verbosity. NONE messages are always printed.
+NONE = 0
+LOW = 100
+MEDIUM = 200
+HIGH = 300
+FULL = 400
+
+_LEVELS = {"NONE": NONE, "LOW": LOW, "MEDIUM": MEDIUM, "HIGH": HIGH, "FULL": FULL}
+
+
+def verbosity_from_env(component, default=MEDIUM):
+    """``TB_VERBOSITY_<COMPONENT>`` if set, else ``TB_VERBOSITY``, else ``default``."""
+    raw = os.getenv(f"TB_VERBOSITY_{component.upper()}") or os.getenv("TB_VERBOSITY")
+    if not raw:
+        return default
+    raw = raw.upper()
+    return _LEVELS[raw] if raw in _LEVELS else int(raw)
+
+
+class TbLogger:
+    """Per-component, verbosity-gated logger for testbench hot paths.
+
+    Messages use ``logging``-style ``%`` arguments so nothing is formatted
+    unless the message passes the verbosity gate and the log level. The
+    record goes through cocotb's handler, which already stamps the sim time.
+
+    If ``txn_fields`` is given and ``TB_TXN_LOG_DIR`` is set, :meth:`txn`
+    appends integer records to ``<TB_TXN_LOG_DIR>/<component>.txlog`` for
+    offline decoding with ``python -m tb_utils.txn_log``.
+
+    Args:
+        component: Short name such as ``"DRV"`` or ``"MON"``.
+        verbosity: Overrides the level taken from the environment.
+        txn_fields: Field names of the binary transaction records.
+        clock: Timestamp callable for the binary records.
+    """
+
+    def __init__(self, component, verbosity=None, txn_fields=None, clock=None):
+        self.component = component
+        self.verbosity = verbosity_from_env(component) if verbosity is None else verbosity
+        self.log = logging.getLogger(f"test.{component}")
+        self._txn = None
+        log_dir = os.getenv("TB_TXN_LOG_DIR")
+        if txn_fields and log_dir:
+            os.makedirs(log_dir, exist_ok=True)
+            self._txn = TxnLogWriter(
+                os.path.join(log_dir, f"{component}.txlog"), txn_fields, clock=clock
+            )
+
+    def enabled(self, verbosity):
+        """Cheap guard for messages whose arguments are expensive to compute."""
+        return verbosity <= self.verbosity
+
+    def info(self, verbosity, msg, *args):
+        if verbosity <= self.verbosity:
+            self.log.info(msg, *args)
+
+    def warning(self, msg, *args):
+        self.log.warning(msg, *args)
+
+    def error(self, msg, *args):
+        self.log.error(msg, *args)
+
+    @property
+    def txn_enabled(self):
+        """True when :meth:`txn` writes records (guard for costly arguments)."""
+        return self._txn is not None
+
+    def txn(self, *values):
+        """Record a transaction in the binary log (no-op when disabled)."""
+        if self._txn is not None:
+            self._txn.write(*values)
+
+    def close(self):
+        if self._txn is not None:
+            self._txn.close()
+            self._txn = None
@@ -0,0 +1,63 @@
+"""
+Event-driven waits on DUT handshake signals.
+
+A polling loop such as::
+
+    while dut.rx_valid.value == 0:
+        await RisingEdge(dut.clk)
+
+resumes Python on every clock of the wait. :func:`wait_until` instead sleeps
+on the value changes of the watched signal, combined with a :class:`Timer`
+for the timeout, so Python only wakes when the condition can become true::
+
+    cycles = await wait_until(dut.rx_valid, 1, timeout_cycles=500, clock=dut.clk)
+    await wait_until(dut.done, 1, timeout_cycles=10_000, edge=True)
+
+With ``clock`` it returns on the first rising clock edge at which the signal
+is sampled at ``value``, which is the same point a polling loop returns at,
+so the caller's following writes stay cycle-aligned. ``edge=True`` ignores
+the current value and waits for the next change to ``value``, like
+``done.rising_edge`` for single-cycle pulses that may still be high from the
+previous transfer.
+"""
+
+from cocotb.triggers import First, SimTimeoutError, Timer
+from cocotb.utils import get_sim_steps, get_sim_time
+
+
+async def wait_until(signal, value, timeout_cycles, clock=None, period=10, unit="ns",
+                     *, edge=False, name=None):
+    """Wait until ``signal`` equals ``value``; return the clock periods waited.
+
+    Args:
+        signal: Handle to watch.
+        value: Value to wait for (compared with ``signal.value ==``).
+        timeout_cycles: Clock periods before :class:`SimTimeoutError`.
+        clock: Re-align to this clock's rising edge after the change.
+        period: Clock period in ``unit``, to turn cycles into sim time.
+        unit: Time unit of ``period``.
+        edge: Wait for a change to ``value`` even if it already holds.
+        name: Signal name for the timeout message (default: handle path).
+    """
+    start = get_sim_time("step")
+    period_steps = get_sim_steps(period, unit)
+    if not edge and signal.value == value:
+        return 0
+
+    deadline = start + timeout_cycles * period_steps
+    change = signal.value_change
+    while True:
+        remaining = deadline - get_sim_time("step")
+        if remaining <= 0:
+            break
+        fired = await First(change, Timer(remaining, "step"))
+        if fired is not change or signal.value != value:
+            continue
+        if clock is None:
+            return round((get_sim_time("step") - start) / period_steps)
+        await clock.rising_edge
+        # A polling loop samples here; the value may have moved on meanwhile
+        if signal.value == value:
+            return round((get_sim_time("step") - start) / period_steps)
+    raise SimTimeoutError(
+        f"Timeout waiting for {name or signal._path} == {value} ({timeout_cycles} cycles)")